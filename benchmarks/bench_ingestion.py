@@ -0,0 +1,86 @@
+import sys
+import os
+import io
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+import pandas as pd
+
+from stock_tracker.core.models import Candle
+from stock_tracker.data.ingestion import parse_history, buffer_mult
+
+YEARS = 20
+
+def make_csv(years: int = YEARS, seed: int = 1) -> str:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end=datetime.now().date(), periods=years * 252)
+    close = 50.0 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    opens = close * (1 + rng.normal(0, 0.003, len(dates)))
+    highs = np.maximum(opens, close) * 1.01
+    lows = np.minimum(opens, close) * 0.99
+    vols = rng.integers(1e5, 1e7, len(dates))
+
+    lines = ["Date,Open,High,Low,Close,Volume"]
+    for d, o, h, l, c, v in zip(dates.strftime("%Y-%m-%d"), opens, highs, lows, close, vols):
+        lines.append(f"{d},{o:.4f},{h:.4f},{l:.4f},{c:.4f},{v}")
+    return "\n".join(lines) + "\n"
+
+def legacy_parse(content: str, days: int = 300):
+    # The pre-vectorisation DataIngestor.fetch_history body, kept for comparison.
+    df = pd.read_csv(io.StringIO(content))
+    if df.empty:
+        return []
+
+    df['Date'] = pd.to_datetime(df['Date'])
+
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days * buffer_mult)
+    df = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)]
+    df = df.sort_values('Date')
+
+    candles = []
+    for _, row in df.iterrows():
+        try:
+            c = Candle(
+                timestamp=row['Date'].to_pydatetime(),
+                open=float(row['Open']),
+                high=float(row['High']),
+                low=float(row['Low']),
+                close=float(row['Close']),
+                volume=float(row['Volume'])
+            )
+            candles.append(c)
+        except Exception:
+            continue
+
+    if len(candles) > days:
+        return candles[-days:]
+    return candles
+
+def bench(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+def main():
+    content = make_csv()
+    rows = content.count("\n") - 1
+    print(f"{YEARS}-year daily CSV: {rows} rows, {len(content) / 1024:.0f} KiB")
+
+    legacy = legacy_parse(content)
+    fast = parse_history(content)
+    assert [c.close for c in legacy] == fast.close.tolist(), "parsers disagree"
+
+    results = [
+        ("legacy iterrows (300d)", bench(lambda: legacy_parse(content), 5)),
+        ("parse_history (300d)", bench(lambda: parse_history(content), 50)),
+        ("parse_history (full)", bench(lambda: parse_history(content, days=None), 20)),
+    ]
+
+    base = results[0][1]
+    for name, secs in results:
+        print(f"{name:<26} {secs * 1e3:8.2f} ms  {base / secs:6.1f}x")
+
+if __name__ == "__main__":
+    main()
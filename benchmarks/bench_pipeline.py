@@ -0,0 +1,290 @@
+import sys
+import os
+import json
+import time
+import timeit
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timedelta
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+
+from stock_tracker.api.interface import MarketAnalyzer
+from stock_tracker.core.models import Candle
+from stock_tracker.data.feeds import parse_bar
+from stock_tracker.data.ingestion import parse_history
+from stock_tracker.indicators.context import Context
+from stock_tracker.reports.generator import ReportGenerator
+from stock_tracker.risk.manager import RiskManager
+from stock_tracker.sentiment.analyzer import SentimentAnalyzer
+from stock_tracker.sentiment.engine import FinbertEngine
+from stock_tracker.structure.patterns import PatternRecognizer
+from stock_tracker.structure.swings import SwingDetector, SwingIndex
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+START = datetime(2020, 1, 1)
+# Small universes finish in milliseconds, so each size is re-run until about
+# this many tickers have been analyzed (at least twice) and the fastest run kept.
+SCALING_TICKERS = 300
+LABELS = ("positive", "negative", "neutral")
+
+def make_candles(n: int, seed: int = 0):
+    """Random walk with the same shape as test_system.py's mock_fetch, but seeded and dated."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    opens = close * (1 + rng.normal(0, 0.004, n))
+    highs = np.maximum(opens, close) * (1 + rng.uniform(0, 0.01, n))
+    lows = np.minimum(opens, close) * (1 - rng.uniform(0, 0.01, n))
+    vols = rng.integers(100_000, 1_000_000, n).astype(float)
+    return [Candle(START + timedelta(days=i), float(o), float(h), float(l), float(c), float(v))
+            for i, (o, h, l, c, v) in enumerate(zip(opens, highs, lows, close, vols))]
+
+def make_csv(candles) -> str:
+    lines = ["Date,Open,High,Low,Close,Volume"]
+    for c in candles:
+        lines.append(f"{c.timestamp:%Y-%m-%d},{c.open:.4f},{c.high:.4f},{c.low:.4f},{c.close:.4f},{c.volume:.0f}")
+    return "\n".join(lines) + "\n"
+
+def mock_classifier(texts, batch_size=32):
+    # Stands in for the FinBERT pipeline: deterministic, and cheap enough that
+    # the numbers measure the batching and aggregation around it.
+    return [{"label": LABELS[len(t) % 3], "score": 0.5 + (len(t) % 50) / 100} for t in texts]
+
+def mock_sentiment() -> SentimentAnalyzer:
+    return SentimentAnalyzer(FinbertEngine(loader=lambda: mock_classifier))
+
+def offline_analyzer(histories) -> MarketAnalyzer:
+    analyzer = MarketAnalyzer(snapshots=None)
+    analyzer.data.fetch_history = lambda ticker, days=300: histories[ticker]
+    analyzer.news.fetch_headlines = lambda ticker, days=2: [f"{ticker} headline {i}" for i in range(5)]
+    analyzer.sentiment = mock_sentiment()
+    return analyzer
+
+def bench(fn, number: int = 1, repeat: int = 5) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+def calibrate(repeat: int) -> float:
+    """Fixed pure-Python workload recorded with every run. --normalize uses it
+    to compare against a baseline taken on a different host."""
+    def work():
+        total = 0.0
+        for i in range(20000):
+            total += (i % 7) * 0.5
+        return total
+    return bench(work, 5, repeat * 2) * 1e6
+
+def stage_results(bars: int, repeat: int):
+    candles = make_candles(bars)
+    csv = make_csv(candles)
+    parse_history(csv)  # pay the deferred pandas import outside the timings
+    lines = [f"BENCH,{c.timestamp.isoformat()},{c.open},{c.high},{c.low},{c.close},{c.volume}" for c in candles]
+
+    def run_context():
+        ctx = Context()
+        for c in candles:
+            ctx.update(c)
+
+    def run_swings():
+        detector = SwingDetector()
+        for i, c in enumerate(candles):
+            detector.update(c, i)
+
+    detector = SwingDetector()
+    swings = [s for s in (detector.update(c, i) for i, c in enumerate(candles)) if s]
+    index = SwingIndex(swings)
+    windows = [swings[max(0, i - 5):i] for i in range(1, len(swings) + 1)]
+    recognizer = PatternRecognizer()
+
+    risk = RiskManager()
+    prices = [c.close for c in candles]
+
+    groups = [[f"BENCH {i} headline {j}" for j in range(10)] for i in range(200)]
+
+    def run_sentiment():
+        # Fresh engine each run so every headline is a model miss.
+        mock_sentiment().analyze_many(groups)
+
+    analyzer = offline_analyzer({"BENCH": candles})
+    report = analyzer.analyze("BENCH")
+    generator = ReportGenerator()
+
+    return {
+        "parse_history_us_per_bar": bench(lambda: parse_history(csv, days=None), 1, repeat) / bars * 1e6,
+        "parse_bar_us_per_line": bench(lambda: [parse_bar(l) for l in lines], 5, repeat) / bars * 1e6,
+        "context_update_us_per_bar": bench(run_context, 1, repeat) / bars * 1e6,
+        "swing_detector_us_per_bar": bench(run_swings, 5, repeat) / bars * 1e6,
+        "pattern_recognizer_us_per_call": bench(lambda: [recognizer.detect_patterns(w) for w in windows], 50, repeat)
+                                          / max(len(windows), 1) * 1e6,
+        "calculate_risk_us_per_call": bench(lambda: [risk.calculate_risk(p, 2.0, "LONG", 0.8, index) for p in prices],
+                                            5, repeat) / bars * 1e6,
+        "sentiment_us_per_headline": bench(run_sentiment, 1, repeat) / (len(groups) * 10) * 1e6,
+        "report_text_us": bench(lambda: generator.generate_text_report(report), 200, repeat) * 1e6,
+    }
+
+def analyze_results(bars: int, repeat: int):
+    histories = {"BENCH": make_candles(bars)}
+
+    def cold():
+        offline_analyzer(histories).analyze("BENCH")
+
+    warm_analyzer = offline_analyzer(histories)
+    warm_analyzer.analyze("BENCH")
+
+    return {
+        "analyze_cold_ms": bench(cold, 1, repeat) * 1e3,
+        "analyze_warm_ms": bench(lambda: warm_analyzer.analyze("BENCH"), 10, repeat) * 1e3,
+    }
+
+def scaling_results(counts, bars: int):
+    out = {}
+    for n in counts:
+        histories = {f"T{i:04d}": make_candles(bars, seed=i) for i in range(n)}
+        cold = warm = float("inf")
+        for _ in range(max(2, -(-SCALING_TICKERS // n))):
+            analyzer = offline_analyzer(histories)
+            t0 = time.perf_counter()
+            done = sum(1 for _, r in analyzer.analyze_many(histories) if r is not None)
+            cold = min(cold, time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            sum(1 for _ in analyzer.analyze_many(histories))
+            warm = min(warm, time.perf_counter() - t0)
+            if done != n:
+                raise RuntimeError(f"only {done} of {n} tickers produced a report")
+        out[f"analyze_many_{n}_cold_ms_per_ticker"] = cold / n * 1e3
+        out[f"analyze_many_{n}_warm_ms_per_ticker"] = warm / n * 1e3
+    return out
+
+def micro_results(bars: int, repeat: int):
+    out = {"calibration_us": calibrate(repeat)}
+    out.update(stage_results(bars, repeat))
+    out.update(analyze_results(bars, repeat))
+    return out
+
+def best_of_processes(n: int, bars: int, repeat: int):
+    """Per-stage timings vary by tens of percent between interpreter processes
+    (hash seeds, allocation layout), so keep the fastest of n fresh processes."""
+    runs = []
+    for _ in range(n):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker",
+                              "--bars", str(bars), "--repeat", str(repeat)],
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout))
+    return {k: min(r[k] for r in runs) for k in runs[0]}
+
+def host_speed(doc, baseline, normalize: bool) -> float:
+    return doc["meta"]["calibration_us"] / baseline["meta"]["calibration_us"] if normalize else 1.0
+
+def compare(doc, baseline, tolerance: float, normalize: bool = False):
+    """Metrics slower than baseline * (1 + tolerance). With normalize, the
+    baseline is first scaled by the ratio of calibration times, for comparing
+    across hosts. All metrics are lower-is-better."""
+    if not baseline:
+        return []
+    speed = host_speed(doc, baseline, normalize)
+    regressions = []
+    for name, value in doc["results"].items():
+        base = baseline["results"].get(name)
+        if base is not None and value > base * speed * (1 + tolerance):
+            regressions.append((name, base * speed, value))
+    return regressions
+
+def measure(args, counts, micro: bool = True):
+    results = {}
+    if micro:
+        if args.processes > 1:
+            results.update(best_of_processes(args.processes, args.bars, args.repeat))
+        else:
+            results.update(micro_results(args.bars, args.repeat))
+    results.update(scaling_results(counts, args.bars))
+    return results
+
+def document(results, bars: int):
+    results = dict(results)
+    calibration = results.pop("calibration_us")
+    return {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                 "bars": bars,
+                 "calibration_us": calibration, "created": datetime.now().isoformat(timespec="seconds")},
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage and end-to-end cost of the analysis pipeline")
+    parser.add_argument("--bars", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tickers", default="1,100,1000", help="comma-separated analyze_many universe sizes")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    parser.add_argument("--output", help="also write the results JSON here")
+    parser.add_argument("--baseline", default=BASELINE, help="compare against this results file")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline before exiting non-zero")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="times to re-measure metrics that look regressed before reporting them")
+    parser.add_argument("--processes", type=int, default=3, help="fresh interpreters for the per-stage timings")
+    parser.add_argument("--normalize", action="store_true",
+                        help="scale the baseline by calibration time, when it was recorded on another host")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(micro_results(args.bars, args.repeat)))
+        return
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    counts = [int(n) for n in args.tickers.split(",") if n]
+    results = measure(args, counts)
+    regressions = compare(document(results, args.bars), baseline, args.tolerance, args.normalize)
+    for _ in range(args.confirm):
+        if args.save_baseline:
+            # A baseline is the best of every round, so later runs are not
+            # held against one taken during a slow spell.
+            again = measure(args, counts)
+        elif regressions:
+            # Slowdowns on a shared host come and go; a real regression
+            # survives re-measurement, a slow spell usually does not.
+            flagged = [name for name, _, _ in regressions]
+            scaling = sorted({int(name.split("_")[2]) for name in flagged if name.startswith("analyze_many_")})
+            again = measure(args, scaling, micro=len(scaling) < len(flagged))
+        else:
+            break
+        for name, value in again.items():
+            results[name] = min(results[name], value)
+        regressions = compare(document(results, args.bars), baseline, args.tolerance, args.normalize)
+
+    doc = document(results, args.bars)
+    calibration = doc["meta"]["calibration_us"]
+    results = doc["results"]
+
+    for path in filter(None, (args.output, args.save_baseline and args.baseline)):
+        with open(path, "w") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+
+    if args.json:
+        print(json.dumps(doc, indent=2))
+    else:
+        expected = {}
+        if baseline:
+            speed = host_speed(doc, baseline, args.normalize)
+            expected = {k: v * speed for k, v in baseline["results"].items()}
+        print(f"{'calibration_us':<40} {calibration:10.2f}")
+        for name, value in results.items():
+            base = expected.get(name)
+            delta = f"{(value / base - 1) * 100:+7.1f}%" if base else ""
+            print(f"{name:<40} {value:10.2f} {delta}")
+
+    for name, base, value in regressions:
+        print(f"REGRESSION {name}: {value:.2f} vs expected {base:.2f}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import json
+import argparse
+import subprocess
+
+sys.path.append(os.getcwd())
+
+HEAVY = ("pandas", "requests", "urllib3", "transformers", "torch", "textblob", "dash", "plotly")
+
+# Runs in a fresh interpreter so nothing is already imported.
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from stock_tracker.api.interface import MarketAnalyzer
+from stock_tracker.core.models import Candle
+from datetime import datetime, timedelta
+t1 = time.perf_counter()
+analyzer = MarketAnalyzer()
+t2 = time.perf_counter()
+
+def mock_fetch(ticker, days=300):
+    start = datetime(2024, 1, 1)
+    return [Candle(start + timedelta(days=i), 100.0 + i * 0.1, 101.0 + i * 0.1, 99.0 + i * 0.1,
+                   100.0 + i * 0.1, 1000.0 + i) for i in range(days)]
+
+analyzer.data.fetch_history = mock_fetch
+loaded_before = [m for m in HEAVY if m in sys.modules]
+report = analyzer.analyze("BENCH")
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1e3,
+    "construct_ms": (t2 - t1) * 1e3,
+    "first_report_ms": (t3 - t2) * 1e3,
+    "heavy_loaded_at_startup": loaded_before,
+    "heavy_loaded_after_report": [m for m in HEAVY if m in sys.modules],
+    "ok": report is not None,
+}))
+"""
+
+def import_profile(module: str, top: int):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = [p.strip() for p in line.replace("import time:", "|").split("|")]
+        rows.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    rows.sort(key=lambda r: r["cumulative_us"], reverse=True)
+    return rows[:top]
+
+def wall_clock(runs: int):
+    probe = f"HEAVY = {HEAVY!r}\n" + PROBE
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    best = min(samples, key=lambda s: s["import_ms"] + s["construct_ms"])
+    best["first_report_ms"] = min(s["first_report_ms"] for s in samples)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup cost of the analysis entry points")
+    parser.add_argument("--module", default="stock_tracker.api.interface")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results only")
+    parser.add_argument("--max-startup-ms", type=float, default=None,
+                        help="exit non-zero if import + construction exceeds this")
+    args = parser.parse_args()
+
+    result = {"imports": import_profile(args.module, args.top), "wall_clock": wall_clock(args.runs)}
+    startup = result["wall_clock"]["import_ms"] + result["wall_clock"]["construct_ms"]
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"-X importtime for {args.module} (top {args.top} by cumulative):")
+        for row in result["imports"]:
+            print(f"  {row['cumulative_us'] / 1e3:8.1f} ms  {row['module']}")
+        wc = result["wall_clock"]
+        print(f"import:        {wc['import_ms']:8.1f} ms")
+        print(f"construct:     {wc['construct_ms']:8.1f} ms")
+        print(f"first report:  {wc['first_report_ms']:8.1f} ms")
+        print(f"heavy modules at startup: {', '.join(wc['heavy_loaded_at_startup']) or 'none'}")
+        print(f"heavy modules after first report: {', '.join(wc['heavy_loaded_after_report']) or 'none'}")
+
+    if args.max_startup_ms is not None and startup > args.max_startup_ms:
+        print(f"startup {startup:.1f} ms exceeds budget {args.max_startup_ms:.1f} ms", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.data.resample import downsample
+
+MAX_POINTS = 1500
+
+def epoch_ms(ts_us: np.ndarray) -> np.ndarray:
+    # Date axes accept epoch milliseconds; float64 arrays serialize as typed
+    # binary instead of one ISO string per bar.
+    return np.asarray(ts_us, dtype=np.float64) / 1000.0
+
+def visible(bars: CandleSeries, x_range: Optional[Tuple[float, float]]) -> CandleSeries:
+    """Bars inside an (epoch ms) axis range, plus one either side so the view edges stay filled."""
+    if x_range is None or not bars:
+        return bars
+    x = epoch_ms(bars.timestamp)
+    lo = max(int(np.searchsorted(x, x_range[0], side="left")) - 1, 0)
+    hi = min(int(np.searchsorted(x, x_range[1], side="right")) + 1, len(bars))
+    return bars[lo:hi]
+
+def candle_arrays(bars: CandleSeries) -> Dict[str, np.ndarray]:
+    return {"x": epoch_ms(bars.timestamp), "open": bars.open, "high": bars.high,
+            "low": bars.low, "close": bars.close}
+
+def build_figure(report: Any, max_points: int = MAX_POINTS,
+                 x_range: Optional[Tuple[float, float]] = None) -> go.Figure:
+    candles = report.candles
+    if not candles:
+        return go.Figure()
+
+    bars = downsample(visible(candles, x_range), max_points)
+    fig = go.Figure(data=[go.Candlestick(name="OHLC", **candle_arrays(bars))])
+
+    if report.swings:
+        s_dates = epoch_ms(np.array([s.timestamp for s in report.swings], dtype="datetime64[us]").astype(np.int64))
+        s_prices = np.array([s.price for s in report.swings])
+        fig.add_trace(go.Scatter(x=s_dates, y=s_prices, mode='lines+markers', name='Structure', line=dict(color='blue', width=1)))
+
+    if report.target > 0:
+        fig.add_hline(y=report.target, line_dash="dash", line_color="green", annotation_text="Target")
+    if report.stop_loss > 0:
+        fig.add_hline(y=report.stop_loss, line_dash="dash", line_color="red", annotation_text="Stop")
+
+    if report.confidence_interval_high > 0:
+        fig.add_hline(y=report.confidence_interval_high, line_dash="dot", line_color="gray", annotation_text="High CI")
+    if report.confidence_interval_low > 0:
+        fig.add_hline(y=report.confidence_interval_low, line_dash="dot", line_color="gray", annotation_text="Low CI")
+
+    fig.update_layout(title=f"{report.ticker} Analysis", xaxis_type="date", xaxis_rangeslider_visible=False,
+                      template="plotly_white", height=600)
+    return fig
+
+def serialize(fig: go.Figure) -> Dict[str, Any]:
+    """Plain-JSON figure with numeric arrays base64-packed, ready to hand to dcc.Graph."""
+    return json.loads(fig.to_json())
+
+def last_x(report: Any) -> Optional[float]:
+    candles = report.candles
+    return float(epoch_ms(candles.timestamp[-1:])[0]) if len(candles) else None
+
+def extend_data(report: Any, since: Optional[float]) -> Optional[List[Any]]:
+    """dcc.Graph extendData payload appending the bars after `since` (epoch ms)
+    to the candlestick trace, or None when there is nothing new.
+
+    maxPoints is left unset: the trace on screen is downsampled, so trimming it
+    to a point count would drop whole buckets of history off the left edge.
+    """
+    candles = report.candles
+    if since is None or not candles:
+        return None
+    x = epoch_ms(candles.timestamp)
+    start = int(np.searchsorted(x, since, side="right"))
+    if start >= len(candles):
+        return None
+    new = candle_arrays(candles[start:])
+    return [{k: [v.tolist()] for k, v in new.items()}, [0], None]
+
+def relayout_range(relayout: Optional[Dict[str, Any]]) -> Tuple[bool, Optional[Tuple[float, float]]]:
+    """(changed, range) from dcc.Graph relayoutData. A reset or autorange gives (True, None)."""
+    if not relayout:
+        return False, None
+    if relayout.get("xaxis.autorange"):
+        return True, None
+    lo, hi = relayout.get("xaxis.range[0]"), relayout.get("xaxis.range[1]")
+    if lo is None and "xaxis.range" in relayout:
+        lo, hi = relayout["xaxis.range"]
+    if lo is None or hi is None:
+        return False, None
+    return True, (_to_ms(lo), _to_ms(hi))
+
+def _to_ms(value: Any) -> float:
+    # Plotly reports date-axis ranges as date strings.
+    if isinstance(value, (int, float)):
+        return float(value)
+    return float(np.datetime64(str(value).replace(" ", "T"), "us").astype(np.int64)) / 1000.0
+
+def level_of_detail(report: Any, x_range: Optional[Tuple[float, float]],
+                    max_points: int = MAX_POINTS) -> Dict[str, List[float]]:
+    """Candlestick arrays for the zoomed window at full resolution where it fits."""
+    bars = downsample(visible(report.candles, x_range), max_points)
+    return {k: v.tolist() for k, v in candle_arrays(bars).items()}
@@ -3,12 +3,24 @@ import os
 sys.path.append(os.getcwd())
 
 import dash
-from dash import dcc, html, Input, Output, State, callback
+from dash import dash_table, dcc, html, Input, Output, State, Patch, callback, ctx, no_update
 import plotly.graph_objects as go
+from stock_tracker.api import charts
 from stock_tracker.api.interface import MarketAnalyzer, AnalysisReport
+from stock_tracker.api.refresher import BackgroundRefresher
 
 analyzer = MarketAnalyzer()
 
+WATCHLIST_COLUMNS = [
+    ('ticker', 'Ticker'),
+    ('recommendation', 'Rating'),
+    ('score', 'Score'),
+    ('regime', 'Regime'),
+    ('risk_reward', 'R/R'),
+    ('sentiment', 'Sentiment'),
+    ('price', 'Price'),
+]
+
 def create_layout():
     return html.Div([
         html.H1("stockCheck by joshmode"),
@@ -20,6 +32,24 @@ def create_layout():
 
         html.Div(id='output-container', style={'padding': '20px', 'border': '1px solid #ddd', 'margin': '20px', 'borderRadius': '5px'}),
         dcc.Graph(id='price-chart'),
+        dcc.Interval(id='poll', interval=300, disabled=True),
+        dcc.Interval(id='live-tick', interval=5000),
+        dcc.Store(id='chart-state'),
+
+        html.H2("Watchlist", style={'padding': '0 20px'}),
+        html.Div([
+            dcc.Input(id='watchlist-input', type='text', placeholder="Tickers, comma separated", style={'width': '400px'}),
+            html.Button('Watch', id='watchlist-button', n_clicks=0),
+        ], style={'padding': '20px'}),
+        dash_table.DataTable(
+            id='watchlist-table',
+            columns=[{'name': name, 'id': key} for key, name in WATCHLIST_COLUMNS],
+            data=[],
+            sort_action='native',
+            style_table={'padding': '0 20px'},
+        ),
+        dcc.Interval(id='watchlist-tick', interval=1000),
+        dcc.Store(id='watchlist-state', data={'order': [], 'versions': {}}),
     ])
 
 app = dash.Dash(__name__)
@@ -66,59 +96,137 @@ def _create_report_html(report: AnalysisReport) -> html.Div:
         html.P(f"Rationale: {report.rationale}", style={'fontStyle': 'italic'}),
     ])
 
-def _create_chart(report: AnalysisReport, ticker: str) -> go.Figure:
-    candles = report.candles
-    if not candles:
-         return go.Figure()
-
-    dates = [c.timestamp for c in candles]
-    opens = [c.open for c in candles]
-    highs = [c.high for c in candles]
-    lows = [c.low for c in candles]
-    closes = [c.close for c in candles]
+def _serialized_chart(report: AnalysisReport) -> dict:
+    # Built once per new bar by the refresher; callbacks hand out the cached dict.
+    return charts.serialize(charts.build_figure(report))
 
-    fig = go.Figure(data=[go.Candlestick(x=dates, open=opens, high=highs, low=lows, close=closes, name="OHLC")])
-
-    if report.swings:
-        s_dates = [s.timestamp for s in report.swings]
-        s_prices = [s.price for s in report.swings]
-        fig.add_trace(go.Scatter(x=s_dates, y=s_prices, mode='lines+markers', name='Structure', line=dict(color='blue', width=1)))
-
-    if report.target > 0:
-        fig.add_hline(y=report.target, line_dash="dash", line_color="green", annotation_text="Target")
-    if report.stop_loss > 0:
-        fig.add_hline(y=report.stop_loss, line_dash="dash", line_color="red", annotation_text="Stop")
-
-    if report.confidence_interval_high > 0:
-        fig.add_hline(y=report.confidence_interval_high, line_dash="dot", line_color="gray", annotation_text="High CI")
-    if report.confidence_interval_low > 0:
-        fig.add_hline(y=report.confidence_interval_low, line_dash="dot", line_color="gray", annotation_text="Low CI")
-
-    fig.update_layout(title=f"{ticker} Analysis", xaxis_rangeslider_visible=False, template="plotly_white", height=600)
-    return fig
+refresher = BackgroundRefresher(
+    analyzer, _serialized_chart,
+    watchlist=[t for t in os.environ.get("STOCK_TRACKER_WATCHLIST", "").split(",") if t.strip()],
+    interval=float(os.environ.get("STOCK_TRACKER_REFRESH_SECONDS", "60")),
+)
+@app.server.before_request
+def _start_refresher():
+    # Started by the first request rather than under __main__, so the watchlist
+    # stays warm when a WSGI server imports `app.server` as well.
+    refresher.start()
 
 @callback(
-    [Output('output-container', 'children'), Output('price-chart', 'figure')],
-    Input('submit-button', 'n_clicks'),
-    State('ticker-input', 'value'),
+    [Output('output-container', 'children'), Output('price-chart', 'figure'), Output('price-chart', 'extendData'),
+     Output('poll', 'disabled'), Output('chart-state', 'data')],
+    [Input('submit-button', 'n_clicks'), Input('poll', 'n_intervals'), Input('live-tick', 'n_intervals')],
+    [State('ticker-input', 'value'), State('chart-state', 'data')],
     prevent_initial_call=True
 )
-def update(n_clicks, ticker_input):
+def update(n_clicks, n_polls, n_ticks, ticker_input, chart_state):
+    """Serve the refresher's precomputed report and figure. Anything not warm
+    is queued on its worker pool and picked up by the poll interval, so the
+    server worker never waits on a fetch. Live ticks only append new bars to
+    the chart already on screen."""
     if not ticker_input:
-        return "Enter ticker.", go.Figure()
+        return "Enter ticker.", go.Figure(), no_update, True, None
 
     ticker = ticker_input.upper()
+    entry = refresher.get(ticker)
+
+    if ctx.triggered_id == 'live-tick':
+        shown = chart_state or {}
+        if entry is None or shown.get('ticker') != ticker:
+            raise dash.exceptions.PreventUpdate
+        extend = charts.extend_data(entry.report, shown.get('last'))
+        if extend is None:
+            raise dash.exceptions.PreventUpdate
+        return (_create_report_html(entry.report), no_update, extend, no_update,
+                {'ticker': ticker, 'last': charts.last_x(entry.report)})
+
+    if ctx.triggered_id == 'submit-button':
+        if entry is None or ticker not in refresher.watchlist or refresher.stale(entry):
+            refresher.request(ticker)
+        if entry is None:
+            return f"Analyzing {ticker}...", no_update, no_update, False, no_update
+    elif refresher.pending(ticker):
+        return no_update, no_update, no_update, False, no_update
+
+    if entry is None:
+        error = refresher.errors.get(ticker)
+        if error:
+            return f"Error: {error}", go.Figure(), no_update, True, None
+        return f"No data for {ticker}.", go.Figure(), no_update, True, None
+
+    return (_create_report_html(entry.report), entry.figure, no_update, not refresher.pending(ticker),
+            {'ticker': ticker, 'last': charts.last_x(entry.report)})
 
-    try:
-        report = analyzer.analyze(ticker)
-    except Exception as e:
-        print(f"Error: {e}")
-        return f"Error: {e}", go.Figure()
+@callback(
+    Output('price-chart', 'figure', allow_duplicate=True),
+    Input('price-chart', 'relayoutData'),
+    State('chart-state', 'data'),
+    prevent_initial_call=True
+)
+def zoom(relayout, chart_state):
+    """Re-slice the candlestick trace for the visible window, so zooming in
+    shows full-resolution bars while the overview stays downsampled."""
+    changed, x_range = charts.relayout_range(relayout)
+    entry = refresher.get(chart_state['ticker']) if chart_state else None
+    if not changed or entry is None:
+        raise dash.exceptions.PreventUpdate
+
+    patch = Patch()
+    for key, values in charts.level_of_detail(entry.report, x_range).items():
+        patch['data'][0][key] = values
+    return patch
+
+def _watchlist_row(report: AnalysisReport) -> dict:
+    return {
+        'id': report.ticker,
+        'ticker': report.ticker,
+        'recommendation': f"{report.recommendation} ({report.trade_type})",
+        'score': round(report.score, 3) if report.score is not None else None,
+        'regime': getattr(report.regime, 'value', str(report.regime)),
+        'risk_reward': round(report.risk_reward, 2),
+        'sentiment': round(report.sentiment_score, 2),
+        'price': round(report.price, 2),
+    }
 
-    if not report:
-        return f"No data for {ticker}.", go.Figure()
+@callback(
+    Output('watchlist-input', 'value'),
+    Input('watchlist-button', 'n_clicks'),
+    State('watchlist-input', 'value'),
+    prevent_initial_call=True
+)
+def watch(n_clicks, tickers_input):
+    """Add tickers to the refresher's watchlist and analyze the new ones in one
+    concurrent analyze_many pass; rows appear as each report completes."""
+    tickers = [t.strip().upper() for t in (tickers_input or "").split(",") if t.strip()]
+    new = [t for t in dict.fromkeys(tickers) if t not in refresher.watchlist]
+    for ticker in new:
+        refresher.watch(ticker)
+    if new:
+        refresher.request_many(new)
+    return ""
 
-    return _create_report_html(report), _create_chart(report, ticker)
+@callback(
+    [Output('watchlist-table', 'data'), Output('watchlist-state', 'data')],
+    Input('watchlist-tick', 'n_intervals'),
+    State('watchlist-state', 'data'),
+    prevent_initial_call=True
+)
+def watchlist_rows(n_intervals, state):
+    """Patch only the rows whose report changed since the last tick."""
+    changed = refresher.changed(state['versions'])
+    if not changed:
+        raise dash.exceptions.PreventUpdate
+
+    patch = Patch()
+    for entry in changed:
+        ticker = entry.report.ticker
+        row = _watchlist_row(entry.report)
+        if ticker in state['order']:
+            patch[state['order'].index(ticker)] = row
+        else:
+            patch.append(row)
+            state['order'].append(ticker)
+        state['versions'][ticker] = entry.version
+    return patch, state
 
 if __name__ == '__main__':
     print("Dashboard at http://127.0.0.1:8050/")
@@ -1,22 +1,27 @@
-from typing import List, Optional, Any, Dict
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Any, Dict, Iterable, Iterator, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
 
 from stock_tracker.data.ingestion import DataIngestor
-from stock_tracker.structure.patterns import PatternRecognizer
-from stock_tracker.structure.swings import SwingDetector
-from stock_tracker.volume.analysis import VolumeAnalyzer
-from stock_tracker.regime.classifier import RegimeClassifier, MarketRegime
+from stock_tracker.data.resample import MultiTimeframe
+from stock_tracker.data.store import CandleBuffer
 from stock_tracker.sentiment.analyzer import SentimentAnalyzer
 from stock_tracker.sentiment.news_client import NewsClient
-from stock_tracker.scoring.engine import ScoringEngine
-from stock_tracker.positioning.manager import PositionManager
-from stock_tracker.risk.manager import RiskManager
-from stock_tracker.cache.manager import LRUCache, AnalysisState
-from stock_tracker.backtest_snapshot.engine import BacktestEngine
+from stock_tracker.cache.manager import LRUCache, AnalysisState, SingleFlight, market_session_ttl
+from stock_tracker.cache.snapshot import SnapshotStore
 from stock_tracker.decay.aging import SignalDecay
 from stock_tracker.core.models import IndicatorState, SwingPoint, Candle
-from stock_tracker.indicators.streaming import EMA, RSI, ATR, MACD, VWAP, OBV, BollingerBands, ADX
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.indicators.context import Context
+from stock_tracker.metrics.instrument import NULL_TRACE, Instrumentation, Trace
+from stock_tracker.structure.swings import SwingIndex
+from stock_tracker.pipeline.decision import DecisionChain, Replay, replay_history, replay_swings
 
 @dataclass
 class AnalysisReport:
@@ -44,101 +49,280 @@ class AnalysisReport:
     position_size_pct: float
     backtest_win_rate: Optional[float] = None
     backtest_avg_move: Optional[float] = None
+    higher_timeframes: Dict[str, Any] = field(default_factory=dict)
+    score: Optional[float] = None
+    indicators: Optional[IndicatorState] = None
     swings: List[SwingPoint] = field(default_factory=list)
-    candles: List[Any] = field(default_factory=list)
-
-class Context:
-    def __init__(self):
-        self.ema20 = EMA(20)
-        self.ema50 = EMA(50)
-        self.ema200 = EMA(200)
-        self.rsi = RSI(14)
-        self.atr = ATR(14)
-        self.macd = MACD()
-        self.vwap = VWAP()
-        self.obv = OBV()
-        self.bb = BollingerBands(20, 2.0)
-        self.adx = ADX(14)
-
-    def update(self, candle: Candle) -> IndicatorState:
-        p = candle.close
-        h, l, c, v = candle.high, candle.low, candle.close, candle.volume
-
-        e20 = self.ema20.update(p)
-        e50 = self.ema50.update(p)
-        e200 = self.ema200.update(p)
-        rsi = self.rsi.update(p)
-        atr = self.atr.update(h, l, c)
-        m, s, hist = self.macd.update(p)
-        vwap = self.vwap.update(h, l, c, v)
-        obv = self.obv.update(c, v)
-        ub, lb, basis, width = self.bb.update(p)
-        adx = self.adx.update(h, l, c)
-
-        return IndicatorState(
-            ema20=e20, ema50=e50, ema200=e200,
-            rsi=rsi, atr=atr,
-            macd_line=m, macd_signal=s, macd_hist=hist,
-            vwap=vwap,
-            upper_bollinger=ub, lower_bollinger=lb, bollinger_width=width,
-            adx=adx, obv=obv
-        )
+    candles: CandleSeries = field(default_factory=CandleSeries)
+
+# Default for MarketAnalyzer(snapshots=...): use STOCK_TRACKER_DATA_DIR when set.
+# An explicit None turns snapshots off.
+FROM_ENV: Any = object()
 
-class MarketAnalyzer:
-    def __init__(self):
-        self.cache = LRUCache(50)
+# analyze_many's marker for tickers whose analysis another caller is running.
+_SHARED: Any = object()
+
+class MarketAnalyzer(DecisionChain):
+    def __init__(self, snapshots: Optional[SnapshotStore] = FROM_ENV, instruments: Optional[Instrumentation] = None):
+        super().__init__(instruments)
+        if snapshots is FROM_ENV:
+            snapshots = None
+            if os.environ.get("STOCK_TRACKER_DATA_DIR"):
+                snapshots = SnapshotStore(os.path.join(os.environ["STOCK_TRACKER_DATA_DIR"], "state"))
+
+        self.snapshots = snapshots
+        self.cache = LRUCache(1000, max_bytes=128 * 1024 * 1024, ttl=market_session_ttl)
         self.data = DataIngestor()
-        self.patterns = PatternRecognizer()
-        self.volume = VolumeAnalyzer()
-        self.regime = RegimeClassifier()
         self.sentiment = SentimentAnalyzer()
         self.news = NewsClient()
-        self.scoring = ScoringEngine()
-        self.pos = PositionManager()
-        self.risk = RiskManager()
-        self.backtest = BacktestEngine()
         self.decay = SignalDecay()
+        self.lookback = 300
+
+        # Push-mode candle buffers, fed by ingest(). Indicators come from the
+        # cached AnalysisState's streaming objects, not from the buffer.
+        self.live: Dict[str, CandleBuffer] = {}
+        self.dirty: Set[str] = set()
+        self.headlines: Dict[str, List[str]] = {}
+
+        # One shared instance serves every dashboard session: concurrent
+        # analyze calls for a ticker coalesce, and each ticker's cached
+        # streaming state is only mutated under its own lock.
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        self._ticker_locks: Dict[str, threading.RLock] = {}
+
+    @contextmanager
+    def _ticker_lock(self, ticker: str) -> Iterator[None]:
+        with self._lock:
+            lock = self._ticker_locks.get(ticker)
+            if lock is None:
+                lock = self._ticker_locks[ticker] = threading.RLock()
+        with lock:
+            yield
 
     def analyze(self, ticker: str) -> Optional[AnalysisReport]:
-        cached = self.cache.get(ticker)
+        """Full report for one ticker. Callers asking for a ticker that is
+        already being analyzed wait for, and share, that result."""
+        return self.flights.do(ticker, self._analyze, ticker)
 
-        process_candles = []
-        full_hist = []
-        ctx = None
-        detector = None
-        structure = []
+    def _analyze(self, ticker: str) -> Optional[AnalysisReport]:
+        with self.instruments.begin(ticker) as trace:
+            raw, headlines = self._fetch_inputs(ticker, trace)
+            if not raw:
+                return None
+            return self._evaluate(ticker, raw, headlines, trace=trace)
+
+    def analyze_many(self, tickers: Iterable[str], max_workers: int = 8,
+                     process_workers: int = 0) -> Iterator[Tuple[str, Optional[AnalysisReport]]]:
+        """Yield (ticker, report) as each completes.
+
+        Price and news downloads overlap on a thread pool. Headlines from fetches
+        that finish together are scored in one batched sentiment pass. With
+        process_workers, cold indicator replays run on a process pool; everything
+        that touches the cache and models stays on the calling thread.
+
+        Each ticker joins the same in-flight call as `analyze`: one already being
+        analyzed elsewhere is waited for, and callers of `analyze` for a ticker
+        this batch leads share its report once it is yielded.
+        """
+        io_pool = ThreadPoolExecutor(max_workers=max_workers)
+        cpu_pool = ProcessPoolExecutor(max_workers=process_workers) if process_workers else None
+        calls: Dict[str, Future] = {}
+        traces: Dict[str, Trace] = {}
 
-        lookback = 300
-        raw = self.data.fetch_history(ticker, days=lookback)
+        try:
+            pending: Dict[Future, Tuple[str, Any]] = {}
+            for t in dict.fromkeys(tickers):
+                call, leader = self.flights.claim(t)
+                if not leader:
+                    pending[call] = (t, _SHARED)
+                    continue
+                calls[t], traces[t] = call, self.instruments.begin(t)
+                pending[io_pool.submit(self._fetch_inputs, t, traces[t])] = (t, None)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                # Score every headline that just arrived in one batched pass.
+                with self.instruments.stage(None, "sentiment_batch"):
+                    self.sentiment.warm([fut.result()[1] for fut in done
+                                         if pending[fut][1] is None and not fut.exception()])
+
+                for fut in done:
+                    ticker, inputs = pending.pop(fut)
+                    report, error = None, None
+                    try:
+                        if inputs is _SHARED:
+                            report = fut.result()
+                        elif inputs is None:
+                            raw, headlines = fut.result()
+                            if raw and cpu_pool and not self.cache.is_fresh(ticker):
+                                pending[cpu_pool.submit(replay_history, raw)] = (ticker, (raw, headlines))
+                                continue
+                            if raw:
+                                report = self._evaluate(ticker, raw, headlines, trace=traces[ticker])
+                        else:
+                            report = self._evaluate(ticker, *inputs, replay=fut.result(), trace=traces[ticker])
+                    except Exception as e:
+                        print(f"analysis error {ticker}: {e}")
+                        error = e
+
+                    if ticker in calls:
+                        traces.pop(ticker).finish()
+                        self.flights.settle(ticker, calls.pop(ticker), report, error)
+                    yield ticker, report
+        finally:
+            # Abandoned mid-batch: release callers still waiting on tickers this batch led.
+            for ticker, call in calls.items():
+                self.flights.settle(ticker, call, error=CancelledError(f"analysis of {ticker} abandoned"))
+            io_pool.shutdown(wait=False, cancel_futures=True)
+            if cpu_pool:
+                cpu_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_inputs(self, ticker: str, trace: Trace = NULL_TRACE) -> Tuple[CandleSeries, List[str]]:
+        with trace.stage("fetch"):
+            raw = self.data.fetch_history(ticker, days=self.lookback)
         if not raw:
-            return None
+            return CandleSeries(), []
+        with trace.stage("news"):
+            headlines = self.news.fetch_headlines(ticker)
+        self.headlines[ticker] = headlines
+        return CandleSeries.from_candles(raw), headlines
 
-        if cached:
-            last_dt = cached.last_updated
-            process_candles = [c for c in raw if c.timestamp > last_dt]
-            full_hist = raw
-            ctx = cached.streaming_objects.get("indicators")
-            detector = cached.streaming_objects.get("swing_detector")
-            structure = list(cached.swings)
-            if not ctx:
-                 cached = None
+    def _advance(self, state: AnalysisState, candles: Iterable[Candle]) -> Optional[IndicatorState]:
+        """Feed bars through a cached state's streaming objects, in place."""
+        objects = state.streaming_objects
+        curr_ind = None
+        for c in candles:
+            curr_ind = objects["indicators"].update(c)
+            if objects.get("timeframes") is not None:
+                objects["timeframes"].update(c)
+            swing = objects["swing_detector"].update(c, state.bars_processed)
+            state.bars_processed += 1
+            if swing:
+                state.swings.append(swing)
+            state.last_updated = c.timestamp
+            state.last_price = c.close
 
-        if not cached:
-            process_candles = raw
-            full_hist = raw
-            ctx = Context()
-            detector = SwingDetector()
-            structure = []
+        if curr_ind is not None:
+            state.indicators = curr_ind
+        return curr_ind
+
+    def ingest(self, ticker: str, candle: Candle, final: bool = True) -> bool:
+        """Push one bar from a live feed. Returns whether the ticker's inputs changed.
 
+        Final bars advance the cached AnalysisState in place; the first bar for
+        a ticker backfills its buffer from DataIngestor. Changed tickers are
+        recomputed by refresh_dirty; non-final bars are evaluated provisionally
+        there and never enter the cached state.
+        """
+        with self._ticker_lock(ticker):
+            live = self.live.get(ticker)
+            if live is None:
+                live = CandleBuffer(ticker, self.lookback)
+                history = CandleSeries.from_candles(self.data.fetch_history(ticker, days=self.lookback) or [])
+                live.initialize_history(c for c in history if c.timestamp < candle.timestamp)
+                self.live[ticker] = live
+
+            if not live.update(candle, final):
+                return False
+
+            if final:
+                state = self.cache.peek(ticker)
+                if state and state.streaming_objects and candle.timestamp > state.last_updated:
+                    self._advance(state, [candle])
+
+        with self._lock:
+            self.dirty.add(ticker)
+        return True
+
+    def provisional_indicators(self, ticker: str) -> Optional[IndicatorState]:
+        """Indicators as if the ticker's forming bar closed now; the committed
+        values when there is none, and None before the first analysis."""
+        with self._ticker_lock(ticker):
+            state = self.cache.peek(ticker)
+            if state is None or not state.streaming_objects:
+                return None
+            live = self.live.get(ticker)
+            if live is None or live.partial is None or live.partial.timestamp <= state.last_updated:
+                return state.indicators
+            return state.streaming_objects["indicators"].peek(live.partial)
+
+    def refresh_dirty(self) -> Dict[str, Optional[AnalysisReport]]:
+        """Recompute reports only for tickers that received feed data since the last call."""
+        with self._lock:
+            dirty, self.dirty = self.dirty, set()
+        reports = {}
+        for ticker in sorted(dirty):
+            with self.instruments.begin(ticker) as trace:
+                try:
+                    # Held across the evaluation: the candle view is backed by the live ring buffer.
+                    with self._ticker_lock(ticker):
+                        live = self.live[ticker]
+                        reports[ticker] = self._evaluate(ticker, live.get_all_candles(), self.headlines.get(ticker, []),
+                                                         partial=live.partial, trace=trace)
+                except Exception as e:
+                    print(f"analysis error {ticker}: {e}")
+                    reports[ticker] = None
+        return reports
+
+    def _evaluate(self, ticker: str, raw: CandleSeries, headlines: List[str], replay: Optional[Replay] = None,
+                  partial: Optional[Candle] = None, trace: Trace = NULL_TRACE) -> Optional[AnalysisReport]:
+        with self._ticker_lock(ticker):
+            return self._evaluate_locked(ticker, raw, headlines, replay, partial, trace)
+
+    def _evaluate_locked(self, ticker: str, raw: CandleSeries, headlines: List[str], replay: Optional[Replay],
+                         partial: Optional[Candle], trace: Trace) -> Optional[AnalysisReport]:
+        # Expiry only marks the state as due a refresh; resuming from it beats replaying history.
+        cached = self.cache.get(ticker, allow_stale=True)
+        if cached is None and self.snapshots is not None:
+            cached = self.snapshots.load(ticker, allow_stale=True)
+
+        process_candles = []
+        full_hist = raw
         curr_ind = None
         last = None
 
-        for i, c in enumerate(process_candles):
-            curr_ind = ctx.update(c)
-            swing = detector.update(c, i)
-            if swing:
-                structure.append(swing)
-            last = c
+        if cached:
+            process_candles = raw.after(cached.last_updated)
+            if not cached.streaming_objects or not cached.streaming_objects.get("indicators"):
+                 cached = None
+
+        stage, count = trace.stage, trace.count
+        if not cached:
+            count("cache_miss")
+            count("candles_processed", len(raw))
+            if replay is None:
+                with stage("indicators"):
+                    ctx, curr_ind = Context.from_candles(raw)
+                with stage("swings"):
+                    detector, structure = replay_swings(raw)
+            else:
+                ctx, curr_ind, detector, structure = replay
+            # Kept sorted in the cached state so every report's level lookups bisect.
+            structure = SwingIndex(structure)
+            with stage("timeframes"):
+                timeframes = MultiTimeframe.from_candles(raw, self.timeframes)
+            processed = len(raw)
+            last = raw[-1]
+        else:
+            count("cache_hit")
+            count("candles_processed", len(process_candles))
+            count("candles_skipped", len(raw) - len(process_candles))
+            objects = cached.streaming_objects
+            if objects.get("timeframes") is None:
+                with stage("timeframes"):
+                    objects["timeframes"] = MultiTimeframe.from_candles(raw[:len(raw) - len(process_candles)], self.timeframes)
+            with stage("advance"):
+                curr_ind = self._advance(cached, process_candles)
+            ctx, detector, timeframes = objects["indicators"], objects["swing_detector"], objects["timeframes"]
+            structure = cached.swings
+            if raw:
+                # Same window a cold replay of `raw` would see; keeps the index bounded.
+                structure.prune_before(raw[0].timestamp)
+            processed = cached.bars_processed
+            if process_candles:
+                last = process_candles[-1]
 
         if not curr_ind:
             if cached:
@@ -154,62 +338,62 @@ class MarketAnalyzer:
             else:
                  return None
 
-        pats = self.patterns.detect_patterns(structure)
-        regime = self.regime.classify(curr_ind)
-
         avg_vol = last.volume
         if len(full_hist) > 0:
-             recent = full_hist[-20:]
-             avg_vol = sum(c.volume for c in recent) / len(recent)
-
-        change = last.close - last.open
-        vol_sig = self.volume.analyze(last, avg_vol, last.open, curr_ind.atr or 1.0)
-
-        headlines = self.news.fetch_headlines(ticker)
-        sent_sig = self.sentiment.analyze(headlines)
-
-        score = self.scoring.calculate_score(regime, pats, vol_sig, sent_sig, curr_ind)
-        rec = self.pos.recommend(score, regime, curr_ind, pats, last.close)
-
-        risk_dir = rec.type
-        risk_conf = rec.confidence
-
-        if risk_dir not in ["LONG", "SHORT"]:
-            risk_dir = "LONG"
-            risk_conf = 0.5
-            if regime == MarketRegime.BEAR_TREND:
-                risk_dir = "SHORT"
+             avg_vol = float(np.mean(full_hist.volume[-20:]))
 
         prev = full_hist[-2] if len(full_hist) >= 2 else None
 
-        # RiskManager.calculate_risk(price, atr, direction, confidence, swings, prev_candle)
-        risk_prof = self.risk.calculate_risk(last.close, curr_ind.atr or 0, risk_dir, risk_conf, structure, prev)
+        # A forming bar is evaluated against provisional indicator and swing
+        # values; the committed state below never sees it.
+        bar, bar_ind, bar_structure = last, curr_ind, structure
+        if partial is not None and partial.timestamp > last.timestamp:
+            prev, bar = last, partial
+            bar_ind = ctx.peek(partial)
+            swing = detector.update(partial, processed, final=False)
+            if swing:
+                bar_structure = structure.copy()
+                bar_structure.append(swing)
+            avg_vol = float(np.mean(np.append(full_hist.volume[-19:], partial.volume)))
 
-        stats = self.backtest.get_stats(pats, regime)
+        with stage("sentiment"):
+            sent_sig = self.sentiment.analyze(headlines)
+        d = self.decide(bar_ind, bar_structure, bar, prev, avg_vol, sent_sig, timeframes.states, trace)
+        pats, regime, vol_sig, score, rec, risk_prof, stats = (
+            d.patterns, d.regime, d.volume, d.score, d.recommendation, d.risk, d.stats)
 
+        # A warm state can be ahead of `raw` when the feed has pushed bars the
+        # history source doesn't have yet; never move it backwards.
         new_state = AnalysisState(
             ticker=ticker,
-            last_updated=datetime.now(),
+            last_updated=cached.last_updated if cached else last.timestamp,
             indicators=curr_ind,
             swings=structure,
             last_score=score,
             sentiment_score=sent_sig.score,
-            last_price=last.close,
+            last_price=cached.last_price if cached else last.close,
             streaming_objects={
                 "indicators": ctx,
-                "swing_detector": detector
-            }
+                "swing_detector": detector,
+                "timeframes": timeframes,
+            },
+            bars_processed=processed
         )
-        self.cache.put(ticker, new_state)
+        with stage("cache_put"):
+            self.cache.put(ticker, new_state)
+        if self.snapshots is not None:
+            with stage("snapshot"):
+                expires_at = self.cache.ttl(new_state, self.cache.clock()) if self.cache.ttl else None
+                self.snapshots.save(new_state, expires_at)
 
-        atr = curr_ind.atr or (last.close * 0.02)
-        low_ci = last.close - (2.0 * atr)
-        high_ci = last.close + (2.0 * atr)
+        atr = bar_ind.atr or (bar.close * 0.02)
+        low_ci = bar.close - (2.0 * atr)
+        high_ci = bar.close + (2.0 * atr)
 
         return AnalysisReport(
             ticker=ticker,
             timestamp=datetime.now(),
-            price=last.close,
+            price=bar.close,
             recommendation=rec.action,
             trade_type=rec.type,
             confidence=rec.confidence,
@@ -224,14 +408,17 @@ class MarketAnalyzer:
             sentiment_score=sent_sig.score,
             rationale=rec.rationale,
             entry_signal=rec.entry_signal,
-            trend_strength=f"ADX {curr_ind.adx:.1f}" if curr_ind.adx else "N/A",
+            trend_strength=f"ADX {bar_ind.adx:.1f}" if bar_ind.adx else "N/A",
             volume_status=vol_sig.status,
             volume_trend=vol_sig.trend,
             position_size_shares=risk_prof.suggested_shares,
             position_size_pct=risk_prof.max_position_size_pct,
             backtest_win_rate=stats.win_rate if stats else None,
             backtest_avg_move=stats.avg_move if stats else None,
-            swings=structure,
+            higher_timeframes=d.higher,
+            score=d.score,
+            indicators=bar_ind,
+            swings=list(bar_structure),
             candles=full_hist
         )
 
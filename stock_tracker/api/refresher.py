@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from stock_tracker.api.interface import AnalysisReport, MarketAnalyzer
+
+FigureBuilder = Callable[[AnalysisReport], Any]
+
+@dataclass
+class Entry:
+    report: AnalysisReport
+    figure: Any
+    key: Tuple
+    updated_at: float
+    version: int = 0
+
+def figure_key(report: AnalysisReport) -> Tuple:
+    """Everything the chart draws; the cached figure is rebuilt only when this changes."""
+    candles = report.candles
+    last = (candles.timestamp[-1], candles.close[-1]) if len(candles) else (None, None)
+    return (len(candles),) + last + (len(report.swings), report.target, report.stop_loss,
+                                     report.confidence_interval_low, report.confidence_interval_high)
+
+def summary_key(report: AnalysisReport) -> Tuple:
+    """The headline fields a watchlist row shows."""
+    return (report.price, report.recommendation, report.trade_type, report.score,
+            getattr(report.regime, "value", report.regime), report.risk_reward,
+            report.sentiment_summary, report.sentiment_score)
+
+def is_older(report: AnalysisReport, than: AnalysisReport) -> bool:
+    """True when `report` ends on an earlier bar than `than`, e.g. a slow
+    request finishing after the refresh thread stored a newer bar."""
+    if not len(report.candles) or not len(than.candles):
+        return False
+    return report.candles.timestamp[-1] < than.candles.timestamp[-1]
+
+class BackgroundRefresher:
+    """Keeps reports and built figures warm for a watchlist.
+
+    A daemon thread re-analyzes the watchlist every `interval` seconds through
+    analyze_many; with `live`, bars pushed via MarketAnalyzer.ingest are picked
+    up through refresh_dirty as well. Tickers outside the watchlist are queued
+    with `request` on a small worker pool so a slow fetch never blocks the caller.
+    """
+
+    def __init__(self, analyzer: MarketAnalyzer, build_figure: FigureBuilder, watchlist: Iterable[str] = (),
+                 interval: float = 60.0, live: bool = False, workers: int = 4):
+        self.analyzer = analyzer
+        self.build_figure = build_figure
+        self.watchlist = list(dict.fromkeys(t.upper() for t in watchlist))
+        self.interval = interval
+        self.live = live
+        self.entries: Dict[str, Entry] = {}
+        self.jobs: Dict[str, Future] = {}
+        self.errors: Dict[str, str] = {}
+        self.figures_built = 0
+
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, ticker: str) -> None:
+        with self._lock:
+            if ticker.upper() not in self.watchlist:
+                self.watchlist.append(ticker.upper())
+
+    def unwatch(self, ticker: str) -> None:
+        with self._lock:
+            if ticker.upper() in self.watchlist:
+                self.watchlist.remove(ticker.upper())
+
+    def get(self, ticker: str) -> Optional[Entry]:
+        with self._lock:
+            return self.entries.get(ticker.upper())
+
+    def stale(self, entry: Entry) -> bool:
+        """True once an entry is older than one refresh interval."""
+        return time.time() - entry.updated_at > self.interval
+
+    def store(self, report: Optional[AnalysisReport]) -> Optional[Entry]:
+        if report is None:
+            return None
+        key = figure_key(report)
+        with self._lock:
+            old = self.entries.get(report.ticker)
+        # Built outside the lock; whatever is current is re-checked before replacing it.
+        figure = old.figure if old is not None and old.key == key else None
+        built = figure is None
+        if built:
+            figure = self.build_figure(report)
+
+        with self._lock:
+            old = self.entries.get(report.ticker)
+            if old is not None and is_older(report, old.report):
+                return old
+            if old is not None and old.key == key:
+                figure = old.figure
+            self.figures_built += built
+
+            # version only moves when something visible changed, so views can skip unchanged tickers.
+            version = 0
+            if old is not None:
+                version = old.version + (figure is not old.figure or summary_key(old.report) != summary_key(report))
+            entry = self.entries[report.ticker] = Entry(report, figure, key, time.time(), version)
+        return entry
+
+    def refresh(self) -> int:
+        """Re-analyze the watchlist (and dirty live tickers) now. Returns reports stored."""
+        with self._lock:
+            tickers = list(self.watchlist)
+
+        stored = 0
+        for ticker, report in self.analyzer.analyze_many(tickers):
+            stored += self.store(report) is not None
+        if self.live:
+            for report in self.analyzer.refresh_dirty().values():
+                stored += self.store(report) is not None
+        return stored
+
+    def request(self, ticker: str) -> Future:
+        """Queue one analysis; concurrent requests for a ticker share a job."""
+        ticker = ticker.upper()
+        with self._lock:
+            job = self.jobs.get(ticker)
+            if job is None:
+                job = self.jobs[ticker] = self._pool.submit(self._run, ticker)
+        return job
+
+    def request_many(self, tickers: Iterable[str]) -> Future:
+        """Analyze several tickers concurrently through analyze_many on one
+        worker; each entry is stored as soon as its report completes."""
+        return self._pool.submit(self._run_many, [t.upper() for t in tickers])
+
+    def _run_many(self, tickers: List[str]) -> int:
+        stored = 0
+        for ticker, report in self.analyzer.analyze_many(tickers):
+            stored += self.store(report) is not None
+        return stored
+
+    def changed(self, seen: Dict[str, int], tickers: Optional[Iterable[str]] = None) -> List[Entry]:
+        """Entries for `tickers` (default: the watchlist) whose version differs from `seen`."""
+        with self._lock:
+            tickers = list(self.watchlist if tickers is None else tickers)
+            entries = [self.entries.get(t.upper()) for t in tickers]
+        return [e for e in entries if e is not None and seen.get(e.report.ticker) != e.version]
+
+    def pending(self, ticker: str) -> bool:
+        with self._lock:
+            return ticker.upper() in self.jobs
+
+    def _run(self, ticker: str) -> Optional[Entry]:
+        error = None
+        try:
+            return self.store(self.analyzer.analyze(ticker))
+        except Exception as e:
+            print(f"Error: {e}")
+            error = str(e)
+        finally:
+            with self._lock:
+                self.jobs.pop(ticker, None)
+                if error is None:
+                    self.errors.pop(ticker, None)
+                else:
+                    self.errors[ticker] = error
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"refresh error: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "BackgroundRefresher":
+        """Start the refresh thread; later calls are no-ops, so it is safe per request."""
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="dashboard-refresher", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,212 @@
+from bisect import bisect_left, insort
+from dataclasses import fields
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from stock_tracker.core.models import IndicatorState
+
+INDICATOR_FIELDS = tuple(f.name for f in fields(IndicatorState))
+NUMERIC_FIELDS = ("score", "price", "confidence", "risk_reward", "sentiment_score") + INDICATOR_FIELDS
+CATEGORICAL_FIELDS = ("regime", "recommendation", "trade_type", "volume_status", "volume_trend")
+
+Range = Tuple[Optional[float], Optional[float]]
+
+class Screener:
+    """Latest per-ticker analysis in a columnar table with incremental indexes.
+
+    Numeric fields are float64 columns (NaN when missing); fields listed in
+    `indexed` also keep a sorted (value, row) list, updated with bisect as
+    tickers refresh. Categorical fields and patterns keep value -> rows sets.
+    Queries intersect those and never rerun the analysis.
+    """
+
+    def __init__(self, analyzer=None, indexed: Sequence[str] = ("score", "rsi", "adx", "confidence"),
+                 initial_rows: int = 64):
+        self.analyzer = analyzer
+        self.rows: Dict[str, int] = {}
+        self.tickers: List[Optional[str]] = [None] * initial_rows
+        self._free: List[int] = []
+        self._next = 0
+
+        self.columns = {name: np.full(initial_rows, np.nan) for name in NUMERIC_FIELDS}
+        self.indexes: Dict[str, List[Tuple[float, int]]] = {name: [] for name in indexed}
+        self.categories: Dict[str, Dict[Any, Set[int]]] = {name: {} for name in CATEGORICAL_FIELDS}
+        self._row_categories: Dict[int, Dict[str, Any]] = {}
+        self.patterns: Dict[str, Set[int]] = {}
+        self._row_patterns: Dict[int, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.rows
+
+    def _alloc(self, ticker: str) -> int:
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = self._next
+            self._next += 1
+            if row == len(self.tickers):
+                grow = len(self.tickers)
+                self.tickers.extend([None] * grow)
+                for name, col in self.columns.items():
+                    self.columns[name] = np.concatenate((col, np.full(grow, np.nan)))
+        self.rows[ticker] = row
+        self.tickers[row] = ticker
+        return row
+
+    def _unindex(self, row: int) -> None:
+        for name, index in self.indexes.items():
+            val = self.columns[name][row]
+            if not np.isnan(val):
+                del index[bisect_left(index, (val, row))]
+        for name, val in self._row_categories.pop(row, {}).items():
+            self.categories[name][val].discard(row)
+        for p in self._row_patterns.pop(row, []):
+            self.patterns[p].discard(row)
+
+    def update(self, report: Any) -> None:
+        """Insert or replace a ticker's row from an AnalysisReport."""
+        row = self.rows.get(report.ticker)
+        if row is None:
+            row = self._alloc(report.ticker)
+        else:
+            self._unindex(row)
+
+        values = {
+            "score": getattr(report, "score", None),
+            "price": report.price,
+            "confidence": report.confidence,
+            "risk_reward": report.risk_reward,
+            "sentiment_score": report.sentiment_score,
+        }
+        indicators = getattr(report, "indicators", None)
+        for name in INDICATOR_FIELDS:
+            values[name] = getattr(indicators, name, None)
+        for name, val in values.items():
+            self.columns[name][row] = np.nan if val is None else val
+
+        for name, index in self.indexes.items():
+            val = self.columns[name][row]
+            if not np.isnan(val):
+                insort(index, (float(val), row))
+
+        cats = {
+            "regime": getattr(report.regime, "value", report.regime),
+            "recommendation": report.recommendation,
+            "trade_type": report.trade_type,
+            "volume_status": report.volume_status,
+            "volume_trend": report.volume_trend,
+        }
+        for name, val in cats.items():
+            self.categories[name].setdefault(val, set()).add(row)
+        self._row_categories[row] = cats
+
+        pats = list(dict.fromkeys(report.patterns))
+        for p in pats:
+            self.patterns.setdefault(p, set()).add(row)
+        self._row_patterns[row] = pats
+
+    def remove(self, ticker: str) -> None:
+        row = self.rows.pop(ticker, None)
+        if row is None:
+            return
+        self._unindex(row)
+        for col in self.columns.values():
+            col[row] = np.nan
+        self.tickers[row] = None
+        self._free.append(row)
+
+    def refresh(self, tickers: Iterable[str], **kwargs) -> None:
+        """Analyze tickers with the attached MarketAnalyzer and update their rows as they complete."""
+        for ticker, report in self.analyzer.analyze_many(tickers, **kwargs):
+            if report is not None:
+                self.update(report)
+
+    def refresh_dirty(self) -> None:
+        """Pull reports for tickers that received live bars since the last call."""
+        for report in self.analyzer.refresh_dirty().values():
+            if report is not None:
+                self.update(report)
+
+    def _range_rows(self, name: str, bounds: Range, candidates: Optional[Set[int]]) -> Set[int]:
+        lo, hi = bounds
+        index = self.indexes.get(name)
+        if index is not None:
+            start = 0 if lo is None else bisect_left(index, (lo, -1))
+            stop = len(index) if hi is None else bisect_left(index, (hi, -1))
+            found = {row for _, row in index[start:stop]}
+            return found if candidates is None else found & candidates
+
+        col = self.columns[name]
+        rows = np.fromiter(candidates, dtype=np.int64) if candidates is not None else np.arange(self._next)
+        vals = col[rows]
+        with np.errstate(invalid="ignore"):
+            mask = ~np.isnan(vals)
+            if lo is not None:
+                mask &= vals >= lo
+            if hi is not None:
+                mask &= vals < hi
+        return {int(r) for r in rows[mask] if self.tickers[r] is not None}
+
+    def query(self, order_by: str = "score", limit: Optional[int] = 50, descending: bool = True,
+              pattern: Optional[str] = None, **where: Any) -> List[str]:
+        """Tickers matching every filter, best first.
+
+        Categorical filters take a value (or enum), numeric filters a
+        (low, high) range with low <= value < high and either end None, and
+        `pattern` an exact pattern name, e.g.
+
+            query(regime="BULL_TREND", rsi=(None, 40), volume_status="SPIKE", limit=50)
+        """
+        sets: List[Set[int]] = []
+        for name, val in where.items():
+            if name in self.categories:
+                sets.append(self.categories[name].get(getattr(val, "value", val), set()))
+        if pattern is not None:
+            sets.append(self.patterns.get(pattern, set()))
+
+        candidates: Optional[Set[int]] = None
+        if sets:
+            sets.sort(key=len)
+            candidates = set(sets[0]).intersection(*sets[1:])
+
+        for name, bounds in where.items():
+            if name in self.categories:
+                continue
+            if name not in self.columns:
+                raise KeyError(f"unknown screener field {name!r}")
+            candidates = self._range_rows(name, bounds, candidates)
+
+        if candidates is None:
+            candidates = set(self.rows.values())
+
+        index = self.indexes.get(order_by)
+        if index is not None:
+            ordered = reversed(index) if descending else iter(index)
+            out = []
+            for _, row in ordered:
+                if row in candidates:
+                    out.append(self.tickers[row])
+                    if limit is not None and len(out) >= limit:
+                        break
+            return out
+
+        rows = np.fromiter(candidates, dtype=np.int64)
+        vals = self.columns[order_by][rows]
+        rows = rows[~np.isnan(vals)]
+        vals = vals[~np.isnan(vals)]
+        order = np.argsort(-vals if descending else vals, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+        return [self.tickers[r] for r in rows[order]]
+
+    def row(self, ticker: str) -> Dict[str, Any]:
+        r = self.rows[ticker]
+        out: Dict[str, Any] = {name: (None if np.isnan(col[r]) else float(col[r])) for name, col in self.columns.items()}
+        out.update(self._row_categories.get(r, {}))
+        out["patterns"] = list(self._row_patterns.get(r, []))
+        out["ticker"] = ticker
+        return out
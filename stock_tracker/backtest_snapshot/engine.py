@@ -1,6 +1,21 @@
-from dataclasses import dataclass
-from typing import Optional, List
-from stock_tracker.regime.classifier import MarketRegime
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.data.resample import HIGHER_TIMEFRAMES, MultiTimeframe
+from stock_tracker.indicators.batch import compute_all
+from stock_tracker.regime.classifier import REGIMES, MarketRegime, RegimeClassifier
+from stock_tracker.structure.patterns import PatternRecognizer
+from stock_tracker.structure.swings import SwingDetector
+
+INDEX_VERSION = 1
+
+BULLISH_KEYS = ("BOTTOM", "INVERSE")
 
 @dataclass
 class BacktestStats:
@@ -8,9 +23,137 @@ class BacktestStats:
     avg_move: float
     max_drawdown: float
     expectancy: float
+    samples: int = 0
+
+@dataclass
+class Occurrences:
+    """Pattern events for one ticker: the bar each pattern was confirmed on and
+    the regime at that bar, confirmed against higher timeframes as live."""
+    bars: np.ndarray
+    patterns: List[str]
+    regimes: np.ndarray
+
+def pattern_direction(pattern: str) -> int:
+    return 1 if any(k in pattern for k in BULLISH_KEYS) else -1
+
+def find_occurrences(candles: CandleSeries, detector: Optional[SwingDetector] = None,
+                     recognizer: Optional[PatternRecognizer] = None,
+                     classifier: Optional[RegimeClassifier] = None,
+                     timeframes: Iterable[str] = HIGHER_TIMEFRAMES) -> Occurrences:
+    detector = detector or SwingDetector()
+    recognizer = recognizer or PatternRecognizer()
+    classifier = classifier or RegimeClassifier()
+
+    series, _ = compute_all(candles.high, candles.low, candles.close, candles.volume)
+    regimes = classifier.classify_many(series["ema20"], series["ema50"], series["adx"])
+
+    higher = MultiTimeframe(timeframes)
+
+    bars: List[int] = []
+    names: List[str] = []
+    codes: List[int] = []
+    swings = []
+    for i, c in enumerate(candles):
+        higher.update(c)
+        swing = detector.update(c, i)
+        if not swing:
+            continue
+        swings.append(swing)
+        patterns = recognizer.detect_patterns(swings[-5:])
+        if not patterns:
+            continue
+        # Only bars with a pattern need the confirmed regime, so the higher-timeframe classify stays off the hot loop.
+        htf = [classifier.classify(ind) for ind in higher.states.values() if ind]
+        code = REGIMES.index(classifier.confirm(REGIMES[regimes[i]], htf))
+        for p in patterns:
+            bars.append(i)
+            names.append(p)
+            codes.append(code)
+
+    return Occurrences(np.asarray(bars, dtype=np.int64), names, np.asarray(codes, dtype=np.int8))
+
+def forward_outcomes(candles: CandleSeries, occ: Occurrences, horizon: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Signed N-bar return and worst adverse excursion per occurrence; returns (keep mask, returns, drawdowns)."""
+    close, high, low = candles.close, candles.high, candles.low
+    n = len(close)
+    keep = occ.bars + horizon < n
+    bars = occ.bars[keep]
+    if bars.size == 0:
+        return keep, np.empty(0), np.empty(0)
+
+    direction = np.array([pattern_direction(p) for p, k in zip(occ.patterns, keep) if k], dtype=np.float64)
+    entry = close[bars]
+    ret = direction * (close[bars + horizon] / entry - 1.0)
+
+    # Window i covers bars i+1 .. i+horizon.
+    lows = np.lib.stride_tricks.sliding_window_view(low[1:], horizon)[bars].min(axis=1)
+    highs = np.lib.stride_tricks.sliding_window_view(high[1:], horizon)[bars].max(axis=1)
+    adverse = np.where(direction > 0, 1.0 - lows / entry, highs / entry - 1.0)
+    return keep, ret, np.maximum(adverse, 0.0)
 
 class BacktestEngine:
+    """Pattern statistics per (pattern, regime), precomputed by `build_index`
+    from stored history. Keys without enough samples fall back to the prior table."""
+
+    def __init__(self, index: Optional[Dict[Tuple[str, str], BacktestStats]] = None,
+                 horizon: int = 10, min_samples: int = 5):
+        self.index = index or {}
+        self.horizon = horizon
+        self.min_samples = min_samples
+
+    def build_index(self, histories: Mapping[str, CandleSeries]) -> Dict[Tuple[str, str], BacktestStats]:
+        names: List[str] = []
+        regimes, returns, drawdowns = [], [], []
+        for ticker, candles in histories.items():
+            candles = CandleSeries.from_candles(candles)
+            if len(candles) <= self.horizon:
+                continue
+            occ = find_occurrences(candles)
+            keep, ret, dd = forward_outcomes(candles, occ, self.horizon)
+            names.extend(p for p, k in zip(occ.patterns, keep) if k)
+            regimes.append(occ.regimes[keep])
+            returns.append(ret)
+            drawdowns.append(dd)
+
+        self.index = {}
+        if not names:
+            return self.index
+
+        ret = np.concatenate(returns)
+        dd = np.concatenate(drawdowns)
+        labels, pattern_ids = np.unique(np.asarray(names), return_inverse=True)
+        keys, group = np.unique(pattern_ids.astype(np.int64) * len(REGIMES) + np.concatenate(regimes),
+                                return_inverse=True)
+
+        count = np.bincount(group)
+        wins = ret > 0
+        win_count = np.bincount(group, weights=wins)
+        win_sum = np.bincount(group, weights=np.where(wins, ret, 0.0))
+        total = np.bincount(group, weights=ret)
+        worst = np.zeros(keys.size)
+        np.maximum.at(worst, group, dd)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg_win = np.where(win_count > 0, win_sum / win_count, 0.0)
+
+        for k, key in enumerate(keys):
+            if count[k] < self.min_samples:
+                continue
+            pattern = str(labels[key // len(REGIMES)])
+            regime = REGIMES[key % len(REGIMES)].value
+            self.index[(pattern, regime)] = BacktestStats(
+                float(win_count[k] / count[k]), float(avg_win[k]), float(worst[k]),
+                float(total[k] / count[k]), int(count[k]))
+        return self.index
+
     def get_stats(self, patterns: List[str], regime: MarketRegime) -> Optional[BacktestStats]:
+        for p in patterns:
+            stats = self.index.get((p, regime.value))
+            if stats is not None:
+                return stats
+        return self._prior(patterns, regime)
+
+    def _prior(self, patterns: List[str], regime: MarketRegime) -> Optional[BacktestStats]:
         win_rate = 0.50
         avg_move = 0.02
         drawdown = 0.02
@@ -53,3 +196,45 @@ class BacktestEngine:
 
         exp = (win_rate * avg_move) - ((1 - win_rate) * drawdown)
         return BacktestStats(win_rate, avg_move, drawdown, exp)
+
+    def save(self, path: str) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "horizon": self.horizon,
+            "min_samples": self.min_samples,
+            "stats": [{"pattern": p, "regime": r, **asdict(s)} for (p, r), s in self.index.items()],
+        }
+        root = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "BacktestEngine":
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+
+        if data.get("version") != INDEX_VERSION:
+            print(f"ignoring backtest index {path}: unsupported version {data.get('version')}")
+            return cls()
+
+        index = {}
+        for row in data["stats"]:
+            key = (row.pop("pattern"), row.pop("regime"))
+            index[key] = BacktestStats(**row)
+        return cls(index, data["horizon"], data["min_samples"])
+
+def build_from_store(store, symbols: Iterable[str], horizon: int = 10, min_samples: int = 5) -> BacktestEngine:
+    """Index every symbol in an OHLCVStore."""
+    engine = BacktestEngine(horizon=horizon, min_samples=min_samples)
+    engine.build_index({s: store.read(s) for s in symbols})
+    return engine
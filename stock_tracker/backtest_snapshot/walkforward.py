@@ -0,0 +1,183 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from stock_tracker.core.models import Candle
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.data.resample import MultiTimeframe
+from stock_tracker.pipeline.decision import Decision, DecisionChain, replay_history
+from stock_tracker.sentiment.analyzer import SentimentSignal
+from stock_tracker.structure.swings import SwingIndex
+
+# No point-in-time news archive, so historical bars score sentiment as neutral.
+NEUTRAL_SENTIMENT = SentimentSignal(0.0, "no historical news", 0.0)
+
+@dataclass
+class Trade:
+    ticker: str
+    direction: str
+    shares: int
+    entry_time: datetime
+    entry_price: float
+    stop_loss: float
+    target: float
+    exit_time: Optional[datetime] = None
+    exit_price: Optional[float] = None
+    exit_reason: str = ""
+
+    @property
+    def pnl(self) -> float:
+        if self.exit_price is None:
+            return 0.0
+        sign = 1.0 if self.direction == "LONG" else -1.0
+        return sign * (self.exit_price - self.entry_price) * self.shares
+
+@dataclass
+class WalkForwardResult:
+    ticker: str
+    trades: List[Trade] = field(default_factory=list)
+    timestamps: np.ndarray = field(default_factory=lambda: np.empty(0, dtype="datetime64[us]"))
+    equity: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    def summary(self) -> Dict[str, float]:
+        pnl = np.array([t.pnl for t in self.trades])
+        peak = np.maximum.accumulate(self.equity) if self.equity.size else self.equity
+        drawdown = float(np.max(1.0 - self.equity / peak)) if self.equity.size else 0.0
+        return {
+            "trades": len(self.trades),
+            "win_rate": float(np.mean(pnl > 0)) if pnl.size else 0.0,
+            "total_pnl": float(pnl.sum()),
+            "max_drawdown": drawdown,
+        }
+
+def replay_decisions(analyzer: DecisionChain, candles: Sequence[Candle],
+                     warmup: int = 200) -> Iterator[Tuple[int, Candle, Decision]]:
+    """Drive the full decision chain bar by bar after a batch warmup.
+
+    Indicator, swing and higher-timeframe state is carried forward
+    incrementally, so each bar costs one streaming update rather than a
+    recompute of the history, and regimes are confirmed exactly as live.
+    """
+    bars = CandleSeries.from_candles(candles)
+    if len(bars) <= warmup:
+        return
+
+    ctx, _, detector, swings = replay_history(bars[:warmup])
+    structure = SwingIndex(swings)
+    timeframes = MultiTimeframe.from_candles(bars[:warmup], analyzer.timeframes)
+    vol_sum = np.concatenate(([0.0], np.cumsum(bars.volume)))
+
+    prev = bars[warmup - 1]
+    for i in range(warmup, len(bars)):
+        c = bars[i]
+        ind = ctx.update(c)
+        swing = detector.update(c, i)
+        if swing:
+            structure.append(swing)
+        timeframes.update(c)
+
+        lo = max(0, i - 19)
+        avg_vol = (vol_sum[i + 1] - vol_sum[lo]) / (i + 1 - lo)
+        yield i, c, analyzer.decide(ind, structure, c, prev, avg_vol, NEUTRAL_SENTIMENT, timeframes.states)
+        prev = c
+
+def simulate(ticker: str, candles: Sequence[Candle], analyzer: Optional[DecisionChain] = None,
+             warmup: int = 200, capital: float = 100000.0) -> WalkForwardResult:
+    """One position at a time: enter at the close of a BUY/SELL bar with the
+    RiskProfile stop and target, exit on stop, target or an opposite signal."""
+    analyzer = analyzer or DecisionChain()
+    bars = CandleSeries.from_candles(candles)
+    result = WalkForwardResult(ticker)
+    if len(bars) <= warmup:
+        return result
+
+    equity = np.empty(len(bars) - warmup)
+    realized = capital
+    open_trade: Optional[Trade] = None
+
+    for i, c, d in replay_decisions(analyzer, bars, warmup):
+        if open_trade is not None:
+            t = open_trade
+            long = t.direction == "LONG"
+            stopped = c.low <= t.stop_loss if long else c.high >= t.stop_loss
+            hit = c.high >= t.target if long else c.low <= t.target
+            flip = d.recommendation.action == ("SELL" if long else "BUY")
+
+            # Stops are checked first and fill at the open when the bar gaps through.
+            if stopped:
+                fill = min(c.open, t.stop_loss) if long else max(c.open, t.stop_loss)
+                reason = "STOP"
+            elif hit:
+                fill = max(c.open, t.target) if long else min(c.open, t.target)
+                reason = "TARGET"
+            elif flip:
+                fill, reason = c.close, "SIGNAL"
+
+            if stopped or hit or flip:
+                t.exit_time, t.exit_price, t.exit_reason = c.timestamp, fill, reason
+                realized += t.pnl
+                open_trade = None
+
+        if open_trade is None and d.recommendation.action in ("BUY", "SELL") and d.risk.suggested_shares > 0:
+            open_trade = Trade(ticker, "LONG" if d.recommendation.action == "BUY" else "SHORT",
+                               d.risk.suggested_shares, c.timestamp, c.close, d.risk.stop_loss, d.risk.target)
+            result.trades.append(open_trade)
+
+        mark = realized
+        if open_trade is not None:
+            sign = 1.0 if open_trade.direction == "LONG" else -1.0
+            mark += sign * (c.close - open_trade.entry_price) * open_trade.shares
+        equity[i - warmup] = mark
+
+    if open_trade is not None:
+        last = bars[-1]
+        open_trade.exit_time, open_trade.exit_price, open_trade.exit_reason = last.timestamp, last.close, "END"
+
+    result.timestamps = bars.dates()[warmup:].copy()
+    result.equity = equity
+    return result
+
+def _run_shard(items: List[Tuple[str, CandleSeries]], warmup: int, capital: float) -> List[WalkForwardResult]:
+    analyzer = DecisionChain()
+    return [simulate(t, bars, analyzer, warmup, capital) for t, bars in items]
+
+def _run_store_shard(root: str, symbols: List[str], warmup: int, capital: float) -> List[WalkForwardResult]:
+    from stock_tracker.data.archive import OHLCVStore
+    store = OHLCVStore(root)
+    analyzer = DecisionChain()
+    return [simulate(s, store.read(s), analyzer, warmup, capital) for s in symbols]
+
+def _shards(items: List, n: int) -> List[List]:
+    return [items[i::n] for i in range(n) if items[i::n]]
+
+def run_walk_forward(histories: Mapping[str, Sequence[Candle]], process_workers: int = 0,
+                     warmup: int = 200, capital: float = 100000.0) -> Dict[str, WalkForwardResult]:
+    items = [(t, CandleSeries.from_candles(c)) for t, c in histories.items()]
+    if not process_workers:
+        return {r.ticker: r for r in _run_shard(items, warmup, capital)}
+
+    results: Dict[str, WalkForwardResult] = {}
+    with ProcessPoolExecutor(max_workers=process_workers) as pool:
+        futures = [pool.submit(_run_shard, shard, warmup, capital) for shard in _shards(items, process_workers)]
+        for fut in futures:
+            results.update((r.ticker, r) for r in fut.result())
+    return results
+
+def run_walk_forward_store(root: str, symbols: Iterable[str], process_workers: int = 4,
+                           warmup: int = 200, capital: float = 100000.0) -> Dict[str, WalkForwardResult]:
+    """Like run_walk_forward, but workers map their symbols from the OHLCVStore
+    at `root` themselves, so no price history is pickled between processes."""
+    symbols = list(symbols)
+    if not process_workers:
+        return {r.ticker: r for r in _run_store_shard(root, symbols, warmup, capital)}
+
+    results: Dict[str, WalkForwardResult] = {}
+    with ProcessPoolExecutor(max_workers=process_workers) as pool:
+        futures = [pool.submit(_run_store_shard, root, shard, warmup, capital)
+                   for shard in _shards(symbols, process_workers * 4)]
+        for fut in futures:
+            results.update((r.ticker, r) for r in fut.result())
+    return results
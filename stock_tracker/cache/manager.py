@@ -1,34 +1,215 @@
-from collections import OrderedDict
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Optional, List
-from stock_tracker.core.models import IndicatorState, SwingPoint
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+from stock_tracker.core.models import IndicatorState
+from stock_tracker.structure.swings import SwingIndex
+
+try:
+    from zoneinfo import ZoneInfo
+    MARKET_TZ = ZoneInfo("America/New_York")
+except Exception:
+    MARKET_TZ = timezone(timedelta(hours=-5))
+
+MARKET_CLOSE_HOUR = 16
+# Daily bars from stooq settle a few hours after the close.
+SETTLE_HOURS = 3
 
 @dataclass
 class AnalysisState:
     ticker: str
     last_updated: datetime
     indicators: IndicatorState
-    swings: List[SwingPoint]
+    swings: SwingIndex
     last_score: float
     sentiment_score: Optional[float] = None
     last_price: Optional[float] = None
     streaming_objects: Optional[Any] = None
+    bars_processed: int = 0
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """Rough deep size in bytes; shared objects are counted once."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return sys.getsizeof(obj, 64) if getattr(obj, "base", None) is not None else nbytes + 112
+
+    size = sys.getsizeof(obj, 64)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None), datetime)):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(estimate_size(v, seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        size += estimate_size(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += estimate_size(getattr(obj, slot), seen)
+    return size
+
+def next_session_expiry(now: float) -> float:
+    """Epoch seconds at which the next daily bar has settled (weekday close + SETTLE_HOURS, New York)."""
+    local = datetime.fromtimestamp(now, MARKET_TZ)
+    expiry = local.replace(hour=MARKET_CLOSE_HOUR, minute=0, second=0, microsecond=0) + timedelta(hours=SETTLE_HOURS)
+    while expiry <= local or expiry.weekday() >= 5:
+        expiry = (expiry + timedelta(days=1)).replace(hour=MARKET_CLOSE_HOUR + SETTLE_HOURS)
+    return expiry.timestamp()
+
+def market_session_ttl(value: Any, now: float) -> Optional[float]:
+    return next_session_expiry(now)
 
 class LRUCache:
-    def __init__(self, max_len: int = 50):
-        self.max_len = max_len
-        self.cache = OrderedDict()
-
-    def get(self, key: str) -> Optional[AnalysisState]:
-        if key not in self.cache:
-            return None
-        self.cache.move_to_end(key)
-        return self.cache[key]
-
-    def put(self, key: str, value: AnalysisState) -> None:
-        if key in self.cache:
+    """LRU bounded by entry count and, optionally, estimated bytes.
+
+    `ttl(value, now)` returns the absolute expiry for a new entry. Expired
+    entries are misses for `get` but stay available through
+    `get(key, allow_stale=True)` until evicted or replaced. Safe to share
+    between threads.
+    """
+
+    def __init__(self, capacity: int = 50, max_bytes: Optional[int] = None,
+                 ttl: Optional[Callable[[Any, float], Optional[float]]] = None,
+                 clock: Callable[[], float] = time.time):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.bytes = 0
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.cache
+
+    def is_fresh(self, key: str) -> bool:
+        with self._lock:
+            entry = self.cache.get(key)
+        return entry is not None and (entry.expires_at is None or entry.expires_at > self.clock())
+
+    def peek(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self.cache.get(key)
+        return entry.value if entry else None
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            if entry.expires_at is not None and entry.expires_at <= self.clock() and not allow_stale:
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
             self.cache.move_to_end(key)
-        self.cache[key] = value
-        if len(self.cache) > self.max_len:
-            self.cache.popitem(last=False)
+            self.stats.hits += 1
+            return entry.value
+
+    def put(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        now = self.clock()
+        if ttl_seconds is not None:
+            expires_at = now + ttl_seconds
+        elif self.ttl is not None:
+            expires_at = self.ttl(value, now)
+        else:
+            expires_at = None
+
+        size = estimate_size(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            old = self.cache.pop(key, None)
+            if old is not None:
+                self.bytes -= old.size
+
+            self.cache[key] = _Entry(value, size, expires_at)
+            self.bytes += size
+            self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        while len(self.cache) > self.capacity or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            key = next(iter(self.cache))
+            if key == keep:
+                break
+            entry = self.cache.pop(key)
+            self.bytes -= entry.size
+            self.stats.evictions += 1
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self.cache.pop(key, None)
+            if entry is None:
+                return None
+            self.bytes -= entry.size
+            return entry.value
+
+class SingleFlight:
+    """Concurrent calls for the same key share one execution.
+
+    The first caller runs `fn`; callers arriving while it is in flight block
+    and receive the same result, or the same exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.shared = 0
+
+    def claim(self, key: str) -> Tuple[Future, bool]:
+        """The in-flight call for `key`, and whether this caller leads it.
+
+        A leader must complete the call with `settle`; followers wait on it.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                return call, False
+            call = self._calls[key] = Future()
+            return call, True
+
+    def settle(self, key: str, call: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        if error is None:
+            call.set_result(result)
+        else:
+            call.set_exception(error)
+        with self._lock:
+            del self._calls[key]
+
+    def do(self, key: str, fn: Callable[..., Any], *args: Any) -> Any:
+        call, leader = self.claim(key)
+        if leader:
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                self.settle(key, call, error=e)
+            else:
+                self.settle(key, call, result)
+        return call.result()
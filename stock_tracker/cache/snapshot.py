@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from stock_tracker.cache.manager import AnalysisState
+from stock_tracker.core.models import IndicatorState
+from stock_tracker.data.resample import MultiTimeframe
+from stock_tracker.indicators.context import Context
+from stock_tracker.structure.swings import SwingDetector, SwingIndex, swing_from_dict, swing_to_dict
+
+SNAPSHOT_VERSION = 1
+
+def encode_state(state: AnalysisState, expires_at: Optional[float] = None) -> Dict[str, Any]:
+    objects = state.streaming_objects or {}
+    streaming = {
+        "indicators": objects["indicators"].to_state(),
+        "swing_detector": objects["swing_detector"].to_state(),
+    }
+    if objects.get("timeframes") is not None:
+        streaming["timeframes"] = objects["timeframes"].to_state()
+    return {
+        "version": SNAPSHOT_VERSION,
+        "ticker": state.ticker,
+        "saved_at": time.time(),
+        "expires_at": expires_at,
+        "last_updated": state.last_updated.isoformat(),
+        "bars_processed": state.bars_processed,
+        "indicators": asdict(state.indicators),
+        "swings": [swing_to_dict(s) for s in state.swings],
+        "last_score": state.last_score,
+        "sentiment_score": state.sentiment_score,
+        "last_price": state.last_price,
+        "streaming": streaming,
+    }
+
+def decode_state(data: Dict[str, Any]) -> AnalysisState:
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {data.get('version')}")
+
+    streaming = data["streaming"]
+    return AnalysisState(
+        ticker=data["ticker"],
+        last_updated=datetime.fromisoformat(data["last_updated"]),
+        indicators=IndicatorState(**data["indicators"]),
+        swings=SwingIndex(swing_from_dict(s) for s in data["swings"]),
+        last_score=data["last_score"],
+        sentiment_score=data["sentiment_score"],
+        last_price=data["last_price"],
+        streaming_objects={
+            "indicators": Context.from_state(streaming["indicators"]),
+            "swing_detector": SwingDetector.from_state(streaming["swing_detector"]),
+            "timeframes": MultiTimeframe.from_state(streaming["timeframes"]) if "timeframes" in streaming else None,
+        },
+        bars_processed=data["bars_processed"],
+    )
+
+class SnapshotStore:
+    """One JSON snapshot per ticker. Floats are written with repr, so a
+    restored state produces bit-identical outputs. `expires_at` only says the
+    state is due a refresh; an expired snapshot still resumes from its last bar
+    when loaded with `allow_stale`."""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, ticker: str) -> str:
+        safe = ticker.upper().replace("/", "_").replace("^", "IDX_")
+        return os.path.join(self.root, f"{safe}.json")
+
+    def save(self, state: AnalysisState, expires_at: Optional[float] = None) -> None:
+        payload = json.dumps(encode_state(state, expires_at), separators=(",", ":"))
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(payload)
+            os.replace(tmp, self.path(state.ticker))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def load(self, ticker: str, allow_stale: bool = False) -> Optional[AnalysisState]:
+        try:
+            with open(self.path(ticker)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        expires_at = data.get("expires_at")
+        if not allow_stale and expires_at is not None and expires_at <= time.time():
+            return None
+
+        try:
+            return decode_state(data)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"bad snapshot for {ticker}: {e}")
+            return None
+
+    def delete(self, ticker: str) -> None:
+        try:
+            os.remove(self.path(ticker))
+        except OSError:
+            pass
@@ -0,0 +1,253 @@
+import math
+from dataclasses import fields
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from stock_tracker.core.models import Candle, IndicatorState
+
+_MIN_ALLOC = 16
+
+
+def to_epoch_us(ts: datetime) -> int:
+    return int(np.datetime64(ts, "us").astype(np.int64))
+
+
+def from_epoch_us(value: int) -> datetime:
+    return np.datetime64(int(value), "us").astype(datetime)
+
+
+class ColumnRing:
+    """Named, equally long numpy columns over a shared window of a larger buffer.
+
+    Appends are amortised O(1). When `capacity` is set the oldest row is dropped
+    once full. The live window is always contiguous, so column reads and slices
+    are views; compaction allocates fresh buffers so earlier views stay valid.
+    """
+
+    FIELDS: Tuple[Tuple[str, type], ...] = ()
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity
+        alloc = max(_MIN_ALLOC, 2 * capacity) if capacity else _MIN_ALLOC
+        self._cols: Dict[str, np.ndarray] = {name: np.empty(alloc, dtype=dt) for name, dt in self.FIELDS}
+        self._start = 0
+        self._end = 0
+        self._owns = True
+
+    @classmethod
+    def _wrap(cls, cols: Dict[str, np.ndarray], start: int, end: int,
+              capacity: Optional[int] = None, owns: bool = False):
+        obj = cls.__new__(cls)
+        obj.capacity = capacity
+        obj._cols = cols
+        obj._start = start
+        obj._end = end
+        obj._owns = owns
+        return obj
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def column(self, name: str) -> np.ndarray:
+        return self._cols[name][self._start:self._end]
+
+    def _reserve(self) -> None:
+        n = len(self)
+        if self.capacity:
+            alloc = max(_MIN_ALLOC, 2 * self.capacity)
+        else:
+            alloc = max(_MIN_ALLOC, 2 * n)
+
+        cols = {}
+        for name, dt in self.FIELDS:
+            buf = np.empty(alloc, dtype=dt)
+            buf[:n] = self._cols[name][self._start:self._end]
+            cols[name] = buf
+
+        self._cols = cols
+        self._start = 0
+        self._end = n
+        self._owns = True
+
+    def _append_row(self, values: Sequence) -> None:
+        if not self._owns:
+            self._reserve()
+        if self.capacity and len(self) >= self.capacity:
+            self._start += 1 + len(self) - self.capacity
+        if self._end == len(self._cols[self.FIELDS[0][0]]):
+            self._reserve()
+
+        i = self._end
+        for (name, _), val in zip(self.FIELDS, values):
+            self._cols[name][i] = val
+        self._end += 1
+
+    def _index(self, idx: int) -> int:
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if idx < 0 or idx >= n:
+            raise IndexError("index out of range")
+        return self._start + idx
+
+    def _slice(self, key: slice):
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            cols = {name: self.column(name)[key].copy() for name, _ in self.FIELDS}
+            return self._wrap(cols, 0, len(cols[self.FIELDS[0][0]]))
+        stop = max(start, stop)
+        return self._wrap(self._cols, self._start + start, self._start + stop)
+
+    def nbytes(self) -> int:
+        return sum(buf.nbytes for buf in self._cols.values())
+
+
+class CandleSeries(ColumnRing):
+    FIELDS = (
+        ("timestamp", np.int64),
+        ("open", np.float64),
+        ("high", np.float64),
+        ("low", np.float64),
+        ("close", np.float64),
+        ("volume", np.float64),
+    )
+
+    @classmethod
+    def from_arrays(cls, timestamp: np.ndarray, open: np.ndarray, high: np.ndarray,
+                    low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                    capacity: Optional[int] = None) -> "CandleSeries":
+        if np.issubdtype(np.asarray(timestamp).dtype, np.datetime64):
+            timestamp = np.asarray(timestamp).astype("datetime64[us]").astype(np.int64)
+
+        arrays = (timestamp, open, high, low, close, volume)
+        cols = {name: np.ascontiguousarray(arr, dtype=dt) for (name, dt), arr in zip(cls.FIELDS, arrays)}
+        n = len(cols["close"])
+        if capacity and n > capacity:
+            cols = {name: arr[n - capacity:] for name, arr in cols.items()}
+            n = capacity
+        return cls._wrap(cols, 0, n, capacity=capacity)
+
+    @classmethod
+    def from_candles(cls, candles: Iterable[Candle], capacity: Optional[int] = None) -> "CandleSeries":
+        if isinstance(candles, CandleSeries) and capacity is None:
+            return candles
+        if isinstance(candles, CandleSeries):
+            return candles[-capacity:].copy(capacity=capacity)
+
+        series = cls(capacity)
+        for c in candles:
+            series.append(c)
+        return series
+
+    def append(self, candle: Candle) -> None:
+        self._append_row((to_epoch_us(candle.timestamp), candle.open, candle.high,
+                          candle.low, candle.close, candle.volume))
+
+    def extend(self, candles: Iterable[Candle]) -> None:
+        for c in candles:
+            self.append(c)
+
+    def copy(self, capacity: Optional[int] = None) -> "CandleSeries":
+        return CandleSeries.from_arrays(*(self.column(name).copy() for name, _ in self.FIELDS),
+                                        capacity=capacity if capacity is not None else self.capacity)
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self.column("timestamp")
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.column("open")
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.column("high")
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.column("low")
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column("close")
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.column("volume")
+
+    def dates(self) -> np.ndarray:
+        return self.timestamp.view("datetime64[us]")
+
+    def candle(self, idx: int) -> Candle:
+        i = self._index(idx)
+        c = self._cols
+        return Candle(
+            timestamp=from_epoch_us(c["timestamp"][i]),
+            open=float(c["open"][i]),
+            high=float(c["high"][i]),
+            low=float(c["low"][i]),
+            close=float(c["close"][i]),
+            volume=float(c["volume"][i]),
+        )
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Candle, "CandleSeries"]:
+        if isinstance(key, slice):
+            return self._slice(key)
+        return self.candle(key)
+
+    def after(self, ts: datetime) -> "CandleSeries":
+        mask = self.timestamp > to_epoch_us(ts)
+        cols = {name: self.column(name)[mask] for name, _ in self.FIELDS}
+        return self._wrap(cols, 0, int(mask.sum()))
+
+    def __iter__(self) -> Iterator[Candle]:
+        rows = zip(self.dates().astype(object), self.open.tolist(), self.high.tolist(),
+                   self.low.tolist(), self.close.tolist(), self.volume.tolist())
+        for ts, o, h, l, c, v in rows:
+            yield Candle(ts, o, h, l, c, v)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"CandleSeries(len={len(self)}, capacity={self.capacity})"
+
+
+class IndicatorHistory(ColumnRing):
+    """One float64 column per IndicatorState field; missing values are NaN."""
+
+    FIELDS = tuple((f.name, np.float64) for f in fields(IndicatorState))
+    NAMES = tuple(name for name, _ in FIELDS)
+
+    def append(self, state: IndicatorState) -> None:
+        self._append_row([math.nan if v is None else v for v in map(state.__getattribute__, self.NAMES)])
+
+    def state(self, idx: int) -> IndicatorState:
+        i = self._index(idx)
+        values = (float(self._cols[name][i]) for name in self.NAMES)
+        return IndicatorState(*(None if math.isnan(v) else v for v in values))
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: self.column(name) for name in self.NAMES}
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        if name in IndicatorHistory.NAMES:
+            return self.column(name)
+        raise AttributeError(name)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[IndicatorState, "IndicatorHistory"]:
+        if isinstance(key, slice):
+            return self._slice(key)
+        return self.state(key)
+
+    def __iter__(self) -> Iterator[IndicatorState]:
+        for i in range(len(self)):
+            yield self.state(i)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __repr__(self) -> str:
+        return f"IndicatorHistory(len={len(self)}, capacity={self.capacity})"
@@ -0,0 +1,101 @@
+import os
+import threading
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from stock_tracker.core.series import CandleSeries, from_epoch_us
+
+MAGIC = b"STKOHLCV"
+VERSION = 1
+HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("reserved", "<u4")])
+RECORD = np.dtype([
+    ("timestamp", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+class OHLCVStore:
+    """Append-only per-symbol bar files, read back through np.memmap.
+
+    Each file is a small header followed by fixed-size little-endian records in
+    timestamp order. A torn trailing record from an interrupted append is
+    ignored on read and overwritten by the next append.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path(self, symbol: str) -> str:
+        safe = symbol.upper().replace("/", "_").replace("^", "IDX_")
+        return os.path.join(self.root, f"{safe}.ohlcv")
+
+    def _records(self, symbol: str) -> Optional[np.ndarray]:
+        path = self.path(symbol)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+
+        count = (size - HEADER.itemsize) // RECORD.itemsize
+        if count <= 0:
+            return None
+
+        header = np.fromfile(path, dtype=HEADER, count=1)
+        if header["magic"][0] != MAGIC or header["version"][0] != VERSION:
+            print(f"unsupported bar file {path}")
+            return None
+
+        return np.memmap(path, dtype=RECORD, mode="r", offset=HEADER.itemsize, shape=(count,))
+
+    def count(self, symbol: str) -> int:
+        records = self._records(symbol)
+        return 0 if records is None else len(records)
+
+    def last_timestamp(self, symbol: str) -> Optional[datetime]:
+        records = self._records(symbol)
+        if records is None:
+            return None
+        return from_epoch_us(records["timestamp"][-1])
+
+    def read(self, symbol: str, tail: Optional[int] = None) -> CandleSeries:
+        records = self._records(symbol)
+        if records is None:
+            return CandleSeries()
+        if tail is not None:
+            records = records[-tail:]
+        return CandleSeries.from_arrays(*(records[name] for name, _ in CandleSeries.FIELDS))
+
+    def append(self, symbol: str, bars: CandleSeries) -> int:
+        bars = CandleSeries.from_candles(bars)
+        with self._lock:
+            records = self._records(symbol)
+            if records is not None:
+                bars = bars[int(np.searchsorted(bars.timestamp, records["timestamp"][-1], side="right")):]
+            if not bars:
+                return 0
+
+            out = np.empty(len(bars), dtype=RECORD)
+            for name, _ in CandleSeries.FIELDS:
+                out[name] = bars.column(name)
+
+            path = self.path(symbol)
+            if records is None:
+                header = np.zeros(1, dtype=HEADER)
+                header["magic"] = MAGIC
+                header["version"] = VERSION
+                with open(path, "wb") as f:
+                    f.write(header.tobytes())
+                    f.write(out.tobytes())
+            else:
+                with open(path, "r+b") as f:
+                    f.seek(HEADER.itemsize + len(records) * RECORD.itemsize)
+                    f.write(out.tobytes())
+                    f.truncate()
+            return len(out)
@@ -0,0 +1,93 @@
+import json
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Tuple
+
+from stock_tracker.core.models import Candle
+
+Bar = Tuple[str, Candle, bool]
+
+FINAL_FLAGS = {"1": True, "true": True, "final": True, "0": False, "false": False, "partial": False}
+
+def parse_bar(line: str) -> Optional[Bar]:
+    """One bar per line, either CSV
+
+        TICKER,timestamp,open,high,low,close,volume[,final|partial]
+
+    or a JSON object with the same keys. Returns None for blank, header
+    or malformed lines.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    try:
+        if line.startswith("{"):
+            d = json.loads(line)
+            fields = [d["ticker"], d["timestamp"], d["open"], d["high"], d["low"], d["close"], d["volume"]]
+            flag = d.get("final", True)
+            # Real JSON booleans pass through; strings go through the same flags as CSV.
+            final = FINAL_FLAGS[flag.lower()] if isinstance(flag, str) else bool(flag)
+        else:
+            parts = [p.strip() for p in line.split(",")]
+            fields = parts[:7]
+            final = FINAL_FLAGS[parts[7].lower()] if len(parts) > 7 else True
+
+        ticker, ts, o, h, l, c, v = fields
+        candle = Candle(datetime.fromisoformat(ts), float(o), float(h), float(l), float(c), float(v))
+        return ticker.upper(), candle, final
+    except (KeyError, ValueError, TypeError):
+        return None
+
+def tail_file(path: str, poll_interval: float = 0.5, stop: Optional[threading.Event] = None,
+              from_start: bool = True) -> Iterator[str]:
+    """Follow a growing file like `tail -f`, yielding complete lines only."""
+    with open(path, "r") as f:
+        if not from_start:
+            f.seek(0, 2)
+        pending = ""
+        while not (stop and stop.is_set()):
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            pending += chunk
+            if pending.endswith("\n"):
+                yield pending
+                pending = ""
+
+def socket_lines(host: str, port: int, stop: Optional[threading.Event] = None,
+                 timeout: float = 1.0) -> Iterator[str]:
+    """Newline-delimited lines from a TCP feed until the peer closes or `stop` is set."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.settimeout(timeout)
+        buf = b""
+        while not (stop and stop.is_set()):
+            try:
+                data = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            buf += data
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                yield line.decode("utf-8", "replace")
+
+def run_feed(analyzer, lines: Iterable[str], refresh_interval: float = 1.0,
+             clock=time.monotonic) -> Iterator[Tuple[str, object]]:
+    """Push parsed bars into `analyzer.ingest` and, at most every
+    `refresh_interval` seconds, yield (ticker, report) for tickers that changed."""
+    next_refresh = clock() + refresh_interval
+    for line in lines:
+        bar = parse_bar(line)
+        if bar is not None:
+            analyzer.ingest(*bar)
+
+        if clock() >= next_refresh:
+            next_refresh = clock() + refresh_interval
+            yield from analyzer.refresh_dirty().items()
+
+    yield from analyzer.refresh_dirty().items()
@@ -1,65 +1,139 @@
-import requests
-import pandas as pd
+import os
+import time
+import numpy as np
 import io
 from datetime import datetime, timedelta
-from typing import List
-from stock_tracker.core.models import Candle
+from typing import Dict, Optional
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.data.archive import OHLCVStore
+from stock_tracker.net.transport import HttpTransport, default_transport
 
 buffer_mult = 2
 
+REQUIRED_COLUMNS = ["Date", "Open", "High", "Low", "Close", "Volume"]
+
+def _tail_lines(content: str, n: int) -> str:
+    content = content.rstrip()
+    header_end = content.find("\n")
+    if header_end < 0:
+        return content
+
+    pos = len(content)
+    for _ in range(n):
+        pos = content.rfind("\n", header_end, pos)
+        if pos <= header_end:
+            return content
+    return content[:header_end] + content[pos:]
+
+def select_window(series: CandleSeries, days: Optional[int], now: Optional[datetime] = None) -> CandleSeries:
+    if days is None or not series:
+        return series
+
+    end_date = now or datetime.now()
+    start_date = end_date - timedelta(days=days * buffer_mult)
+    ts = series.dates()
+    lo = int(np.searchsorted(ts, np.datetime64(start_date, "us"), side="left"))
+    hi = int(np.searchsorted(ts, np.datetime64(end_date, "us"), side="right"))
+    return series[max(lo, hi - days):hi]
+
+def parse_history(content: str, days: Optional[int] = 300, now: Optional[datetime] = None) -> CandleSeries:
+    import pandas as pd
+
+    if days is not None:
+        content = _tail_lines(content, days * buffer_mult)
+
+    df = pd.read_csv(io.StringIO(content))
+    if df.empty or any(col not in df.columns for col in REQUIRED_COLUMNS):
+        return CandleSeries()
+
+    dates = pd.to_datetime(df["Date"], format="%Y-%m-%d", errors="coerce")
+    ts = dates.to_numpy(dtype="datetime64[us]", na_value=np.datetime64("NaT"))
+    prices = [pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64)
+              for col in REQUIRED_COLUMNS[1:]]
+
+    mask = ~np.isnat(ts)
+    for col in prices:
+        mask &= np.isfinite(col)
+
+    idx = np.flatnonzero(mask)
+    idx = idx[np.argsort(ts[idx], kind="stable")]
+
+    series = CandleSeries.from_arrays(ts[idx], *(col[idx] for col in prices))
+    return select_window(series, days, now)
+
 class DataIngestor:
-    def fetch_history(self, ticker: str, days: int = 300) -> List[Candle]:
+    def __init__(self, store: Optional[OHLCVStore] = None, refresh_interval: float = 900.0,
+                 transport: Optional[HttpTransport] = None):
+        if store is None and os.environ.get("STOCK_TRACKER_DATA_DIR"):
+            store = OHLCVStore(os.path.join(os.environ["STOCK_TRACKER_DATA_DIR"], "ohlcv"))
+
+        self.store = store
+        self.http = transport or default_transport()
+        self.refresh_interval = refresh_interval
+        self._refreshed: Dict[str, float] = {}
+
+    def _symbol(self, ticker: str) -> str:
         symbol = ticker.upper()
         if not symbol.endswith(".US") and not symbol.startswith("^"):
              symbol = f"{symbol}.US"
-        
+        return symbol
+
+    def _download(self, ticker: str, symbol: str, since: Optional[datetime] = None) -> Optional[str]:
         url = f"https://stooq.com/q/d/l/?s={symbol}&i=d"
-        
-        try:
-            headers = {"User-Agent": "Mozilla/5.0 (compatible; StockTracker/1.0)"}
-            response = requests.get(url, headers=headers, timeout=10)
-            
-            if response.status_code != 200:
-                print(f"http error {response.status_code} for {ticker}")
-                return []
-            
-            content = response.content.decode('utf-8')
-            if "Date,Open,High,Low,Close" not in content and "Date" not in content:
+        if since is not None:
+            start = since + timedelta(days=1)
+            url += f"&d1={start:%Y%m%d}&d2={datetime.now():%Y%m%d}"
+
+        response = self.http.get(url, timeout=10)
+
+        if response.status_code != 200:
+            print(f"http error {response.status_code} for {ticker}")
+            return None
+
+        content = response.text
+        if "Date,Open,High,Low,Close" not in content and "Date" not in content:
+            # An incremental request past the last bar legitimately has no rows.
+            if since is None:
                 print(f"invalid data for {ticker}")
-                return []
-                
-            df = pd.read_csv(io.StringIO(content))
-            
-            if df.empty:
-                return []
-
-            df['Date'] = pd.to_datetime(df['Date'])
-            
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days * buffer_mult)
-            df = df[(df['Date'] >= start_date) & (df['Date'] <= end_date)]
-            df = df.sort_values('Date')
-            
-            candles = []
-            for _, row in df.iterrows():
-                try:
-                    c = Candle(
-                        timestamp=row['Date'].to_pydatetime(),
-                        open=float(row['Open']),
-                        high=float(row['High']),
-                        low=float(row['Low']),
-                        close=float(row['Close']),
-                        volume=float(row['Volume'])
-                    )
-                    candles.append(c)
-                except Exception:
-                    continue
-            
-            if len(candles) > days:
-                return candles[-days:]
-                
-            return candles
-            
+            return None
+
+        return content
+
+    def fetch_history(self, ticker: str, days: int = 300) -> CandleSeries:
+        symbol = self._symbol(ticker)
+
+        if self.store is not None:
+            try:
+                self.refresh(ticker)
+            except Exception as e:
+                print(f"refresh error {ticker}: {e}")
+            return select_window(self.store.read(symbol, tail=days * buffer_mult), days)
+
+        try:
+            content = self._download(ticker, symbol)
+            if content is None:
+                return CandleSeries()
+
+            return parse_history(content, days)
+
         except Exception as e:
             print(f"fetch error {ticker}: {e}")
-            return []
+            return CandleSeries()
+
+    def refresh(self, ticker: str, force: bool = False) -> int:
+        symbol = self._symbol(ticker)
+        now = time.monotonic()
+        last_check = self._refreshed.get(symbol)
+        if not force and last_check is not None and now - last_check < self.refresh_interval:
+            return 0
+
+        content = self._download(ticker, symbol, since=self.store.last_timestamp(symbol))
+        self._refreshed[symbol] = now
+        if content is None:
+            return 0
+        return self.store.append(symbol, parse_history(content, days=None))
+
+    def ingest(self, ticker: str, bars: CandleSeries) -> int:
+        if self.store is None:
+            return 0
+        return self.store.append(self._symbol(ticker), bars)
@@ -0,0 +1,191 @@
+import re
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from stock_tracker.core.models import Candle, IndicatorState
+from stock_tracker.core.series import CandleSeries, from_epoch_us, to_epoch_us
+from stock_tracker.indicators.context import Context
+
+DAY_US = 86_400_000_000
+MINUTE_US = 60_000_000
+
+Bucket = Callable[[Any], Any]
+
+# Timeframes whose trend confirms the daily regime. 300 daily bars give ~60
+# weekly bars, enough for weekly EMA50/ADX; a monthly frame would stay UNKNOWN.
+HIGHER_TIMEFRAMES = ("W",)
+
+def week_start(ts_us):
+    """Monday 00:00 of the week containing ts_us (1970-01-01 was a Thursday)."""
+    days = ts_us // DAY_US
+    return (days - (days + 3) % 7) * DAY_US
+
+def month_start(ts_us):
+    months = np.asarray(ts_us).astype("datetime64[us]").astype("datetime64[M]")
+    return months.astype("datetime64[us]").astype(np.int64)
+
+def minute_bucket(n: int) -> Bucket:
+    width = n * MINUTE_US
+    return lambda ts_us: ts_us - ts_us % width
+
+def bucket_fn(spec: str) -> Bucket:
+    """"W", "M" or "<n>min". Buckets map epoch microseconds (scalar or array) to the bucket start."""
+    if spec == "W":
+        return week_start
+    if spec == "M":
+        return month_start
+    m = re.fullmatch(r"(\d+)min", spec)
+    if m and int(m.group(1)) > 0:
+        return minute_bucket(int(m.group(1)))
+    raise ValueError(f"unknown timeframe {spec!r}")
+
+class Resampler:
+    """Streaming OHLCV aggregation into one timeframe, O(1) per bar.
+
+    `update` returns the finished bar when an incoming bar opens a new
+    bucket; `current` is the bar still forming. Bars are stamped with their
+    bucket start.
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        self.bucket = bucket_fn(spec)
+        self.key: Optional[int] = None
+        self.open = self.high = self.low = self.close = 0.0
+        self.volume = 0.0
+
+    def _start(self, key: int, candle: Candle) -> None:
+        self.key = key
+        self.open, self.high, self.low, self.close = candle.open, candle.high, candle.low, candle.close
+        self.volume = candle.volume
+
+    def update(self, candle: Candle) -> Optional[Candle]:
+        key = int(self.bucket(to_epoch_us(candle.timestamp)))
+        if self.key is None:
+            self._start(key, candle)
+            return None
+
+        if key != self.key:
+            done = self.current()
+            self._start(key, candle)
+            return done
+
+        self.high = max(self.high, candle.high)
+        self.low = min(self.low, candle.low)
+        self.close = candle.close
+        self.volume += candle.volume
+        return None
+
+    def current(self) -> Optional[Candle]:
+        if self.key is None:
+            return None
+        return Candle(from_epoch_us(self.key), self.open, self.high, self.low, self.close, self.volume)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"spec": self.spec, "key": self.key, "open": self.open, "high": self.high,
+                "low": self.low, "close": self.close, "volume": self.volume}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Resampler":
+        r = cls(state["spec"])
+        for name in ("key", "open", "high", "low", "close", "volume"):
+            setattr(r, name, state[name])
+        return r
+
+def resample(candles: Sequence[Candle], spec: str) -> Tuple[CandleSeries, Resampler]:
+    """Aggregate a whole series in one pass. Returns the finished bars and a
+    Resampler holding the last, possibly incomplete, bucket."""
+    bars = CandleSeries.from_candles(candles)
+    resampler = Resampler(spec)
+    if not bars:
+        return CandleSeries(), resampler
+
+    keys = resampler.bucket(bars.timestamp)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    ends = np.concatenate((starts[1:], [len(bars)]))
+
+    agg = CandleSeries.from_arrays(
+        keys[starts],
+        bars.open[starts],
+        np.maximum.reduceat(bars.high, starts),
+        np.minimum.reduceat(bars.low, starts),
+        bars.close[ends - 1],
+        np.add.reduceat(bars.volume, starts),
+    )
+
+    last = agg[-1]
+    resampler._start(int(keys[starts[-1]]), last)
+    return agg[:-1], resampler
+
+def downsample(bars: CandleSeries, max_points: int) -> CandleSeries:
+    """OHLC-preserving level-of-detail reduction to at most `max_points` bars.
+
+    Runs of equal length are merged (first open, max high, min low, last
+    close, summed volume, stamped with the first bar). Buckets are aligned to
+    the end so the newest bar always closes a bucket. That also means appended
+    bars shift the older bucket boundaries (they can only stay put when exactly
+    `width` bars are appended), so callers re-downsample rather than patch an
+    earlier result.
+    """
+    n = len(bars)
+    if n <= max_points:
+        return bars
+
+    width = -(-n // max_points)
+    starts = np.maximum(n - width * np.arange(-(-n // width), 0, -1), 0)
+    ends = np.concatenate((starts[1:], [n]))
+
+    return CandleSeries.from_arrays(
+        bars.timestamp[starts],
+        bars.open[starts],
+        np.maximum.reduceat(bars.high, starts),
+        np.minimum.reduceat(bars.low, starts),
+        bars.close[ends - 1],
+        np.add.reduceat(bars.volume, starts),
+    )
+
+class MultiTimeframe:
+    """Higher-timeframe indicators driven from the base series.
+
+    Each timeframe has its own Resampler and Context. Indicators only see
+    finished higher-timeframe bars, so nothing leaks from a bucket still forming.
+    """
+
+    def __init__(self, specs: Iterable[str] = ("W", "M")):
+        self.specs = tuple(specs)
+        self.frames = {spec: Resampler(spec) for spec in self.specs}
+        self.contexts = {spec: Context() for spec in self.specs}
+        self.states: Dict[str, Optional[IndicatorState]] = {spec: None for spec in self.specs}
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[Candle], specs: Iterable[str] = ("W", "M")) -> "MultiTimeframe":
+        mtf = cls(specs)
+        for spec in mtf.specs:
+            finished, mtf.frames[spec] = resample(candles, spec)
+            mtf.contexts[spec], mtf.states[spec] = Context.from_candles(finished)
+        return mtf
+
+    def update(self, candle: Candle) -> Dict[str, Optional[IndicatorState]]:
+        for spec in self.specs:
+            done = self.frames[spec].update(candle)
+            if done is not None:
+                self.states[spec] = self.contexts[spec].update(done)
+        return self.states
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "specs": list(self.specs),
+            "frames": {s: r.to_state() for s, r in self.frames.items()},
+            "contexts": {s: c.to_state() for s, c in self.contexts.items()},
+            "states": {s: asdict(st) if st else None for s, st in self.states.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "MultiTimeframe":
+        mtf = cls(state["specs"])
+        mtf.frames = {s: Resampler.from_state(r) for s, r in state["frames"].items()}
+        mtf.contexts = {s: Context.from_state(c) for s, c in state["contexts"].items()}
+        mtf.states = {s: IndicatorState(**st) if st else None for s, st in state["states"].items()}
+        return mtf
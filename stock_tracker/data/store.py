@@ -1,47 +1,88 @@
-from collections import deque
-from typing import List, Optional, Deque
+import warnings
+from typing import Iterable, List, Optional, Tuple
 from stock_tracker.core.models import Candle, IndicatorState, SwingPoint
-from stock_tracker.indicators.streaming import EMA, RSI, ATR, MACD, VWAP
-from stock_tracker.structure.swings import SwingDetector
+from stock_tracker.core.series import CandleSeries, IndicatorHistory
+from stock_tracker.indicators.context import Context
+from stock_tracker.structure.swings import SwingDetector, SwingIndex
+
+def _latest(field: str) -> property:
+    # Former per-indicator attributes; kept read-only over the latest values.
+    def get(self) -> Optional[float]:
+        warnings.warn(f"TickerData.{field} is deprecated; use get_latest_indicators().{field}",
+                      DeprecationWarning, stacklevel=2)
+        state = self.get_latest_indicators()
+        return getattr(state, field) if state else None
+    return property(get)
+
+class CandleBuffer:
+    """The last `max_len` committed bars for a ticker plus the bar still forming."""
 
-class TickerData:
     def __init__(self, ticker: str, max_len: int = 300):
         self.ticker = ticker
         self.max_len = max_len
-        self.candles: Deque[Candle] = deque(maxlen=max_len)
-        self.indicator_history: Deque[IndicatorState] = deque(maxlen=max_len)
+        self.candles = CandleSeries(capacity=max_len)
+        self.partial: Optional[Candle] = None
+
+    def add_candle(self, candle: Candle):
+        self.candles.append(candle)
+
+    def update(self, candle: Candle, final: bool = True) -> bool:
+        """Push a bar from a feed; returns whether anything changed.
+
+        Non-final bars are held as `partial` until the final version arrives.
+        Bars at or before the last committed timestamp are ignored.
+        """
+        last = self.get_latest_candle()
+        if last is not None and candle.timestamp <= last.timestamp:
+            return False
+
+        if not final:
+            if candle == self.partial:
+                return False
+            self.partial = candle
+            return True
+
+        self.partial = None
+        self.add_candle(candle)
+        return True
+
+    def initialize_history(self, candles: Iterable[Candle]):
+        for c in candles:
+            self.add_candle(c)
+
+    def get_latest_candle(self) -> Optional[Candle]:
+        return self.candles[-1] if self.candles else None
 
-        self.ema20 = EMA(20)
-        self.ema50 = EMA(50)
-        self.ema200 = EMA(200)
-        self.rsi = RSI(14)
-        self.atr = ATR(14)
-        self.macd = MACD()
-        self.vwap = VWAP()
+    def get_all_candles(self) -> CandleSeries:
+        return self.candles[:]
+
+class TickerData(CandleBuffer):
+    def __init__(self, ticker: str, max_len: int = 300):
+        super().__init__(ticker, max_len)
+        self.indicator_history = IndicatorHistory(capacity=max_len)
+        self.indicators = Context()
 
         self.swing_detector = SwingDetector()
-        self.swings: List[SwingPoint] = []
+        self.swings = SwingIndex()
         self.candle_count = 0
 
+    ema20 = _latest("ema20")
+    ema50 = _latest("ema50")
+    ema200 = _latest("ema200")
+    rsi = _latest("rsi")
+    atr = _latest("atr")
+    vwap = _latest("vwap")
+
+    @property
+    def macd(self) -> Optional[Tuple[Optional[float], Optional[float], Optional[float]]]:
+        warnings.warn("TickerData.macd is deprecated; use get_latest_indicators().macd_line/macd_signal/macd_hist",
+                      DeprecationWarning, stacklevel=2)
+        state = self.get_latest_indicators()
+        return (state.macd_line, state.macd_signal, state.macd_hist) if state else None
+
     def add_candle(self, candle: Candle):
-        self.candles.append(candle)
-        c = candle.close
-
-        e20 = self.ema20.update(c)
-        e50 = self.ema50.update(c)
-        e200 = self.ema200.update(c)
-        rsi = self.rsi.update(c)
-        atr = self.atr.update(candle.high, candle.low, c)
-        m, s, h = self.macd.update(c)
-        vwap = self.vwap.update(candle.high, candle.low, c, candle.volume)
-
-        state = IndicatorState(
-            ema20=e20, ema50=e50, ema200=e200,
-            rsi=rsi, atr=atr,
-            macd_line=m, macd_signal=s, macd_hist=h,
-            vwap=vwap
-        )
-        self.indicator_history.append(state)
+        super().add_candle(candle)
+        self.indicator_history.append(self.indicators.update(candle))
 
         swing = self.swing_detector.update(candle, self.candle_count)
         if swing:
@@ -50,25 +91,19 @@ class TickerData:
         self.candle_count += 1
 
         if len(self.candles) == self.max_len:
-             oldest = self.candles[0].timestamp
-             while self.swings and self.swings[0].timestamp < oldest:
-                 self.swings.pop(0)
-
-    def initialize_history(self, candles: List[Candle]):
-        for c in candles:
-            self.add_candle(c)
-
-    def get_latest_candle(self) -> Optional[Candle]:
-        return self.candles[-1] if self.candles else None
+             self.swings.prune_before(self.candles[0].timestamp)
 
     def get_latest_indicators(self) -> Optional[IndicatorState]:
         return self.indicator_history[-1] if self.indicator_history else None
 
-    def get_all_candles(self) -> List[Candle]:
-        return list(self.candles)
+    def get_provisional_indicators(self) -> Optional[IndicatorState]:
+        """Indicators as if the partial bar closed now; falls back to the last committed values."""
+        if self.partial is None:
+            return self.get_latest_indicators()
+        return self.indicators.peek(self.partial)
 
-    def get_all_indicators(self) -> List[IndicatorState]:
-        return list(self.indicator_history)
+    def get_all_indicators(self) -> IndicatorHistory:
+        return self.indicator_history[:]
 
     def get_swings(self) -> List[SwingPoint]:
         return list(self.swings)
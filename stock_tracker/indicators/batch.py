@@ -0,0 +1,313 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import math
+
+import numpy as np
+
+from stock_tracker.indicators.streaming import EMA, RSI, ATR, MACD, VWAP, OBV, BollingerBands, ADX
+
+# Keeps decay ** -block inside ~1e12 so the blocked closed form stays well conditioned.
+_MAX_BLOCK = 256
+_MAX_SCALE_DIGITS = 12.0
+
+
+@lru_cache(maxsize=64)
+def _block_weights(decay: float) -> Tuple[np.ndarray, np.ndarray]:
+    block = int(_MAX_SCALE_DIGITS / -math.log10(decay)) if decay < 1.0 else _MAX_BLOCK
+    block = max(1, min(_MAX_BLOCK, block))
+
+    steps = np.arange(block, dtype=np.float64)
+    grow = decay ** -steps
+    shrink = decay ** steps
+    grow.flags.writeable = False
+    shrink.flags.writeable = False
+    return grow, shrink
+
+
+def ewm(values: np.ndarray, alpha: float, init: float) -> np.ndarray:
+    """y[t] = y[t-1] + alpha * (x[t] - y[t-1]) with y[-1] = init, solved in blocks."""
+    x = np.asarray(values, dtype=np.float64)
+    out = np.empty_like(x)
+    if x.size == 0:
+        return out
+
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+
+    grow, shrink = _block_weights(decay)
+    block = grow.size
+
+    prev = float(init)
+    for start in range(0, x.size, block):
+        chunk = x[start:start + block]
+        k = chunk.size
+        acc = np.cumsum(chunk * grow[:k]) * alpha * shrink[:k]
+        acc += prev * decay * shrink[:k]
+        out[start:start + k] = acc
+        prev = float(acc[-1])
+
+    return out
+
+
+def ema_series(prices: np.ndarray, period: int) -> Tuple[np.ndarray, EMA]:
+    x = np.asarray(prices, dtype=np.float64)
+    ema = EMA(period)
+    out = np.empty_like(x)
+    if x.size == 0:
+        return out, ema
+
+    out[0] = x[0]
+    out[1:] = ewm(x[1:], ema.multiplier, x[0])
+    ema.value = float(out[-1])
+    return out, ema
+
+
+def _wilder(values: np.ndarray, period: int) -> Tuple[np.ndarray, float]:
+    """SMA seed over the first `period` values, then Wilder smoothing; NaN before the seed."""
+    out = np.full(values.size, np.nan)
+    seed = float(np.sum(values[:period])) / period
+    out[period - 1] = seed
+    out[period:] = ewm(values[period:], 1.0 / period, seed)
+    return out, seed
+
+
+def rsi_series(prices: np.ndarray, period: int = 14) -> Tuple[np.ndarray, RSI]:
+    x = np.asarray(prices, dtype=np.float64)
+    rsi = RSI(period)
+    out = np.full(x.size, np.nan)
+    if x.size == 0:
+        return out, rsi
+
+    rsi.last_price = float(x[-1])
+    change = np.diff(x)
+    gain = np.maximum(change, 0.0)
+    loss = np.maximum(-change, 0.0)
+
+    if change.size < period:
+        rsi.count = int(change.size)
+        rsi.accum_gain = float(np.sum(gain))
+        rsi.accum_loss = float(np.sum(loss))
+        return out, rsi
+
+    avg_gain, _ = _wilder(gain, period)
+    avg_loss, _ = _wilder(loss, period)
+    avg_gain = avg_gain[period - 1:]
+    avg_loss = avg_loss[period - 1:]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vals = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+    flat = avg_loss == 0
+    vals[flat] = np.where(avg_gain[flat] > 0, 100.0, 50.0)
+    out[period:] = vals
+
+    rsi.count = period
+    rsi.accum_gain = float(np.sum(gain[:period]))
+    rsi.accum_loss = float(np.sum(loss[:period]))
+    rsi.avg_gain = float(avg_gain[-1])
+    rsi.avg_loss = float(avg_loss[-1])
+    rsi.value = float(out[-1])
+    return out, rsi
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    tr = high - low
+    if tr.size > 1:
+        prev = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - prev), np.abs(low[1:] - prev)))
+    return tr
+
+
+def atr_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> Tuple[np.ndarray, ATR]:
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    atr = ATR(period)
+    out = np.full(c.size, np.nan)
+    if c.size == 0:
+        return out, atr
+
+    tr = true_range(h, l, c)
+    atr.last_close = float(c[-1])
+
+    if tr.size < period:
+        atr.count = int(tr.size)
+        atr.accum_tr = float(np.sum(tr))
+        return out, atr
+
+    out, _ = _wilder(tr, period)
+    atr.count = period
+    atr.accum_tr = float(np.sum(tr[:period]))
+    atr.value = float(out[-1])
+    return out, atr
+
+
+def macd_series(prices: np.ndarray, fast_period: int = 12, slow_period: int = 26,
+                signal_period: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray, MACD]:
+    x = np.asarray(prices, dtype=np.float64)
+    macd = MACD(fast_period, slow_period, signal_period)
+    fast, macd.fast_ema = ema_series(x, fast_period)
+    slow, macd.slow_ema = ema_series(x, slow_period)
+    line = fast - slow
+    signal, macd.signal_ema = ema_series(line, signal_period)
+    hist = line - signal
+
+    if x.size:
+        macd.macd_line = float(line[-1])
+        macd.signal_line = float(signal[-1])
+        macd.histogram = float(hist[-1])
+    return line, signal, hist, macd
+
+
+def vwap_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> Tuple[np.ndarray, VWAP]:
+    typical = (np.asarray(high, dtype=np.float64) + low + close) / 3
+    v = np.asarray(volume, dtype=np.float64)
+    vwap = VWAP()
+    cum_vol = np.cumsum(v)
+    cum_vp = np.cumsum(typical * v)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(cum_vol > 0, cum_vp / cum_vol, typical)
+
+    if v.size:
+        vwap.cum_vol = float(cum_vol[-1])
+        vwap.cum_vol_price = float(cum_vp[-1])
+        vwap.value = float(out[-1])
+    return out, vwap
+
+
+def obv_series(close: np.ndarray, volume: np.ndarray) -> Tuple[np.ndarray, OBV]:
+    c = np.asarray(close, dtype=np.float64)
+    v = np.asarray(volume, dtype=np.float64)
+    obv = OBV()
+    signed = np.zeros_like(v)
+    if c.size > 1:
+        signed[1:] = np.sign(np.diff(c)) * v[1:]
+    out = np.cumsum(signed)
+
+    if c.size:
+        obv.value = float(out[-1])
+        obv.last_close = float(c[-1])
+    return out, obv
+
+
+def bollinger_series(prices: np.ndarray, period: int = 20, std_dev: float = 2.0
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, BollingerBands]:
+    x = np.asarray(prices, dtype=np.float64)
+    bb = BollingerBands(period, std_dev)
+    upper = np.full(x.size, np.nan)
+    lower = np.full(x.size, np.nan)
+    basis = np.full(x.size, np.nan)
+    width = np.full(x.size, np.nan)
+
+    window = x[-period:]
+    bb.prices = deque((float(p) for p in window), maxlen=period)
+    bb.sum_price = float(np.sum(window))
+    bb.sum_sq_price = float(np.sum(window * window))
+
+    if x.size < period:
+        return upper, lower, basis, width, bb
+
+    windows = np.lib.stride_tricks.sliding_window_view(x, period)
+    mean = windows.sum(axis=1) / period
+    variance = (windows * windows).sum(axis=1) / period - mean * mean
+    std = np.sqrt(np.maximum(variance, 0.0))
+
+    basis[period - 1:] = mean
+    upper[period - 1:] = mean + std_dev * std
+    lower[period - 1:] = mean - std_dev * std
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width[period - 1:] = np.where(mean != 0, (upper[period - 1:] - lower[period - 1:]) / mean, 0.0)
+
+    bb.basis = float(basis[-1])
+    bb.upper = float(upper[-1])
+    bb.lower = float(lower[-1])
+    bb.width = float(width[-1])
+    return upper, lower, basis, width, bb
+
+
+def adx_series(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> Tuple[np.ndarray, ADX]:
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    adx = ADX(period)
+    out = np.full(c.size, np.nan)
+    if c.size == 0:
+        return out, adx
+
+    adx.last_high = float(h[-1])
+    adx.last_low = float(l[-1])
+    adx.last_close = float(c[-1])
+
+    tr = true_range(h, l, c)[1:]
+    up = h[1:] - h[:-1]
+    down = l[:-1] - l[1:]
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+
+    if tr.size < period:
+        adx.count = int(tr.size)
+        adx.accum_tr = float(np.sum(tr))
+        adx.accum_plus = float(np.sum(plus_dm))
+        adx.accum_minus = float(np.sum(minus_dm))
+        return out, adx
+
+    s_tr, _ = _wilder(tr, period)
+    s_plus, _ = _wilder(plus_dm, period)
+    s_minus, _ = _wilder(minus_dm, period)
+    s_plus = s_plus[period - 1:]
+    s_minus = s_minus[period - 1:]
+
+    total = s_plus + s_minus
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dx = np.where(total != 0, np.abs(s_plus - s_minus) / total * 100, 0.0)
+
+    smoothed = np.empty_like(dx)
+    smoothed[0] = dx[0]
+    smoothed[1:] = ewm(dx[1:], 1.0 / period, dx[0])
+    out[period:] = smoothed
+
+    adx.count = period
+    adx.accum_tr = float(np.sum(tr[:period]))
+    adx.accum_plus = float(np.sum(plus_dm[:period]))
+    adx.accum_minus = float(np.sum(minus_dm[:period]))
+    adx.smooth_atr = float(s_tr[-1])
+    adx.smooth_plus = float(s_plus[-1])
+    adx.smooth_minus = float(s_minus[-1])
+    adx.adx_smooth = float(smoothed[-1])
+    adx.value = adx.adx_smooth
+    return out, adx
+
+
+def compute_all(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray
+                ) -> Tuple[Dict[str, np.ndarray], Dict[str, object]]:
+    """Full indicator series keyed like IndicatorState, plus streaming objects seeded at the last bar."""
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    v = np.asarray(volume, dtype=np.float64)
+
+    series: Dict[str, np.ndarray] = {}
+    objects: Dict[str, object] = {}
+
+    series["ema20"], objects["ema20"] = ema_series(c, 20)
+    series["ema50"], objects["ema50"] = ema_series(c, 50)
+    series["ema200"], objects["ema200"] = ema_series(c, 200)
+    series["rsi"], objects["rsi"] = rsi_series(c, 14)
+    series["atr"], objects["atr"] = atr_series(h, l, c, 14)
+    series["macd_line"], series["macd_signal"], series["macd_hist"], objects["macd"] = macd_series(c)
+    series["vwap"], objects["vwap"] = vwap_series(h, l, c, v)
+    series["upper_bollinger"], series["lower_bollinger"], _, series["bollinger_width"], objects["bb"] = bollinger_series(c, 20, 2.0)
+    series["adx"], objects["adx"] = adx_series(h, l, c, 14)
+    series["obv"], objects["obv"] = obv_series(c, v)
+
+    return series, objects
+
+
+def last_value(series: np.ndarray) -> Optional[float]:
+    if series.size == 0:
+        return None
+    val = float(series[-1])
+    return None if math.isnan(val) else val
@@ -0,0 +1,76 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+from stock_tracker.core.models import Candle, IndicatorState
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.indicators.streaming import EMA, RSI, ATR, MACD, VWAP, OBV, BollingerBands, ADX
+from stock_tracker.indicators import batch
+
+class Context:
+    INDICATORS = {
+        "ema20": EMA, "ema50": EMA, "ema200": EMA, "rsi": RSI, "atr": ATR,
+        "macd": MACD, "vwap": VWAP, "obv": OBV, "bb": BollingerBands, "adx": ADX,
+    }
+
+    def __init__(self):
+        self.ema20 = EMA(20)
+        self.ema50 = EMA(50)
+        self.ema200 = EMA(200)
+        self.rsi = RSI(14)
+        self.atr = ATR(14)
+        self.macd = MACD()
+        self.vwap = VWAP()
+        self.obv = OBV()
+        self.bb = BollingerBands(20, 2.0)
+        self.adx = ADX(14)
+
+    def update(self, candle: Candle, final: bool = True) -> IndicatorState:
+        """Advance on a closed bar, or with final=False compute provisional
+        values for a forming bar without changing any state."""
+        p = candle.close
+        h, l, c, v = candle.high, candle.low, candle.close, candle.volume
+
+        e20 = self.ema20.update(p, final)
+        e50 = self.ema50.update(p, final)
+        e200 = self.ema200.update(p, final)
+        rsi = self.rsi.update(p, final)
+        atr = self.atr.update(h, l, c, final)
+        m, s, hist = self.macd.update(p, final)
+        vwap = self.vwap.update(h, l, c, v, final)
+        obv = self.obv.update(c, v, final)
+        ub, lb, basis, width = self.bb.update(p, final)
+        adx = self.adx.update(h, l, c, final)
+
+        return IndicatorState(
+            ema20=e20, ema50=e50, ema200=e200,
+            rsi=rsi, atr=atr,
+            macd_line=m, macd_signal=s, macd_hist=hist,
+            vwap=vwap,
+            upper_bollinger=ub, lower_bollinger=lb, bollinger_width=width,
+            adx=adx, obv=obv
+        )
+
+    def peek(self, candle: Candle) -> IndicatorState:
+        return self.update(candle, final=False)
+
+    @classmethod
+    def from_candles(cls, candles: Sequence[Candle]) -> Tuple["Context", Optional[IndicatorState]]:
+        ctx = cls()
+        if not candles:
+            return ctx, None
+
+        bars = CandleSeries.from_candles(candles)
+        series, objects = batch.compute_all(bars.high, bars.low, bars.close, bars.volume)
+        for name, obj in objects.items():
+            setattr(ctx, name, obj)
+
+        state = IndicatorState(**{k: batch.last_value(arr) for k, arr in series.items()})
+        return ctx, state
+
+    def to_state(self) -> Dict[str, Any]:
+        return {name: getattr(self, name).to_state() for name in self.INDICATORS}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "Context":
+        ctx = cls.__new__(cls)
+        for name, kind in cls.INDICATORS.items():
+            setattr(ctx, name, kind.from_state(state[name]))
+        return ctx
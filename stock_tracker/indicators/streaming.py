@@ -1,21 +1,55 @@
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from collections import deque
 import math
 
-class EMA:
+class StreamingState:
+    """Plain-dict snapshot of an indicator's scalar state and ring buffers."""
+
+    NESTED: Dict[str, type] = {}
+
+    def to_state(self) -> Dict[str, Any]:
+        state = {}
+        for name, val in vars(self).items():
+            if name in self.NESTED:
+                val = val.to_state()
+            elif isinstance(val, deque):
+                val = list(val)
+            state[name] = val
+        return state
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]):
+        obj = cls.__new__(cls)
+        for name, val in state.items():
+            if name in cls.NESTED:
+                val = cls.NESTED[name].from_state(val)
+            setattr(obj, name, val)
+        obj._restore()
+        return obj
+
+    def _restore(self) -> None:
+        pass
+
+    def peek(self, *args):
+        """Provisional output for a still-forming bar; committed state is untouched."""
+        return self.update(*args, final=False)
+
+class EMA(StreamingState):
     def __init__(self, period: int):
         self.period = period
         self.multiplier = 2 / (period + 1)
         self.value: Optional[float] = None
 
-    def update(self, price: float) -> float:
+    def update(self, price: float, final: bool = True) -> float:
         if self.value is None:
-            self.value = price
+            value = price
         else:
-            self.value = (price - self.value) * self.multiplier + self.value
-        return self.value
+            value = (price - self.value) * self.multiplier + self.value
+        if final:
+            self.value = value
+        return value
 
-class RSI:
+class RSI(StreamingState):
     def __init__(self, period: int = 14):
         self.period = period
         self.avg_gain: Optional[float] = None
@@ -27,39 +61,48 @@ class RSI:
         self.accum_gain = 0.0
         self.accum_loss = 0.0
 
-    def update(self, price: float) -> Optional[float]:
+    def update(self, price: float, final: bool = True) -> Optional[float]:
         if self.last_price is None:
-            self.last_price = price
+            if final:
+                self.last_price = price
             return None
 
         change = price - self.last_price
         gain = max(change, 0.0)
         loss = max(-change, 0.0)
-        self.last_price = price
 
-        if self.avg_gain is None:
-            self.accum_gain += gain
-            self.accum_loss += loss
-            self.count += 1
+        avg_gain, avg_loss = self.avg_gain, self.avg_loss
+        accum_gain, accum_loss, count = self.accum_gain, self.accum_loss, self.count
 
-            if self.count < self.period:
-                return None
+        if avg_gain is None:
+            accum_gain += gain
+            accum_loss += loss
+            count += 1
 
-            self.avg_gain = self.accum_gain / self.period
-            self.avg_loss = self.accum_loss / self.period
+            if count >= self.period:
+                avg_gain = accum_gain / self.period
+                avg_loss = accum_loss / self.period
         else:
-            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
-            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+            avg_gain = (avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (avg_loss * (self.period - 1) + loss) / self.period
 
-        if self.avg_loss == 0:
-            self.value = 100.0 if self.avg_gain > 0 else 50.0
-        else:
-            rs = self.avg_gain / self.avg_loss
-            self.value = 100.0 - (100.0 / (1.0 + rs))
+        value = None
+        if avg_gain is not None:
+            if avg_loss == 0:
+                value = 100.0 if avg_gain > 0 else 50.0
+            else:
+                rs = avg_gain / avg_loss
+                value = 100.0 - (100.0 / (1.0 + rs))
 
-        return self.value
+        if final:
+            self.last_price = price
+            self.accum_gain, self.accum_loss, self.count = accum_gain, accum_loss, count
+            self.avg_gain, self.avg_loss = avg_gain, avg_loss
+            if value is not None:
+                self.value = value
+        return value
 
-class ATR:
+class ATR(StreamingState):
     def __init__(self, period: int = 14):
         self.period = period
         self.value: Optional[float] = None
@@ -67,25 +110,29 @@ class ATR:
         self.count = 0
         self.accum_tr = 0.0
 
-    def update(self, high: float, low: float, close: float) -> Optional[float]:
+    def update(self, high: float, low: float, close: float, final: bool = True) -> Optional[float]:
         if self.last_close is None:
             tr = high - low
         else:
             tr = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
 
-        self.last_close = close
-
-        if self.value is None:
-            self.accum_tr += tr
-            self.count += 1
-            if self.count == self.period:
-                self.value = self.accum_tr / self.period
+        value, accum_tr, count = self.value, self.accum_tr, self.count
+        if value is None:
+            accum_tr += tr
+            count += 1
+            if count == self.period:
+                value = accum_tr / self.period
         else:
-            self.value = (self.value * (self.period - 1) + tr) / self.period
+            value = (value * (self.period - 1) + tr) / self.period
 
-        return self.value
+        if final:
+            self.last_close = close
+            self.value, self.accum_tr, self.count = value, accum_tr, count
+        return value
+
+class MACD(StreamingState):
+    NESTED = {"fast_ema": EMA, "slow_ema": EMA, "signal_ema": EMA}
 
-class MACD:
     def __init__(self, fast_period=12, slow_period=26, signal_period=9):
         self.fast_ema = EMA(fast_period)
         self.slow_ema = EMA(slow_period)
@@ -95,52 +142,59 @@ class MACD:
         self.signal_line: Optional[float] = None
         self.histogram: Optional[float] = None
 
-    def update(self, price: float) -> Tuple[Optional[float], Optional[float], Optional[float]]:
-        fast = self.fast_ema.update(price)
-        slow = self.slow_ema.update(price)
+    def update(self, price: float, final: bool = True) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        fast = self.fast_ema.update(price, final)
+        slow = self.slow_ema.update(price, final)
 
-        self.macd_line = fast - slow
-        self.signal_line = self.signal_ema.update(self.macd_line)
+        macd_line = fast - slow
+        signal_line = self.signal_ema.update(macd_line, final)
 
-        if self.signal_line is not None:
-             self.histogram = self.macd_line - self.signal_line
+        histogram = self.histogram
+        if signal_line is not None:
+             histogram = macd_line - signal_line
 
-        return self.macd_line, self.signal_line, self.histogram
+        if final:
+            self.macd_line, self.signal_line, self.histogram = macd_line, signal_line, histogram
+        return macd_line, signal_line, histogram
 
-class VWAP:
+class VWAP(StreamingState):
     def __init__(self):
         self.cum_vol = 0.0
         self.cum_vol_price = 0.0
         self.value: Optional[float] = None
 
-    def update(self, high: float, low: float, close: float, volume: float) -> float:
+    def update(self, high: float, low: float, close: float, volume: float, final: bool = True) -> float:
         typical_price = (high + low + close) / 3
-        self.cum_vol += volume
-        self.cum_vol_price += typical_price * volume
+        cum_vol = self.cum_vol + volume
+        cum_vol_price = self.cum_vol_price + typical_price * volume
 
-        if self.cum_vol > 0:
-            self.value = self.cum_vol_price / self.cum_vol
+        if cum_vol > 0:
+            value = cum_vol_price / cum_vol
         else:
-            self.value = typical_price
+            value = typical_price
 
-        return self.value
+        if final:
+            self.cum_vol, self.cum_vol_price, self.value = cum_vol, cum_vol_price, value
+        return value
 
-class OBV:
+class OBV(StreamingState):
     def __init__(self):
         self.value: float = 0.0
         self.last_close: Optional[float] = None
 
-    def update(self, close: float, volume: float) -> float:
+    def update(self, close: float, volume: float, final: bool = True) -> float:
+        value = self.value
         if self.last_close is not None:
             if close > self.last_close:
-                self.value += volume
+                value += volume
             elif close < self.last_close:
-                self.value -= volume
+                value -= volume
 
-        self.last_close = close
-        return self.value
+        if final:
+            self.value, self.last_close = value, close
+        return value
 
-class BollingerBands:
+class BollingerBands(StreamingState):
     def __init__(self, period: int = 20, std_dev: float = 2.0):
         self.period = period
         self.std_dev = std_dev
@@ -152,32 +206,43 @@ class BollingerBands:
         self.width: Optional[float] = None
         self.basis: Optional[float] = None
 
-    def update(self, price: float) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]:
-        if len(self.prices) == self.period:
-            old = self.prices.popleft()
-            self.sum_price -= old
-            self.sum_sq_price -= old * old
+    def _restore(self) -> None:
+        self.prices = deque(self.prices, maxlen=self.period)
+
+    def update(self, price: float, final: bool = True) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]:
+        sum_price, sum_sq_price = self.sum_price, self.sum_sq_price
+        full = len(self.prices) == self.period
+        if full:
+            old = self.prices[0]
+            sum_price -= old
+            sum_sq_price -= old * old
 
-        self.prices.append(price)
-        self.sum_price += price
-        self.sum_sq_price += price * price
+        sum_price += price
+        sum_sq_price += price * price
+        count = len(self.prices) if full else len(self.prices) + 1
 
-        if len(self.prices) < self.period:
+        if final:
+            # The deque's maxlen drops the oldest price.
+            self.prices.append(price)
+            self.sum_price, self.sum_sq_price = sum_price, sum_sq_price
+
+        if count < self.period:
             return None, None, None, None
 
-        mean = self.sum_price / self.period
-        variance = (self.sum_sq_price / self.period) - (mean * mean)
+        mean = sum_price / self.period
+        variance = (sum_sq_price / self.period) - (mean * mean)
         variance = max(0.0, variance)
         std = math.sqrt(variance)
 
-        self.basis = mean
-        self.upper = mean + (self.std_dev * std)
-        self.lower = mean - (self.std_dev * std)
-        self.width = (self.upper - self.lower) / mean if mean != 0 else 0
+        upper = mean + (self.std_dev * std)
+        lower = mean - (self.std_dev * std)
+        width = (upper - lower) / mean if mean != 0 else 0
 
-        return self.upper, self.lower, self.basis, self.width
+        if final:
+            self.basis, self.upper, self.lower, self.width = mean, upper, lower, width
+        return upper, lower, mean, width
 
-class ADX:
+class ADX(StreamingState):
     def __init__(self, period: int = 14):
         self.period = period
         self.last_high: Optional[float] = None
@@ -199,11 +264,12 @@ class ADX:
     def smooth(self, prev, curr):
         return (prev * (self.period - 1) + curr) / self.period
 
-    def update(self, high: float, low: float, close: float) -> Optional[float]:
+    def update(self, high: float, low: float, close: float, final: bool = True) -> Optional[float]:
         if self.last_close is None:
-            self.last_high = high
-            self.last_low = low
-            self.last_close = close
+            if final:
+                self.last_high = high
+                self.last_low = low
+                self.last_close = close
             return None
 
         tr = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
@@ -214,38 +280,43 @@ class ADX:
         plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
         minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
 
-        self.last_high = high
-        self.last_low = low
-        self.last_close = close
-
-        if self.smooth_atr is None:
-            self.accum_tr += tr
-            self.accum_plus += plus_dm
-            self.accum_minus += minus_dm
-            self.count += 1
-
-            if self.count == self.period:
-                self.smooth_atr = self.accum_tr / self.period
-                self.smooth_plus = self.accum_plus / self.period
-                self.smooth_minus = self.accum_minus / self.period
-
-                val = self.smooth_plus + self.smooth_minus
-                dx = (abs(self.smooth_plus - self.smooth_minus) / val * 100) if val != 0 else 0
-                self.adx_smooth = dx
-                self.value = self.adx_smooth
+        smooth_atr, smooth_plus, smooth_minus = self.smooth_atr, self.smooth_plus, self.smooth_minus
+        adx_smooth, value = self.adx_smooth, self.value
+        accum_tr, accum_plus, accum_minus, count = self.accum_tr, self.accum_plus, self.accum_minus, self.count
+
+        if smooth_atr is None:
+            accum_tr += tr
+            accum_plus += plus_dm
+            accum_minus += minus_dm
+            count += 1
+
+            if count == self.period:
+                smooth_atr = accum_tr / self.period
+                smooth_plus = accum_plus / self.period
+                smooth_minus = accum_minus / self.period
+
+                val = smooth_plus + smooth_minus
+                dx = (abs(smooth_plus - smooth_minus) / val * 100) if val != 0 else 0
+                adx_smooth = dx
+                value = adx_smooth
         else:
-            self.smooth_atr = self.smooth(self.smooth_atr, tr)
-            self.smooth_plus = self.smooth(self.smooth_plus, plus_dm)
-            self.smooth_minus = self.smooth(self.smooth_minus, minus_dm)
+            smooth_atr = self.smooth(smooth_atr, tr)
+            smooth_plus = self.smooth(smooth_plus, plus_dm)
+            smooth_minus = self.smooth(smooth_minus, minus_dm)
 
-            val = self.smooth_plus + self.smooth_minus
-            dx = (abs(self.smooth_plus - self.smooth_minus) / val * 100) if val != 0 else 0
+            val = smooth_plus + smooth_minus
+            dx = (abs(smooth_plus - smooth_minus) / val * 100) if val != 0 else 0
 
-            if self.adx_smooth is None:
-                 self.adx_smooth = dx
+            if adx_smooth is None:
+                 adx_smooth = dx
             else:
-                 self.adx_smooth = self.smooth(self.adx_smooth, dx)
+                 adx_smooth = self.smooth(adx_smooth, dx)
 
-            self.value = self.adx_smooth
+            value = adx_smooth
 
-        return self.value
+        if final:
+            self.last_high, self.last_low, self.last_close = high, low, close
+            self.smooth_atr, self.smooth_plus, self.smooth_minus = smooth_atr, smooth_plus, smooth_minus
+            self.adx_smooth, self.value = adx_smooth, value
+            self.accum_tr, self.accum_plus, self.accum_minus, self.count = accum_tr, accum_plus, accum_minus, count
+        return value
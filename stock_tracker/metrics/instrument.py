@@ -0,0 +1,245 @@
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+log = logging.getLogger("stock_tracker.metrics")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+@dataclass
+class Trace:
+    """Stage timings and counters for one analysis, from Instrumentation.begin.
+
+    Concurrent analyses of the same ticker each get their own Trace; it is
+    handed to hooks once when finished (or when its `with` block exits).
+    """
+    ticker: str
+    stages: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+    owner: Optional["Instrumentation"] = field(default=None, repr=False, compare=False)
+
+    @property
+    def wall(self) -> float:
+        return sum(w for w, _ in self.stages.values())
+
+    @property
+    def cpu(self) -> float:
+        return sum(c for _, c in self.stages.values())
+
+    def stage(self, name: str) -> "_Stage":
+        return _Stage(self.owner, self.ticker, name, self)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+        for hook in self.owner.hooks:
+            hook.on_count(self.ticker, name, value)
+
+    def finish(self) -> "Trace":
+        for hook in self.owner.hooks:
+            hook.on_trace(self)
+        return self
+
+    def __enter__(self) -> "Trace":
+        return self
+
+    def __exit__(self, *exc):
+        self.finish()
+        return False
+
+class Hook:
+    """Subscriber interface. Stage and count events arrive as they happen,
+    possibly from I/O threads; on_trace fires once an analysis is done."""
+
+    def on_stage(self, ticker: Optional[str], stage: str, wall: float, cpu: float) -> None:
+        pass
+
+    def on_count(self, ticker: str, name: str, value: int) -> None:
+        pass
+
+    def on_trace(self, trace: Trace) -> None:
+        pass
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_STAGE = _NullStage()
+
+class _NullTrace(_NullStage):
+    """Stands in for a Trace while no hooks are subscribed."""
+    __slots__ = ()
+
+    def stage(self, name: str) -> _NullStage:
+        return NULL_STAGE
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def finish(self) -> None:
+        return None
+
+NULL_TRACE = _NullTrace()
+
+class _Stage:
+    __slots__ = ("owner", "ticker", "name", "trace", "wall", "cpu")
+
+    def __init__(self, owner: "Instrumentation", ticker: Optional[str], name: str, trace: Optional[Trace] = None):
+        self.owner, self.ticker, self.name, self.trace = owner, ticker, name, trace
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner.record(self.ticker, self.name, time.perf_counter() - self.wall,
+                          time.thread_time() - self.cpu, self.trace)
+        return False
+
+class Instrumentation:
+    """Per-stage wall/CPU timers and counters fanned out to subscribed hooks.
+
+    With no hooks, `begin` returns a shared no-op trace and `stage` a shared
+    no-op context manager, so instrumented code pays one attribute check.
+    CPU time is per thread, so concurrent fetches don't inflate each other.
+    """
+
+    def __init__(self, hooks: Iterable[Hook] = ()):
+        self.hooks: List[Hook] = list(hooks)
+        self.enabled = bool(self.hooks)
+
+    def subscribe(self, hook: Hook) -> Hook:
+        self.hooks.append(hook)
+        self.enabled = True
+        return hook
+
+    def unsubscribe(self, hook: Hook) -> None:
+        self.hooks.remove(hook)
+        self.enabled = bool(self.hooks)
+
+    def begin(self, ticker: str):
+        """A Trace for one analysis of `ticker`; pass it to everything that
+        analysis times, and finish it (or leave its `with` block) when done."""
+        if not self.enabled:
+            return NULL_TRACE
+        return Trace(ticker, owner=self)
+
+    def stage(self, ticker: Optional[str], name: str):
+        """Time work outside any one analysis, such as a sentiment batch
+        shared by several tickers. Hooks see it; no trace does."""
+        if not self.enabled:
+            return NULL_STAGE
+        return _Stage(self, ticker, name)
+
+    def record(self, ticker: Optional[str], name: str, wall: float, cpu: float,
+               trace: Optional[Trace] = None) -> None:
+        if trace is not None:
+            w, c = trace.stages.get(name, (0.0, 0.0))
+            trace.stages[name] = (w + wall, c + cpu)
+        for hook in self.hooks:
+            hook.on_stage(ticker, name, wall, cpu)
+
+class LogHook(Hook):
+    """One line per report, slowest stages first."""
+
+    def __init__(self, logger: logging.Logger = log, level: int = logging.INFO):
+        self.logger = logger
+        self.level = level
+
+    def on_trace(self, trace: Trace) -> None:
+        stages = sorted(trace.stages.items(), key=lambda kv: -kv[1][0])
+        parts = " ".join(f"{name}={w * 1e3:.1f}ms" for name, (w, _) in stages)
+        counts = " ".join(f"{k}={v}" for k, v in sorted(trace.counts.items()))
+        self.logger.log(self.level, "analyze %s wall=%.1fms cpu=%.1fms %s %s",
+                        trace.ticker, trace.wall * 1e3, trace.cpu * 1e3, parts, counts)
+
+class HistogramHook(Hook):
+    """Keeps the last `max_samples` wall times per stage in memory."""
+
+    def __init__(self, max_samples: int = 10000):
+        self.samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_samples))
+        self.counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def on_stage(self, ticker: str, stage: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            self.samples[stage].append(wall)
+
+    def on_count(self, ticker: str, name: str, value: int) -> None:
+        with self._lock:
+            self.counts[name] += value
+
+    def percentile(self, stage: str, q: float) -> Optional[float]:
+        with self._lock:
+            data = list(self.samples.get(stage, ()))
+        return float(np.percentile(data, q)) if data else None
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {k: np.asarray(v) for k, v in self.samples.items() if v}
+        return {k: {"count": len(v), "mean": float(v.mean()), "p50": float(np.percentile(v, 50)),
+                    "p95": float(np.percentile(v, 95)), "max": float(v.max())}
+                for k, v in sorted(snapshot.items())}
+
+class PrometheusHook(Hook):
+    """Cumulative histograms and counters rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "stock_tracker"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self.bucket_counts: Dict[str, List[int]] = {}
+        self.wall_sum: Dict[str, float] = defaultdict(float)
+        self.cpu_sum: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.reports = 0
+        self._lock = threading.Lock()
+
+    def on_stage(self, ticker: str, stage: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            counts = self.bucket_counts.setdefault(stage, [0] * (len(self.buckets) + 1))
+            counts[bisect.bisect_left(self.buckets, wall)] += 1
+            self.wall_sum[stage] += wall
+            self.cpu_sum[stage] += cpu
+
+    def on_count(self, ticker: str, name: str, value: int) -> None:
+        with self._lock:
+            self.counts[name] += value
+
+    def on_trace(self, trace: Trace) -> None:
+        with self._lock:
+            self.reports += 1
+
+    def render(self) -> str:
+        p = self.prefix
+        lines = [f"# TYPE {p}_stage_seconds histogram"]
+        with self._lock:
+            for stage in sorted(self.bucket_counts):
+                cumulative = np.cumsum(self.bucket_counts[stage])
+                for le, n in zip(self.buckets, cumulative):
+                    lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {n}')
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {cumulative[-1]}')
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {self.wall_sum[stage]:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {cumulative[-1]}')
+
+            lines.append(f"# TYPE {p}_stage_cpu_seconds_total counter")
+            for stage in sorted(self.cpu_sum):
+                lines.append(f'{p}_stage_cpu_seconds_total{{stage="{stage}"}} {self.cpu_sum[stage]:.6f}')
+
+            lines.append(f"# TYPE {p}_events_total counter")
+            for name in sorted(self.counts):
+                lines.append(f'{p}_events_total{{event="{name}"}} {self.counts[name]}')
+
+            lines.append(f"# TYPE {p}_reports_total counter")
+            lines.append(f"{p}_reports_total {self.reports}")
+        return "\n".join(lines) + "\n"
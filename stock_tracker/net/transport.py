@@ -0,0 +1,166 @@
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class HttpError(Exception):
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"http error {status_code} for {url}")
+        self.status_code = status_code
+        self.url = url
+
+@dataclass
+class HttpResponse:
+    status_code: int
+    content: bytes
+    url: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HttpError(self.status_code, self.url)
+
+@dataclass
+class _Validator:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content: bytes
+    headers: Dict[str, str]
+
+class HttpTransport:
+    """Pooled keep-alive GETs with per-host concurrency limits, retry with
+    backoff on 429/5xx, and ETag / Last-Modified revalidation."""
+
+    def __init__(self, pool_size: int = 16, per_host: int = 4, retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 10.0, conditional: bool = True,
+                 max_validator_bytes: int = 32 * 1024 * 1024, headers: Optional[Dict[str, str]] = None):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.conditional = conditional
+        self.max_validator_bytes = max_validator_bytes
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = {"User-Agent": "Mozilla/5.0 (compatible; StockTracker/1.0)"}
+        self.headers.update(headers or {})
+
+        self._session = None
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._validators: "OrderedDict[Tuple, _Validator]" = OrderedDict()
+        self._validator_bytes = 0
+
+    @property
+    def session(self):
+        # requests/urllib3 are imported on first use to keep startup light.
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                retry = Retry(
+                    total=self.retries,
+                    backoff_factor=self.backoff,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset(["GET"]),
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    @contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        host = urlsplit(url).netloc
+        with self._lock:
+            sem = self._hosts.get(host)
+            if sem is None:
+                sem = self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+        with sem:
+            yield
+
+    def _key(self, url: str, params: Optional[Dict[str, Any]]) -> Tuple:
+        return (url, tuple(sorted((params or {}).items())))
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> HttpResponse:
+        key = self._key(url, params)
+        req_headers = dict(self.headers)
+        req_headers.update(headers or {})
+
+        cached = None
+        if self.conditional:
+            with self._lock:
+                cached = self._validators.get(key)
+            if cached:
+                if cached.etag:
+                    req_headers["If-None-Match"] = cached.etag
+                if cached.last_modified:
+                    req_headers["If-Modified-Since"] = cached.last_modified
+
+        with self._host_slot(url):
+            resp = self.session.get(url, params=params, headers=req_headers,
+                                    timeout=timeout if timeout is not None else self.timeout)
+
+        if resp.status_code == 304 and cached:
+            with self._lock:
+                if key in self._validators:
+                    self._validators.move_to_end(key)
+            return HttpResponse(200, cached.content, resp.url, dict(cached.headers), from_cache=True)
+
+        result = HttpResponse(resp.status_code, resp.content, resp.url, dict(resp.headers))
+
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if self.conditional and resp.status_code == 200 and (etag or last_modified):
+            self._remember(key, _Validator(etag, last_modified, resp.content, result.headers))
+
+        return result
+
+    def _remember(self, key: Tuple, validator: _Validator) -> None:
+        # Bounded by body bytes, not entries: one multi-year CSV outweighs
+        # thousands of headline feeds.
+        size = len(validator.content)
+        with self._lock:
+            old = self._validators.pop(key, None)
+            if old is not None:
+                self._validator_bytes -= len(old.content)
+            if size > self.max_validator_bytes:
+                return
+            self._validators[key] = validator
+            self._validator_bytes += size
+            while self._validator_bytes > self.max_validator_bytes:
+                _, evicted = self._validators.popitem(last=False)
+                self._validator_bytes -= len(evicted.content)
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+
+_default: Optional[HttpTransport] = None
+_default_lock = threading.Lock()
+
+def default_transport() -> HttpTransport:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpTransport()
+        return _default
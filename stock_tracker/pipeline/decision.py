@@ -0,0 +1,101 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from stock_tracker.backtest_snapshot.engine import BacktestEngine, BacktestStats
+from stock_tracker.core.models import Candle, IndicatorState, SwingPoint
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.data.resample import HIGHER_TIMEFRAMES
+from stock_tracker.indicators.context import Context
+from stock_tracker.metrics.instrument import NULL_TRACE, Instrumentation, Trace
+from stock_tracker.positioning.manager import PositionManager, PositionRecommendation
+from stock_tracker.regime.classifier import MarketRegime, RegimeClassifier
+from stock_tracker.risk.manager import RiskManager, RiskProfile, Swings
+from stock_tracker.scoring.engine import ScoringEngine
+from stock_tracker.sentiment.analyzer import SentimentSignal
+from stock_tracker.structure.patterns import PatternRecognizer
+from stock_tracker.structure.swings import SwingDetector
+from stock_tracker.volume.analysis import VolumeAnalyzer, VolumeSignal
+
+Replay = Tuple[Context, Optional[IndicatorState], SwingDetector, List[SwingPoint]]
+
+def replay_swings(candles: CandleSeries) -> Tuple[SwingDetector, List[SwingPoint]]:
+    detector = SwingDetector()
+    structure = []
+    for i, c in enumerate(candles):
+        swing = detector.update(c, i)
+        if swing:
+            structure.append(swing)
+    return detector, structure
+
+def replay_history(candles: CandleSeries) -> Replay:
+    ctx, state = Context.from_candles(candles)
+    return (ctx, state) + replay_swings(candles)
+
+@dataclass
+class Decision:
+    patterns: List[str]
+    regime: MarketRegime
+    volume: VolumeSignal
+    score: float
+    recommendation: PositionRecommendation
+    risk: RiskProfile
+    stats: Optional[BacktestStats]
+    indicators: IndicatorState
+    higher: Dict[str, MarketRegime] = field(default_factory=dict)
+
+class DecisionChain:
+    """Patterns -> regime -> score -> position -> risk for one bar.
+
+    Holds no data sources or caches, so the live analyzer and the offline
+    backtest and sweep runners share exactly the same decision logic.
+    """
+
+    def __init__(self, instruments: Optional[Instrumentation] = None):
+        self.instruments = instruments or Instrumentation()
+        self.patterns = PatternRecognizer()
+        self.volume = VolumeAnalyzer()
+        self.regime = RegimeClassifier()
+        self.scoring = ScoringEngine()
+        self.pos = PositionManager()
+        self.risk = RiskManager()
+        self.backtest = BacktestEngine()
+        self.timeframes = HIGHER_TIMEFRAMES
+        if os.environ.get("STOCK_TRACKER_DATA_DIR"):
+            self.backtest = BacktestEngine.load(os.path.join(os.environ["STOCK_TRACKER_DATA_DIR"], "backtest_index.json"))
+
+    def decide(self, curr_ind: IndicatorState, structure: Swings, last: Candle,
+               prev: Optional[Candle], avg_vol: float, sent_sig: SentimentSignal,
+               higher: Optional[Dict[str, Optional[IndicatorState]]] = None, trace: Trace = NULL_TRACE) -> Decision:
+        """Regime -> score -> position -> risk for one bar, optionally confirmed
+        against higher-timeframe indicators. Stages are timed into `trace`."""
+        stage = trace.stage
+        with stage("patterns"):
+            pats = self.patterns.detect_patterns(structure[-5:])
+        with stage("regime"):
+            htf = {spec: self.regime.classify(ind) for spec, ind in (higher or {}).items() if ind}
+            regime = self.regime.confirm(self.regime.classify(curr_ind), htf.values())
+        with stage("volume"):
+            vol_sig = self.volume.analyze(last, avg_vol, last.open, curr_ind.atr or 1.0)
+
+        with stage("scoring"):
+            score = self.scoring.calculate_score(regime, pats, vol_sig, sent_sig, curr_ind, list(htf.values()))
+        with stage("positioning"):
+            rec = self.pos.recommend(score, regime, curr_ind, pats, last.close)
+
+        risk_dir = rec.type.split("_")[0]
+        risk_conf = rec.confidence
+
+        if risk_dir not in ["LONG", "SHORT"]:
+            risk_dir = "LONG"
+            risk_conf = 0.5
+            if regime == MarketRegime.BEAR_TREND:
+                risk_dir = "SHORT"
+
+        # RiskManager.calculate_risk(price, atr, direction, confidence, swings, prev_candle)
+        with stage("risk"):
+            risk_prof = self.risk.calculate_risk(last.close, curr_ind.atr or 0, risk_dir, risk_conf, structure, prev)
+
+        with stage("backtest"):
+            stats = self.backtest.get_stats(pats, regime)
+        return Decision(pats, regime, vol_sig, score, rec, risk_prof, stats, curr_ind, htf)
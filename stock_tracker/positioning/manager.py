@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from typing import List
+import numpy as np
 from stock_tracker.core.models import IndicatorState
-from stock_tracker.regime.classifier import MarketRegime
+from stock_tracker.regime.classifier import MarketRegime, REGIMES
 
 @dataclass
 class PositionRecommendation:
@@ -12,13 +13,16 @@ class PositionRecommendation:
     entry_signal: str
 
 class PositionManager:
+    def __init__(self, threshold: float = 0.4):
+        self.threshold = threshold
+
     def recommend(self, score: float, regime: MarketRegime,
                  data: IndicatorState, patterns: List[str],
                  price: float) -> PositionRecommendation:
 
         bias = "NEUTRAL"
-        if score > 0.4: bias = "BULLISH"
-        elif score < -0.4: bias = "BEARISH"
+        if score > self.threshold: bias = "BULLISH"
+        elif score < -self.threshold: bias = "BEARISH"
 
         if bias == "NEUTRAL":
             return PositionRecommendation("HOLD", "NEUTRAL", 0.0, "neutral score", "NONE")
@@ -91,3 +95,26 @@ class PositionManager:
             trade_type = "NEUTRAL"
 
         return PositionRecommendation(action, trade_type, confidence, rationale, entry_signal)
+
+    @staticmethod
+    def actions_many(scores: np.ndarray, thresholds: np.ndarray, regimes: np.ndarray, rsi: np.ndarray,
+                     bottom_pattern: np.ndarray, top_pattern: np.ndarray) -> np.ndarray:
+        """Vectorised recommend() actions: +1 BUY, -1 SELL, 0 HOLD.
+
+        scores is (candidates, bars) and thresholds (candidates,); the other
+        arrays are per bar, with NaN rsi for a missing value.
+        """
+        code = {r: i for i, r in enumerate(REGIMES)}
+        bull_regime = (regimes == code[MarketRegime.BULL_TREND]) | (regimes == code[MarketRegime.TRANSITION])
+        bear_regime = (regimes == code[MarketRegime.BEAR_TREND]) | (regimes == code[MarketRegime.TRANSITION])
+        ranging = regimes == code[MarketRegime.RANGE]
+
+        with np.errstate(invalid="ignore"):
+            can_buy = bull_regime | (ranging & (rsi < 40)) | ((regimes == code[MarketRegime.BEAR_TREND]) & bottom_pattern)
+            can_sell = bear_regime | (ranging & (rsi > 60)) | ((regimes == code[MarketRegime.BULL_TREND]) & top_pattern)
+
+        th = np.asarray(thresholds, dtype=np.float64)[:, None]
+        out = np.zeros(scores.shape, dtype=np.int8)
+        out[(scores > th) & can_buy] = 1
+        out[(scores < -th) & can_sell] = -1
+        return out
@@ -1,4 +1,6 @@
 from enum import Enum
+from typing import Iterable
+import numpy as np
 from stock_tracker.core.models import IndicatorState
 
 class MarketRegime(Enum):
@@ -9,6 +11,8 @@ class MarketRegime(Enum):
     TRANSITION = "TRANSITION"
     UNKNOWN = "UNKNOWN"
 
+REGIMES = list(MarketRegime)
+
 class RegimeClassifier:
     def classify(self, data: IndicatorState) -> MarketRegime:
         if (data.ema20 is None or data.ema50 is None or data.adx is None):
@@ -33,3 +37,20 @@ class RegimeClassifier:
             return MarketRegime.RANGE
 
         return MarketRegime.RANGE
+
+    def confirm(self, regime: MarketRegime, higher: Iterable[MarketRegime]) -> MarketRegime:
+        """A trend opposed by any higher timeframe takes the higher timeframe's
+        direction, so entries against it need a reversal pattern."""
+        opposite = {MarketRegime.BULL_TREND: MarketRegime.BEAR_TREND, MarketRegime.BEAR_TREND: MarketRegime.BULL_TREND}
+        if regime in opposite and opposite[regime] in higher:
+            return opposite[regime]
+        return regime
+
+    def classify_many(self, ema20: np.ndarray, ema50: np.ndarray, adx: np.ndarray) -> np.ndarray:
+        """Vectorised classify() over indicator series; returns indexes into REGIMES."""
+        codes = np.full(len(ema20), REGIMES.index(MarketRegime.RANGE), dtype=np.int8)
+        directional = adx > 10.0
+        codes[directional & (ema20 > ema50)] = REGIMES.index(MarketRegime.BULL_TREND)
+        codes[directional & (ema20 < ema50)] = REGIMES.index(MarketRegime.BEAR_TREND)
+        codes[np.isnan(ema20) | np.isnan(ema50) | np.isnan(adx)] = REGIMES.index(MarketRegime.UNKNOWN)
+        return codes
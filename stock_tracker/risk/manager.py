@@ -1,6 +1,13 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np
 from stock_tracker.core.models import SwingPoint, SwingType, Candle
+from stock_tracker.structure.swings import SwingIndex
+
+Swings = Union[SwingIndex, Sequence[SwingPoint]]
+
+def as_index(swings: Optional[Swings]) -> SwingIndex:
+    return swings if isinstance(swings, SwingIndex) else SwingIndex(swings or ())
 
 @dataclass
 class RiskProfile:
@@ -23,10 +30,14 @@ class RiskManager:
             return False
         return True
 
-    def calculate_risk(self, price: float, atr: float, direction: str = "LONG", confidence: float = 1.0, swings: List[SwingPoint] = None, prev_candle: Optional[Candle] = None) -> RiskProfile:
+    def calculate_risk(self, price: float, atr: float, direction: str = "LONG", confidence: float = 1.0, swings: Optional[Swings] = None, prev_candle: Optional[Candle] = None) -> RiskProfile:
         if direction not in ["LONG", "SHORT"]:
             return RiskProfile(0.0, 0.0, 0.0, 0.0, 0, 0.0)
 
+        levels = as_index(swings)
+        support = levels.nearest_below(price, SwingType.LOW)
+        resistance = levels.nearest_above(price, SwingType.HIGH)
+
         if atr <= 0:
             atr = price * 0.02
 
@@ -45,16 +56,7 @@ class RiskManager:
         buffer = atr * 0.5
 
         if direction == "LONG":
-            found_support = False
-            support = price
-
-            if swings:
-                valid = [s.price for s in swings if s.type == SwingType.LOW and s.price < price]
-                if valid:
-                    support = max(valid)
-                    found_support = True
-
-            if found_support and (price - support) > buffer:
+            if support is not None and (price - support) > buffer:
                 stop = support - buffer
             elif prev_candle and s1 < price:
                  stop = s1
@@ -64,16 +66,7 @@ class RiskManager:
             else:
                 stop = price - (atr * 2.0)
 
-            found_res = False
-            resistance = price
-
-            if swings:
-                valid = [s.price for s in swings if s.type == SwingType.HIGH and s.price > price]
-                if valid:
-                    resistance = min(valid)
-                    found_res = True
-
-            if found_res and (resistance - price) > atr:
+            if resistance is not None and (resistance - price) > atr:
                 target = resistance
             elif prev_candle and r1 > price:
                 target = r1
@@ -84,16 +77,7 @@ class RiskManager:
                 target = price + (atr * 3.0)
 
         else:
-            found_res = False
-            resistance = price
-
-            if swings:
-                valid = [s.price for s in swings if s.type == SwingType.HIGH and s.price > price]
-                if valid:
-                    resistance = min(valid)
-                    found_res = True
-
-            if found_res and (resistance - price) > buffer:
+            if resistance is not None and (resistance - price) > buffer:
                 stop = resistance + buffer
             elif prev_candle and r1 > price:
                 stop = r1
@@ -103,16 +87,7 @@ class RiskManager:
             else:
                 stop = price + (atr * 2.0)
 
-            found_support = False
-            support = price
-
-            if swings:
-                valid = [s.price for s in swings if s.type == SwingType.LOW and s.price < price]
-                if valid:
-                    support = max(valid)
-                    found_support = True
-
-            if found_support and (price - support) > atr:
+            if support is not None and (price - support) > atr:
                 target = support
             elif prev_candle and s1 < price:
                 target = s1
@@ -151,3 +126,92 @@ class RiskManager:
             impact = val / self.equity
 
         return RiskProfile(stop, target, loss, rr, size, impact)
+
+    def calculate_risk_many(self, prices: Sequence[float], atrs: Union[float, Sequence[float]],
+                            directions: Union[str, Sequence[str]] = "LONG",
+                            confidences: Union[float, Sequence[float]] = 1.0,
+                            swings: Union[None, Swings, Sequence[Optional[Swings]]] = None,
+                            prev_candles: Union[None, Candle, Sequence[Optional[Candle]]] = None) -> List[RiskProfile]:
+        """calculate_risk over many rows at once.
+
+        Scalars broadcast. `swings` is either one set of swings shared by every
+        row (several prices on one ticker) or one per row (many tickers), and
+        likewise `prev_candles`.
+        """
+        price = np.asarray(prices, dtype=np.float64)
+        n = price.size
+        atr = np.broadcast_to(np.asarray(atrs, dtype=np.float64), (n,))
+        atr = np.where(atr <= 0, price * 0.02, atr)
+        conf = np.broadcast_to(np.asarray(confidences, dtype=np.float64), (n,))
+        dirs = np.broadcast_to(np.asarray(directions), (n,))
+        long = dirs == "LONG"
+        valid = long | (dirs == "SHORT")
+
+        support, resistance = self._levels_many(price, swings)
+
+        prevs = prev_candles if isinstance(prev_candles, (list, tuple)) else [prev_candles] * n
+        has_prev = np.array([p is not None for p in prevs], dtype=bool)
+        pivot = np.array([(p.high + p.low + p.close) / 3.0 if p is not None else 0.0 for p in prevs])
+        r1 = np.where(has_prev, (2.0 * pivot) - np.array([p.low if p is not None else 0.0 for p in prevs]), 0.0)
+        s1 = np.where(has_prev, (2.0 * pivot) - np.array([p.high if p is not None else 0.0 for p in prevs]), 0.0)
+
+        buffer = atr * 0.5
+        with np.errstate(invalid="ignore"):
+            # Same branch order as calculate_risk; NaN levels never match.
+            s1_dist = price - s1
+            s1_stop = np.where((s1_dist > atr * 3.0) | (s1_dist < atr * 0.5), price - (atr * 2.0), s1)
+            long_stop = np.where((price - support) > buffer, support - buffer,
+                                 np.where(has_prev & (s1 < price), s1_stop, price - (atr * 2.0)))
+            long_target = np.where((resistance - price) > atr, resistance,
+                                   np.where(has_prev & (r1 > price),
+                                            np.where((r1 - price) < atr, price + (atr * 3.0), r1),
+                                            price + (atr * 3.0)))
+
+            r1_dist = r1 - price
+            r1_stop = np.where((r1_dist > atr * 3.0) | (r1_dist < atr * 0.5), price + (atr * 2.0), r1)
+            short_stop = np.where((resistance - price) > buffer, resistance + buffer,
+                                  np.where(has_prev & (r1 > price), r1_stop, price + (atr * 2.0)))
+            short_target = np.where((price - support) > atr, support,
+                                    np.where(has_prev & (s1 < price),
+                                             np.where((price - s1) < atr, price - (atr * 3.0), s1),
+                                             price - (atr * 3.0)))
+
+        stop = np.where(long, long_stop, short_stop)
+        target = np.where(long, long_target, short_target)
+
+        loss = np.abs(price - stop)
+        profit = np.abs(target - price)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rr = np.where(loss > 0, profit / loss, 0.0)
+            win_prob = np.clip(conf, 0.1, 0.9)
+            kelly = np.where(rr > 0, win_prob - ((1.0 - win_prob) / rr), 0.0)
+            risk_amt = np.minimum(self.equity * np.maximum(0.0, kelly * 0.5), self.equity * self.risk_per_trade)
+            size = np.where((loss > 0) & (risk_amt > 0), np.floor(risk_amt / loss), 0.0).astype(np.int64)
+        impact = size * price / self.equity if self.equity > 0 else np.zeros(n)
+
+        out = []
+        for i in range(n):
+            if not valid[i]:
+                out.append(RiskProfile(0.0, 0.0, 0.0, 0.0, 0, 0.0))
+                continue
+            out.append(RiskProfile(float(stop[i]), float(target[i]), float(loss[i]), float(rr[i]),
+                                   int(size[i]), float(impact[i])))
+        return out
+
+    def _levels_many(self, price: np.ndarray, swings) -> Tuple[np.ndarray, np.ndarray]:
+        if isinstance(swings, (list, tuple)) and swings and not isinstance(swings[0], SwingPoint):
+            indexes = [as_index(s) for s in swings]
+            support = [ix.nearest_below(p, SwingType.LOW) for ix, p in zip(indexes, price.tolist())]
+            resistance = [ix.nearest_above(p, SwingType.HIGH) for ix, p in zip(indexes, price.tolist())]
+            return (np.array([np.nan if v is None else v for v in support]),
+                    np.array([np.nan if v is None else v for v in resistance]))
+
+        levels = as_index(swings)
+        lows = np.asarray(levels.prices[SwingType.LOW], dtype=np.float64)
+        highs = np.asarray(levels.prices[SwingType.HIGH], dtype=np.float64)
+
+        i = np.searchsorted(lows, price, side="left")
+        support = np.where(i > 0, lows[np.maximum(i - 1, 0)] if lows.size else np.nan, np.nan)
+        j = np.searchsorted(highs, price, side="right")
+        resistance = np.where(j < highs.size, highs[np.minimum(j, max(highs.size - 1, 0))] if highs.size else np.nan, np.nan)
+        return support, resistance
@@ -1,8 +1,14 @@
-from stock_tracker.regime.classifier import MarketRegime
+from typing import Dict, Optional, Sequence
+import numpy as np
+from stock_tracker.regime.classifier import MarketRegime, REGIMES
 from stock_tracker.volume.analysis import VolumeSignal
 from stock_tracker.sentiment.analyzer import SentimentSignal
 from stock_tracker.core.models import IndicatorState
 
+COMPONENTS = ("trend", "momentum", "volume", "pattern", "sentiment")
+
+Weights = Dict[MarketRegime, Dict[str, float]]
+
 class ScoringEngine:
     WEIGHTS = {
         MarketRegime.BULL_TREND: {"trend": 0.35, "momentum": 0.20, "volume": 0.20, "pattern": 0.15, "sentiment": 0.10},
@@ -13,9 +19,25 @@ class ScoringEngine:
         MarketRegime.UNKNOWN:    {"trend": 0.20, "momentum": 0.20, "volume": 0.20, "pattern": 0.20, "sentiment": 0.20}
     }
 
-    def calculate_score(self, regime, patterns, volume, sentiment, data) -> float:
-        w = self.WEIGHTS.get(regime, self.WEIGHTS[MarketRegime.UNKNOWN])
+    # Applied when a higher timeframe trends against the score.
+    HTF_DISCOUNT = 0.5
+
+    def __init__(self, weights: Optional[Weights] = None):
+        self.weights = weights or self.WEIGHTS
+
+    def calculate_score(self, regime, patterns, volume, sentiment, data,
+                        higher: Sequence[MarketRegime] = ()) -> float:
+        w = self.weights.get(regime, self.weights[MarketRegime.UNKNOWN])
+        c = self.components(regime, patterns, volume, sentiment, data)
+        final = sum(w[k] * c[k] for k in COMPONENTS)
+
+        if (final > 0 and MarketRegime.BEAR_TREND in higher) or (final < 0 and MarketRegime.BULL_TREND in higher):
+            final *= self.HTF_DISCOUNT
 
+        return max(-1.0, min(1.0, final))
+
+    def components(self, regime, patterns, volume, sentiment, data) -> Dict[str, float]:
+        """Unweighted component scores in [-1, 1], keyed like COMPONENTS."""
         trend = 0.0
         if data.ema20 and data.ema50:
             if data.ema20 > data.ema50:
@@ -58,12 +80,28 @@ class ScoringEngine:
 
         sent_score = max(-1.0, min(1.0, sentiment.score))
 
-        final = (
-            w["trend"] * trend +
-            w["momentum"] * momentum +
-            w["volume"] * vol_score +
-            w["pattern"] * pat_score +
-            w["sentiment"] * sent_score
-        )
+        return {"trend": trend, "momentum": momentum, "volume": vol_score,
+                "pattern": pat_score, "sentiment": sent_score}
 
-        return max(-1.0, min(1.0, final))
+    @staticmethod
+    def weight_matrix(weights: Weights) -> np.ndarray:
+        """(len(REGIMES), len(COMPONENTS)) array; regimes without weights use UNKNOWN's."""
+        fallback = weights[MarketRegime.UNKNOWN]
+        return np.array([[weights.get(r, fallback)[k] for k in COMPONENTS] for r in REGIMES])
+
+    @staticmethod
+    def score_many(components: np.ndarray, regimes: np.ndarray, weights: np.ndarray,
+                   higher_bull: Optional[np.ndarray] = None, higher_bear: Optional[np.ndarray] = None) -> np.ndarray:
+        """Scores for every candidate at once.
+
+        components is (bars, len(COMPONENTS)), regimes holds REGIMES indexes and
+        weights is (candidates, len(REGIMES), len(COMPONENTS)); returns (candidates, bars).
+        higher_bull/higher_bear flag bars whose higher timeframes trend that way,
+        discounting opposing scores as calculate_score does.
+        """
+        per_bar = weights[:, regimes, :]
+        scores = np.einsum("kbj,bj->kb", per_bar, components)
+        if higher_bull is not None and higher_bear is not None:
+            opposed = ((scores > 0) & higher_bear) | ((scores < 0) & higher_bull)
+            scores = np.where(opposed, scores * ScoringEngine.HTF_DISCOUNT, scores)
+        return np.clip(scores, -1.0, 1.0)
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from typing import List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from stock_tracker.backtest_snapshot.walkforward import NEUTRAL_SENTIMENT, replay_decisions
+from stock_tracker.core.models import Candle
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.pipeline.decision import DecisionChain
+from stock_tracker.positioning.manager import PositionManager
+from stock_tracker.regime.classifier import REGIMES, MarketRegime
+from stock_tracker.scoring.engine import COMPONENTS, ScoringEngine, Weights
+
+@dataclass
+class FeatureSet:
+    """Per-bar inputs of the scoring and positioning layers, concatenated over tickers."""
+    components: np.ndarray
+    regimes: np.ndarray
+    rsi: np.ndarray
+    bottom_pattern: np.ndarray
+    top_pattern: np.ndarray
+    forward_returns: np.ndarray
+    higher_bull: np.ndarray
+    higher_bear: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.regimes)
+
+    @classmethod
+    def concat(cls, parts: Sequence["FeatureSet"]) -> "FeatureSet":
+        return cls(*(np.concatenate([getattr(p, f) for p in parts]) for f in cls.__dataclass_fields__))
+
+@dataclass
+class Candidate:
+    weights: Weights
+    threshold: float
+
+    def apply(self, analyzer: DecisionChain) -> None:
+        analyzer.scoring.weights = self.weights
+        analyzer.pos.threshold = self.threshold
+
+@dataclass
+class SweepResult:
+    candidates: List[Candidate]
+    trades: np.ndarray
+    hit_rate: np.ndarray
+    mean_return: np.ndarray
+    sharpe: np.ndarray
+
+    def ranked(self, metric: str = "sharpe", min_trades: int = 20) -> List[int]:
+        values = np.where(self.trades >= min_trades, getattr(self, metric), -np.inf)
+        return [int(i) for i in np.argsort(-values, kind="stable")]
+
+    def best(self, metric: str = "sharpe", min_trades: int = 20) -> Candidate:
+        return self.candidates[self.ranked(metric, min_trades)[0]]
+
+def extract_features(candles: Sequence[Candle], analyzer: Optional[DecisionChain] = None,
+                     warmup: int = 200, horizon: int = 10) -> FeatureSet:
+    """Run the indicator, swing, pattern and volume layers once and keep what scoring needs.
+    Regimes are the higher-timeframe-confirmed ones the live chain scores with."""
+    analyzer = analyzer or DecisionChain()
+    bars = CandleSeries.from_candles(candles)
+
+    comps, regimes, rsi, bottom, top, idx = [], [], [], [], [], []
+    higher_bull, higher_bear = [], []
+    for i, c, d in replay_decisions(analyzer, bars, warmup):
+        parts = analyzer.scoring.components(d.regime, d.patterns, d.volume, NEUTRAL_SENTIMENT, d.indicators)
+        comps.append([parts[k] for k in COMPONENTS])
+        regimes.append(REGIMES.index(d.regime))
+        rsi.append(np.nan if d.indicators.rsi is None else d.indicators.rsi)
+        bottom.append(any("BOTTOM" in p or "INVERSE" in p for p in d.patterns))
+        top.append(any("TOP" in p or "HEAD" in p for p in d.patterns))
+        higher_bull.append(MarketRegime.BULL_TREND in d.higher.values())
+        higher_bear.append(MarketRegime.BEAR_TREND in d.higher.values())
+        idx.append(i)
+
+    idx = np.asarray(idx, dtype=np.int64)
+    close = bars.close
+    fwd = np.full(idx.size, np.nan)
+    ok = idx + horizon < len(close)
+    fwd[ok] = close[idx[ok] + horizon] / close[idx[ok]] - 1.0
+
+    return FeatureSet(np.asarray(comps, dtype=np.float64).reshape(-1, len(COMPONENTS)),
+                      np.asarray(regimes, dtype=np.int64), np.asarray(rsi, dtype=np.float64),
+                      np.asarray(bottom, dtype=bool), np.asarray(top, dtype=bool), fwd,
+                      np.asarray(higher_bull, dtype=bool), np.asarray(higher_bear, dtype=bool))
+
+def extract_universe(histories: Mapping[str, Sequence[Candle]], warmup: int = 200, horizon: int = 10) -> FeatureSet:
+    analyzer = DecisionChain()
+    return FeatureSet.concat([extract_features(c, analyzer, warmup, horizon) for c in histories.values()])
+
+def random_candidates(n: int, seed: int = 0, threshold_range=(0.2, 0.6)) -> List[Candidate]:
+    """Weights drawn from a flat Dirichlet per regime, so each regime's weights sum to 1."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n):
+        w = rng.dirichlet(np.ones(len(COMPONENTS)), size=len(REGIMES))
+        weights = {r: dict(zip(COMPONENTS, map(float, row))) for r, row in zip(REGIMES, w)}
+        out.append(Candidate(weights, float(rng.uniform(*threshold_range))))
+    return out
+
+def grid_candidates(weight_sets: Sequence[Weights], thresholds: Sequence[float]) -> List[Candidate]:
+    return [Candidate(w, float(t)) for w in weight_sets for t in thresholds]
+
+def sweep(features: FeatureSet, candidates: Sequence[Candidate], chunk: int = 256,
+          periods_per_year: float = 252.0, horizon: int = 10) -> SweepResult:
+    """Score, position and evaluate every candidate against precomputed features.
+
+    A trade is the signed forward return of every bar with a BUY/SELL action.
+    Candidates are processed in chunks to bound the (candidates, bars) arrays.
+    """
+    candidates = list(candidates)
+    valid = ~np.isnan(features.forward_returns)
+    comps = features.components[valid]
+    regimes = features.regimes[valid]
+    rsi = features.rsi[valid]
+    bottom = features.bottom_pattern[valid]
+    top = features.top_pattern[valid]
+    fwd = features.forward_returns[valid]
+    higher_bull = features.higher_bull[valid]
+    higher_bear = features.higher_bear[valid]
+
+    k = len(candidates)
+    trades = np.zeros(k, dtype=np.int64)
+    hit_rate = np.zeros(k)
+    mean_return = np.zeros(k)
+    sharpe = np.zeros(k)
+
+    for start in range(0, k, chunk):
+        batch = candidates[start:start + chunk]
+        weights = np.stack([ScoringEngine.weight_matrix(c.weights) for c in batch])
+        thresholds = np.array([c.threshold for c in batch])
+
+        scores = ScoringEngine.score_many(comps, regimes, weights, higher_bull, higher_bear)
+        actions = PositionManager.actions_many(scores, thresholds, regimes, rsi, bottom, top)
+
+        pnl = actions * fwd
+        active = actions != 0
+        n = active.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = pnl.sum(axis=1) / n
+            var = (np.where(active, pnl - mean[:, None], 0.0) ** 2).sum(axis=1) / n
+            wins = (pnl > 0).sum(axis=1) / n
+            ratio = mean / np.sqrt(var) * np.sqrt(periods_per_year / horizon)
+
+        sl = slice(start, start + len(batch))
+        trades[sl] = n
+        hit_rate[sl] = np.nan_to_num(wins)
+        mean_return[sl] = np.nan_to_num(mean)
+        sharpe[sl] = np.nan_to_num(ratio, posinf=0.0, neginf=0.0)
+
+    return SweepResult(candidates, trades, hit_rate, mean_return, sharpe)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional, Sequence
 import logging
+from stock_tracker.sentiment.engine import FinbertEngine, Score, default_engine
 
 logging.getLogger("transformers").setLevel(logging.ERROR)
 
@@ -11,54 +12,67 @@ class SentimentSignal:
     confidence: float
 
 class SentimentAnalyzer:
-    def __init__(self):
-        self.use_bert = False
-        self.classifier = None
-
-        try:
-            from transformers import pipeline
-            self.classifier = pipeline("sentiment-analysis", model="ProsusAI/finbert", truncation=True)
-            self.use_bert = True
-        except Exception:
+    def __init__(self, engine: Optional[FinbertEngine] = None):
+        self.engine = engine or default_engine()
+        self._textblob = None
+
+    @property
+    def use_bert(self) -> bool:
+        # Not memoized: shared_pipeline caches the model and spaces out retries of a failed load.
+        return self.engine.available
+
+    @property
+    def textblob(self):
+        if self._textblob is None:
             try:
                 from textblob import TextBlob
-                self.textblob = TextBlob
+                self._textblob = TextBlob
             except ImportError:
-                 self.textblob = None
+                self._textblob = False
+        return self._textblob
 
     def analyze(self, headlines: List[str]) -> SentimentSignal:
-        if not headlines:
-            return SentimentSignal(0.0, "NEUTRAL", 0.0)
+        return self.analyze_many([headlines])[0]
 
-        total_score = 0.0
-        total_conf = 0.0
+    def analyze_many(self, groups: Sequence[List[str]]) -> List[SentimentSignal]:
+        groups = [list(g[:10]) if g else [] for g in groups]
+
+        if self.use_bert:
+            try:
+                scored = self.engine.score_many(groups)
+                return [self._aggregate(g, s) for g, s in zip(groups, scored)]
+            except Exception:
+                pass
 
-        headlines = headlines[:10]
+        return [self._analyze_fallback(g) if g else SentimentSignal(0.0, "NEUTRAL", 0.0) for g in groups]
 
+    def warm(self, groups: Sequence[List[str]]) -> None:
         if self.use_bert:
             try:
-                results = self.classifier(headlines)
+                self.engine.score_many([g[:10] for g in groups if g])
+            except Exception:
+                pass
 
-                for i, res in enumerate(results):
-                    weight = 1.0 / (i + 1)
-                    label = res['label'].lower()
-                    score = res['score']
+    def _aggregate(self, headlines: List[str], results: List[Score]) -> SentimentSignal:
+        if not headlines:
+            return SentimentSignal(0.0, "NEUTRAL", 0.0)
 
-                    val = 0.0
-                    if label == 'positive':
-                        val = 1.0
-                    elif label == 'negative':
-                        val = -1.0
+        total_score = 0.0
+        total_conf = 0.0
 
-                    total_score += val * score * weight
-                    total_conf += score * weight
+        for i, (label, score) in enumerate(results):
+            weight = 1.0 / (i + 1)
 
-                avg_score = total_score / total_conf if total_conf > 0 else 0.0
+            val = 0.0
+            if label == 'positive':
+                val = 1.0
+            elif label == 'negative':
+                val = -1.0
 
-            except Exception:
-                return self._analyze_fallback(headlines)
-        else:
-            return self._analyze_fallback(headlines)
+            total_score += val * score * weight
+            total_conf += score * weight
+
+        avg_score = total_score / total_conf if total_conf > 0 else 0.0
 
         summary = "NEUTRAL"
         if avg_score > 0.15:
@@ -66,10 +80,10 @@ class SentimentAnalyzer:
         elif avg_score < -0.15:
             summary = "NEGATIVE"
 
-        return SentimentSignal(avg_score, summary, 1.0 if self.use_bert else 0.5)
+        return SentimentSignal(avg_score, summary, 1.0)
 
     def _analyze_fallback(self, headlines: List[str]) -> SentimentSignal:
-        if not hasattr(self, 'textblob') or not self.textblob:
+        if not self.textblob:
              return SentimentSignal(0.0, "NEUTRAL", 0.0)
 
         total_score = 0.0
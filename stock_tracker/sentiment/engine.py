@@ -0,0 +1,127 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Score = Tuple[str, float]
+
+MODEL_NAME = "ProsusAI/finbert"
+
+RETRY_AFTER = 300.0
+
+_pipelines: Dict[str, object] = {}
+_failed_at: Dict[str, float] = {}
+_pipeline_lock = threading.Lock()
+
+def shared_pipeline(model: str = MODEL_NAME) -> Optional[Callable]:
+    """Load the transformers pipeline once per process; None if it cannot be built.
+
+    A failed load (often a download hiccup) is retried after RETRY_AFTER seconds
+    rather than leaving sentiment neutral until restart.
+    """
+    with _pipeline_lock:
+        if model in _pipelines:
+            return _pipelines[model]
+        failed = _failed_at.get(model)
+        if failed is not None and time.monotonic() - failed < RETRY_AFTER:
+            return None
+        try:
+            from transformers import pipeline
+            _pipelines[model] = pipeline("sentiment-analysis", model=model, truncation=True)
+        except Exception:
+            _failed_at[model] = time.monotonic()
+            return None
+        _failed_at.pop(model, None)
+        return _pipelines[model]
+
+def headline_key(text: str) -> str:
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+class HeadlineCache:
+    def __init__(self, max_len: int = 10000):
+        self.max_len = max_len
+        self.entries: "OrderedDict[str, Score]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Score]:
+        with self._lock:
+            val = self.entries.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return val
+
+    def put(self, key: str, value: Score) -> None:
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_len:
+                self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class FinbertEngine:
+    """Scores headlines with a shared model, caching by content hash and
+    running all uncached headlines from every group through batched passes."""
+
+    def __init__(self, batch_size: int = 32, cache_size: int = 10000,
+                 loader: Callable[[], Optional[Callable]] = shared_pipeline):
+        self.batch_size = batch_size
+        self.cache = HeadlineCache(cache_size)
+        self.loader = loader
+        self.forward_passes = 0
+
+    @property
+    def available(self) -> bool:
+        return self.loader() is not None
+
+    def score_many(self, groups: Sequence[Sequence[str]]) -> List[List[Score]]:
+        keys = [[headline_key(h) for h in group] for group in groups]
+
+        resolved: Dict[str, Score] = {}
+        pending: Dict[str, str] = {}
+        for group, group_keys in zip(groups, keys):
+            for text, key in zip(group, group_keys):
+                if key in resolved or key in pending:
+                    continue
+                hit = self.cache.get(key)
+                if hit is None:
+                    pending[key] = text
+                else:
+                    resolved[key] = hit
+
+        if pending:
+            classifier = self.loader()
+            if classifier is None:
+                raise RuntimeError("sentiment model unavailable")
+
+            items = list(pending.items())
+            for start in range(0, len(items), self.batch_size):
+                chunk = items[start:start + self.batch_size]
+                results = classifier([text for _, text in chunk], batch_size=self.batch_size)
+                self.forward_passes += 1
+                for (key, _), res in zip(chunk, results):
+                    score = (res["label"].lower(), float(res["score"]))
+                    self.cache.put(key, score)
+                    resolved[key] = score
+
+        return [[resolved[key] for key in group_keys] for group_keys in keys]
+
+    def score(self, headlines: Sequence[str]) -> List[Score]:
+        return self.score_many([headlines])[0]
+
+_default: Optional[FinbertEngine] = None
+_default_lock = threading.Lock()
+
+def default_engine() -> FinbertEngine:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = FinbertEngine()
+        return _default
@@ -1,11 +1,12 @@
 import os
-import requests
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
+from stock_tracker.net.transport import HttpTransport, default_transport
 
 class NewsClient:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, transport: Optional[HttpTransport] = None):
         self.api_key = api_key or os.environ.get("NEWS_API_KEY")
+        self.http = transport or default_transport()
         self.base_url = "https://newsapi.org/v2/everything"
 
     def fetch_headlines(self, query: str, days: int = 2) -> List[str]:
@@ -24,7 +25,7 @@ class NewsClient:
                 'pageSize': 20
             }
 
-            response = requests.get(self.base_url, params=params)
+            response = self.http.get(self.base_url, params=params)
             response.raise_for_status()
 
             data = response.json()
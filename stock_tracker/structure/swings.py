@@ -1,6 +1,20 @@
-from typing import Optional
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Union
 from stock_tracker.core.models import Candle, SwingPoint, SwingType
 
+def swing_to_dict(swing: Optional[SwingPoint]) -> Optional[Dict[str, Any]]:
+    if swing is None:
+        return None
+    return {"price": swing.price, "index": swing.index,
+            "timestamp": swing.timestamp.isoformat(), "type": swing.type.value}
+
+def swing_from_dict(data: Optional[Dict[str, Any]]) -> Optional[SwingPoint]:
+    if data is None:
+        return None
+    return SwingPoint(data["price"], data["index"], datetime.fromisoformat(data["timestamp"]), SwingType(data["type"]))
+
 class SwingDetector:
     def __init__(self, threshold: float = 0.03):
         self.threshold = threshold
@@ -8,32 +22,111 @@ class SwingDetector:
         self.potential: Optional[SwingPoint] = None
         self.last_swing: Optional[SwingPoint] = None
 
-    def update(self, candle: Candle, index: int) -> Optional[SwingPoint]:
+    def update(self, candle: Candle, index: int, final: bool = True) -> Optional[SwingPoint]:
+        """With final=False, report the swing this bar would confirm without changing state."""
         if self.mode is None:
-            self.mode = "UP"
-            self.potential = SwingPoint(candle.high, index, candle.timestamp, SwingType.HIGH)
+            if final:
+                self.mode = "UP"
+                self.potential = SwingPoint(candle.high, index, candle.timestamp, SwingType.HIGH)
             return None
 
+        mode, potential = self.mode, self.potential
         confirmed = None
 
-        if self.mode == "UP":
-            if candle.high > self.potential.price:
-                self.potential = SwingPoint(candle.high, index, candle.timestamp, SwingType.HIGH)
-            elif candle.low < self.potential.price * (1 - self.threshold):
-                confirmed = self.potential
-                self.last_swing = confirmed
+        if mode == "UP":
+            if candle.high > potential.price:
+                potential = SwingPoint(candle.high, index, candle.timestamp, SwingType.HIGH)
+            elif candle.low < potential.price * (1 - self.threshold):
+                confirmed = potential
 
-                self.mode = "DOWN"
-                self.potential = SwingPoint(candle.low, index, candle.timestamp, SwingType.LOW)
+                mode = "DOWN"
+                potential = SwingPoint(candle.low, index, candle.timestamp, SwingType.LOW)
 
-        elif self.mode == "DOWN":
-            if candle.low < self.potential.price:
-                self.potential = SwingPoint(candle.low, index, candle.timestamp, SwingType.LOW)
-            elif candle.high > self.potential.price * (1 + self.threshold):
-                confirmed = self.potential
-                self.last_swing = confirmed
+        elif mode == "DOWN":
+            if candle.low < potential.price:
+                potential = SwingPoint(candle.low, index, candle.timestamp, SwingType.LOW)
+            elif candle.high > potential.price * (1 + self.threshold):
+                confirmed = potential
 
-                self.mode = "UP"
-                self.potential = SwingPoint(candle.high, index, candle.timestamp, SwingType.HIGH)
+                mode = "UP"
+                potential = SwingPoint(candle.high, index, candle.timestamp, SwingType.HIGH)
 
+        if final:
+            self.mode, self.potential = mode, potential
+            if confirmed:
+                self.last_swing = confirmed
         return confirmed
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "threshold": self.threshold,
+            "mode": self.mode,
+            "potential": swing_to_dict(self.potential),
+            "last_swing": swing_to_dict(self.last_swing),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SwingDetector":
+        detector = cls(state["threshold"])
+        detector.mode = state["mode"]
+        detector.potential = swing_from_dict(state["potential"])
+        detector.last_swing = swing_from_dict(state["last_swing"])
+        return detector
+
+
+class SwingIndex:
+    """Swings in confirmation order plus a sorted price list per SwingType.
+
+    Dropping the oldest swing is O(1) on the deque; nearest-level queries
+    bisect the sorted prices.
+    """
+
+    def __init__(self, swings: Iterable[SwingPoint] = ()):
+        self.swings: Deque[SwingPoint] = deque()
+        self.prices: Dict[SwingType, List[float]] = {SwingType.HIGH: [], SwingType.LOW: []}
+        for s in swings:
+            self.append(s)
+
+    def append(self, swing: SwingPoint) -> None:
+        self.swings.append(swing)
+        insort(self.prices[swing.type], swing.price)
+
+    def copy(self) -> "SwingIndex":
+        clone = SwingIndex()
+        clone.swings = self.swings.copy()
+        clone.prices = {kind: list(prices) for kind, prices in self.prices.items()}
+        return clone
+
+    def popleft(self) -> SwingPoint:
+        swing = self.swings.popleft()
+        prices = self.prices[swing.type]
+        del prices[bisect_left(prices, swing.price)]
+        return swing
+
+    def prune_before(self, ts: datetime) -> None:
+        while self.swings and self.swings[0].timestamp < ts:
+            self.popleft()
+
+    def nearest_below(self, price: float, kind: SwingType) -> Optional[float]:
+        prices = self.prices[kind]
+        i = bisect_left(prices, price)
+        return prices[i - 1] if i else None
+
+    def nearest_above(self, price: float, kind: SwingType) -> Optional[float]:
+        prices = self.prices[kind]
+        i = bisect_right(prices, price)
+        return prices[i] if i < len(prices) else None
+
+    def __len__(self) -> int:
+        return len(self.swings)
+
+    def __bool__(self) -> bool:
+        return bool(self.swings)
+
+    def __iter__(self) -> Iterator[SwingPoint]:
+        return iter(self.swings)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[SwingPoint, List[SwingPoint]]:
+        if isinstance(key, slice):
+            return [self.swings[i] for i in range(*key.indices(len(self.swings)))]
+        return self.swings[key]
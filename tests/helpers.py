@@ -0,0 +1,38 @@
+"""Synthetic price histories and offline analyzers shared by the test modules."""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from stock_tracker.api.interface import StockTracker
+from stock_tracker.core.models import Candle
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.metrics.instrument import Hook
+
+START = datetime(2024, 1, 1)
+# A steady daily ramp; the first 300 bars are what offline_tracker serves by default.
+BARS = [Candle(START + timedelta(days=i), 100.0 + i, 105.0 + i, 95.0 + i, 100.0 + i, 1000.0) for i in range(305)]
+
+def history(n=500, seed=0):
+    """Seeded noisy sine with drift: enough swings and regime changes for the backtest layers."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    close = 100 + 10 * np.sin(t / 15.0) + 0.05 * t + rng.normal(0, 0.5, n)
+    base = np.datetime64("2015-01-01", "us").astype(np.int64)
+    ts = base + t * 86_400_000_000
+    return CandleSeries.from_arrays(ts, close, close + 1.0, close - 1.0, close, rng.uniform(5e5, 2e6, n))
+
+def offline_tracker(bars=BARS[:300], **kwargs):
+    """StockTracker whose price history comes from `bars` instead of the network.
+    `bars` may also be a fetch_history(ticker, days) replacement."""
+    tracker = StockTracker(**kwargs)
+    tracker.data.fetch_history = bars if callable(bars) else (lambda ticker, days=300: bars)
+    return tracker
+
+class Counts(Hook):
+    """Collects each finished analysis's counters, e.g. cache hits and candles skipped."""
+
+    def __init__(self):
+        self.traces = []
+
+    def on_trace(self, trace):
+        self.traces.append(trace.counts)
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from stock_tracker.core.models import Candle
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.data.archive import OHLCVStore, HEADER, RECORD
+from stock_tracker.data.ingestion import DataIngestor
+
+def make_bars(start, n):
+    base = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=25)
+    return CandleSeries.from_candles(
+        Candle(base + timedelta(days=i), 10.0 + i, 11.0 + i, 9.0 + i, 10.5 + i, 100.0)
+        for i in range(start, start + n))
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = OHLCVStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_only_newer_bars(self):
+        self.assertEqual(self.store.append("AAPL.US", make_bars(0, 10)), 10)
+        # Overlapping refresh: only the 5 bars after the stored tail are kept.
+        self.assertEqual(self.store.append("AAPL.US", make_bars(5, 10)), 5)
+        self.assertEqual(self.store.append("AAPL.US", make_bars(0, 15)), 0)
+
+        bars = self.store.read("AAPL.US")
+        self.assertEqual(len(bars), 15)
+        self.assertEqual(list(bars), list(make_bars(0, 15)))
+        self.assertEqual(self.store.last_timestamp("AAPL.US"), make_bars(14, 1)[0].timestamp)
+        self.assertEqual(len(self.store.read("AAPL.US", tail=4)), 4)
+
+    def test_torn_record_is_ignored(self):
+        self.store.append("MSFT.US", make_bars(0, 3))
+        with open(self.store.path("MSFT.US"), "ab") as f:
+            f.write(b"\x00" * (RECORD.itemsize // 2))
+
+        self.assertEqual(self.store.count("MSFT.US"), 3)
+        self.store.append("MSFT.US", make_bars(3, 2))
+        self.assertEqual(os.path.getsize(self.store.path("MSFT.US")), HEADER.itemsize + 5 * RECORD.itemsize)
+        self.assertEqual(len(self.store.read("MSFT.US")), 5)
+
+    def test_ingestor_serves_from_store(self):
+        ingestor = DataIngestor(store=self.store)
+        calls = []
+
+        def fake_download(ticker, symbol, since=None):
+            calls.append(since)
+            rows = ["Date,Open,High,Low,Close,Volume"]
+            for c in make_bars(0, 20):
+                if since is None or c.timestamp > since:
+                    rows.append(f"{c.timestamp:%Y-%m-%d},{c.open},{c.high},{c.low},{c.close},{c.volume}")
+            return "\n".join(rows) if len(rows) > 1 else None
+
+        ingestor._download = fake_download
+
+        first = ingestor.fetch_history("NVDA", days=10)
+        self.assertEqual(len(first), 10)
+        self.assertEqual(calls, [None])
+
+        # Within the refresh interval the store answers without a download.
+        second = ingestor.fetch_history("NVDA", days=10)
+        self.assertEqual(list(second), list(first))
+        self.assertEqual(len(calls), 1)
+
+        ingestor.refresh("NVDA", force=True)
+        self.assertEqual(calls[-1], first[-1].timestamp)
+        self.assertEqual(self.store.count("NVDA.US"), 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,24 @@
+import os
+import tempfile
 import unittest
-from stock_tracker.backtest_snapshot.engine import BacktestEngine
-from stock_tracker.regime.classifier import MarketRegime
+
+import numpy as np
+
+from stock_tracker.backtest_snapshot.engine import BacktestEngine, BacktestStats, find_occurrences
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.regime.classifier import MarketRegime, RegimeClassifier, REGIMES
+from stock_tracker.core.models import IndicatorState
+from stock_tracker.backtest_snapshot.walkforward import replay_decisions
+from stock_tracker.pipeline.decision import DecisionChain
+from tests.helpers import history
+
+def zigzag(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    close = 100 + 8 * np.sin(t / 6.0) + 0.02 * t + rng.normal(0, 0.3, n)
+    base = np.datetime64("2020-01-01", "us").astype(np.int64)
+    ts = base + t * 86_400_000_000
+    return CandleSeries.from_arrays(ts, close, close + 0.5, close - 0.5, close, np.full(n, 1000.0))
 
 class TestBacktest(unittest.TestCase):
     def test_stats_retrieval(self):
@@ -16,5 +34,54 @@ class TestBacktest(unittest.TestCase):
         stats = engine.get_stats(["UNKNOWN"], MarketRegime.BULL_TREND)
         self.assertIsNone(stats)
 
+    def test_build_index_and_lookup(self):
+        candles = zigzag()
+        occ = find_occurrences(candles)
+        self.assertGreater(len(occ.patterns), 10)
+
+        engine = BacktestEngine(horizon=5, min_samples=2)
+        index = engine.build_index({"AAA": candles, "BBB": zigzag(seed=1)})
+        self.assertTrue(index)
+        for (pattern, regime), stats in index.items():
+            self.assertGreaterEqual(stats.samples, 2)
+            self.assertTrue(0.0 <= stats.win_rate <= 1.0)
+            self.assertGreaterEqual(stats.max_drawdown, 0.0)
+
+        (pattern, regime), stats = next(iter(index.items()))
+        self.assertIs(engine.get_stats([pattern], MarketRegime(regime)), stats)
+
+        # Keys missing from the index still use the prior table.
+        engine.index = {k: v for k, v in index.items() if k != ("DOUBLE_TOP", "BULL_TREND")}
+        self.assertAlmostEqual(engine.get_stats(["DOUBLE_TOP"], MarketRegime.BULL_TREND).win_rate, 0.78)
+
+    def test_occurrence_regimes_match_live_decisions(self):
+        # The index is keyed on the same weekly-confirmed regime get_stats is called with.
+        bars = history(400)
+        occ = find_occurrences(bars)
+        decisions = {i: d for i, _, d in replay_decisions(DecisionChain(), bars, warmup=200)}
+        pairs = [(REGIMES[r], decisions[b].regime) for b, r in zip(occ.bars, occ.regimes) if b in decisions]
+        self.assertTrue(pairs)
+        for indexed, live in pairs:
+            self.assertIs(indexed, live)
+
+    def test_save_load(self):
+        engine = BacktestEngine({("POTENTIAL_DOUBLE_TOP", "RANGE"): BacktestStats(0.6, 0.03, 0.05, 0.01, 12)})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "index.json")
+            engine.save(path)
+            loaded = BacktestEngine.load(path)
+            self.assertEqual(loaded.index, engine.index)
+            self.assertEqual(BacktestEngine.load(os.path.join(tmp, "missing.json")).index, {})
+
+    def test_classify_many_matches_classify(self):
+        classifier = RegimeClassifier()
+        ema20 = np.array([110.0, 90.0, 100.0, 110.0, np.nan])
+        ema50 = np.array([105.0, 95.0, 100.0, 105.0, 100.0])
+        adx = np.array([30.0, 30.0, 15.0, 5.0, 30.0])
+        codes = classifier.classify_many(ema20, ema50, adx)
+        for i, code in enumerate(codes):
+            ind = IndicatorState(ema20=None if np.isnan(ema20[i]) else ema20[i], ema50=ema50[i], adx=adx[i])
+            self.assertEqual(REGIMES[code], classifier.classify(ind))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,51 @@
+import math
+import random
+import unittest
+from datetime import datetime, timedelta
+from stock_tracker.core.models import Candle
+from stock_tracker.api.interface import Context
+
+class TestBatchIndicators(unittest.TestCase):
+    def _candles(self, n):
+        rng = random.Random(7)
+        price = 100.0
+        out = []
+        for i in range(n):
+            price = max(1.0, price + rng.uniform(-2, 2))
+            high = price + rng.uniform(0, 1.5)
+            low = price - rng.uniform(0, 1.5)
+            out.append(Candle(datetime(2020, 1, 1) + timedelta(days=i), price, high, low, price, rng.uniform(1e5, 1e6)))
+        return out
+
+    def assertStatesClose(self, a, b):
+        for name, val in vars(a).items():
+            other = getattr(b, name)
+            if val is None or other is None:
+                self.assertEqual(val, other, name)
+            else:
+                self.assertTrue(math.isclose(val, other, rel_tol=1e-9, abs_tol=1e-9), f"{name}: {val} != {other}")
+
+    def test_matches_streaming(self):
+        for n in (1, 5, 15, 30, 300):
+            candles = self._candles(n)
+            ref = Context()
+            for c in candles:
+                expected = ref.update(c)
+
+            _, state = Context.from_candles(candles)
+            self.assertStatesClose(state, expected)
+
+    def test_seeded_objects_continue_streaming(self):
+        candles = self._candles(320)
+        ref = Context()
+        for c in candles[:300]:
+            ref.update(c)
+        ctx, _ = Context.from_candles(candles[:300])
+
+        for c in candles[300:]:
+            expected = ref.update(c)
+            got = ctx.update(c)
+            self.assertStatesClose(got, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
+import threading
 import unittest
-from stock_tracker.cache.manager import LRUCache
+from datetime import datetime
+from stock_tracker.cache.manager import LRUCache, SingleFlight, next_session_expiry, MARKET_TZ
+from stock_tracker.metrics.instrument import Instrumentation
+from tests.helpers import BARS, Counts, offline_tracker
 
 class TestCache(unittest.TestCase):
     def test_lru_cache(self):
@@ -31,5 +35,97 @@ class TestCache(unittest.TestCase):
         self.assertEqual(cache.get("C"), 30)
         self.assertEqual(cache.get("E"), 5)
 
+    def test_byte_bound_and_stats(self):
+        cache = LRUCache(capacity=100, max_bytes=3000)
+        for key in "ABCDE":
+            cache.put(key, "x" * 900)
+
+        self.assertLessEqual(cache.bytes, 3000)
+        self.assertIsNone(cache.get("A"))
+        self.assertEqual(cache.get("E"), "x" * 900)
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+        self.assertEqual(cache.stats.evictions, 5 - len(cache))
+
+    def test_ttl_and_staleness(self):
+        now = [1000.0]
+        cache = LRUCache(capacity=10, ttl=lambda value, t: t + 60, clock=lambda: now[0])
+        cache.put("A", 1)
+        cache.put("B", 2, ttl_seconds=5)
+
+        now[0] += 10
+        self.assertIsNone(cache.get("B"))
+        self.assertEqual(cache.get("B", allow_stale=True), 2)
+        self.assertEqual(cache.get("A"), 1)
+
+        now[0] += 60
+        self.assertFalse(cache.is_fresh("A"))
+        self.assertIsNone(cache.get("A"))
+        self.assertEqual(cache.stats.expirations, 2)
+
+    def test_session_expiry(self):
+        # Friday 10:00 New York -> same day after the close settles.
+        friday = datetime(2024, 3, 8, 10, 0, tzinfo=MARKET_TZ).timestamp()
+        expiry = datetime.fromtimestamp(next_session_expiry(friday), MARKET_TZ)
+        self.assertEqual((expiry.day, expiry.hour), (8, 19))
+
+        # Friday evening -> skips the weekend to Monday.
+        evening = datetime(2024, 3, 8, 20, 0, tzinfo=MARKET_TZ).timestamp()
+        expiry = datetime.fromtimestamp(next_session_expiry(evening), MARKET_TZ)
+        self.assertEqual((expiry.weekday(), expiry.hour), (0, 19))
+
+    def test_single_flight(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work(key):
+            calls.append(key)
+            release.wait(5)
+            if key == "BAD":
+                raise ValueError(key)
+            return object()
+
+        results, errors = [], []
+        def call(key):
+            try:
+                results.append(flight.do(key, work, key))
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call, args=(k,)) for k in ["A"] * 5 + ["BAD"] * 3]
+        for t in threads:
+            t.start()
+        while flight.shared < 6:
+            threading.Event().wait(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sorted(calls), ["A", "BAD"])
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(len(errors), 3)
+        # Nothing stays in flight, so a later call runs again.
+        self.assertIsNot(flight.do("A", work, "A"), results[0])
+
+    def test_new_bar_after_settle_resumes_cached_state(self):
+        counts = Counts()
+        bars = [BARS[:300]]
+        tracker = offline_tracker(lambda ticker, days=300: bars[0], instruments=Instrumentation([counts]))
+        now = [datetime(2024, 3, 7, 12, 0, tzinfo=MARKET_TZ).timestamp()]
+        tracker.cache.clock = lambda: now[0]
+        tracker.analyze("AAA")
+
+        # The session settles and a new daily bar arrives.
+        now[0] = next_session_expiry(now[0]) + 60
+        self.assertFalse(tracker.cache.is_fresh("AAA"))
+        bars[0] = BARS[1:301]
+        report = tracker.analyze("AAA")
+
+        self.assertEqual(report.price, BARS[300].close)
+        self.assertEqual(counts.traces[-1], {"cache_hit": 1, "candles_processed": 1, "candles_skipped": 299})
+        self.assertTrue(tracker.cache.is_fresh("AAA"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+
+from stock_tracker.api import charts
+from tests.helpers import BARS, offline_tracker
+
+def report(bars):
+    tracker = offline_tracker(bars)
+    return tracker.analyze("AAA")
+
+class TestCharts(unittest.TestCase):
+    def test_figure_is_downsampled_and_binary_packed(self):
+        r = report(BARS[:300])
+        fig = charts.serialize(charts.build_figure(r, max_points=50))
+        trace = fig["data"][0]
+        self.assertIn("bdata", trace["x"])
+        self.assertEqual(fig["layout"]["xaxis"]["type"], "date")
+
+        full = charts.serialize(charts.build_figure(r))
+        self.assertLess(len(str(fig)), len(str(full)))
+
+    def test_extend_data_appends_only_new_bars(self):
+        old, new = report(BARS[:300]), report(BARS)
+        self.assertIsNone(charts.extend_data(new, charts.last_x(new)))
+        data, traces, max_points = charts.extend_data(new, charts.last_x(old))
+        self.assertEqual(traces, [0])
+        self.assertIsNone(max_points)
+        self.assertEqual(data["close"], [[c.close for c in BARS[300:]]])
+        self.assertEqual(len(data["x"][0]), 5)
+
+    def test_zoom_level_of_detail(self):
+        r = report(BARS[:300])
+        x = charts.epoch_ms(r.candles.timestamp)
+        changed, x_range = charts.relayout_range({"xaxis.range[0]": "2024-03-01", "xaxis.range[1]": "2024-03-10 12:00"})
+        self.assertTrue(changed)
+        window = charts.level_of_detail(r, x_range, max_points=50)
+        self.assertEqual(len(window["x"]), 12)
+        self.assertEqual(window["x"][1], x_range[0])
+
+        self.assertEqual(charts.relayout_range({"xaxis.autorange": True}), (True, None))
+        self.assertEqual(charts.relayout_range({"autosize": True}), (False, None))
+        self.assertEqual(len(charts.level_of_detail(r, None, max_points=50)["x"]), 50)
+        np.testing.assert_array_equal(charts.level_of_detail(r, None)["x"], x)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import threading
+import time
+import unittest
+from dataclasses import asdict
+
+from tests.helpers import BARS, offline_tracker
+
+class TestConcurrency(unittest.TestCase):
+    def test_concurrent_analyze_shares_one_fetch(self):
+        fetches = []
+
+        def fetch(ticker, days=300):
+            fetches.append(ticker)
+            time.sleep(0.2)
+            return BARS[:300]
+
+        tracker = offline_tracker(fetch)
+        reports = []
+        threads = [threading.Thread(target=lambda: reports.append(tracker.analyze("NVDA"))) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(fetches, ["NVDA"])
+        self.assertEqual(len(reports), 6)
+        self.assertTrue(all(r is reports[0] for r in reports))
+        self.assertEqual(tracker.flights.shared, 5)
+
+    def test_analyze_and_analyze_many_share_one_fetch(self):
+        fetches = []
+        started = threading.Event()
+
+        def fetch(ticker, days=300):
+            fetches.append(ticker)
+            started.set()
+            time.sleep(0.2)
+            return BARS[:300]
+
+        tracker = offline_tracker(fetch)
+        single = []
+        thread = threading.Thread(target=lambda: single.append(tracker.analyze("NVDA")))
+        thread.start()
+        started.wait(5)
+        batch = dict(tracker.analyze_many(["NVDA", "AMD"]))
+        thread.join()
+        self.assertIs(batch["NVDA"], single[0])
+        self.assertEqual(sorted(fetches), ["AMD", "NVDA"])
+
+        # And the other way round: analyze joins a ticker analyze_many is leading.
+        fetches.clear()
+        started.clear()
+        batch = tracker.analyze_many(["NVDA"])
+        thread = threading.Thread(target=lambda: (started.wait(5), single.append(tracker.analyze("NVDA"))))
+        thread.start()
+        ticker, report = next(batch)
+        thread.join()
+        self.assertIs(single[1], report)
+        self.assertEqual(fetches, ["NVDA"])
+        self.assertEqual(tracker.flights.shared, 2)
+
+    def test_feed_and_analyze_threads_keep_state_consistent(self):
+        tracker = offline_tracker()
+        tracker.analyze("AAA")
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    tracker.analyze("AAA")
+                    tracker.refresh_dirty()
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for c in BARS[300:]:
+            tracker.ingest("AAA", c)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        state = tracker.cache.peek("AAA")
+        self.assertEqual(state.bars_processed, 305)
+        self.assertEqual(state.last_updated, BARS[-1].timestamp)
+
+        cold = offline_tracker(BARS)
+        cold.analyze("AAA")
+        expected = asdict(cold.cache.peek("AAA").indicators)
+        for name, value in asdict(state.indicators).items():
+            self.assertAlmostEqual(value, expected[name], places=6, msg=name)
+        self.assertEqual([s.timestamp for s in cold.cache.peek("AAA").swings], [s.timestamp for s in state.swings])
+
+if __name__ == "__main__":
+    unittest.main()
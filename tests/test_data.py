@@ -1,7 +1,9 @@
 import unittest
+import numpy as np
 from datetime import datetime
 from stock_tracker.core.models import Candle
 from stock_tracker.data.store import TickerData
+from stock_tracker.data.ingestion import parse_history
 
 class TestData(unittest.TestCase):
     def test_store_incremental_update(self):
@@ -26,6 +28,52 @@ class TestData(unittest.TestCase):
 
         latest_ind = store.get_latest_indicators()
         self.assertIsNotNone(latest_ind.ema20)
+        self.assertIsNotNone(latest_ind.obv)
+
+        history = store.get_all_indicators()
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[-1], latest_ind)
+        # Columns are views over the ring, and missing values are NaN.
+        self.assertTrue(np.shares_memory(history.ema20, store.indicator_history.ema20))
+        self.assertTrue(np.isnan(history.upper_bollinger).all())
+        self.assertIsNone(history[0].upper_bollinger)
+
+    def test_deprecated_indicator_attributes(self):
+        store = TickerData("TEST")
+        with self.assertWarns(DeprecationWarning):
+            self.assertIsNone(store.rsi)
+        for i in range(30):
+            store.add_candle(Candle(datetime(2024, 1, 1 + i), 100.0 + i, 101.0 + i, 99.0 + i, 100.0 + i, 1000.0))
+
+        latest = store.get_latest_indicators()
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(store.ema20, latest.ema20)
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(store.macd, (latest.macd_line, latest.macd_signal, latest.macd_hist))
+        with self.assertRaises(AttributeError):
+            store.rsi = 50.0
+
+    def test_parse_history(self):
+        rows = ["Date,Open,High,Low,Close,Volume"]
+        for day in range(1, 29):
+            rows.append(f"2024-02-{day:02d},{day}.0,{day + 1}.0,{day - 1}.0,{day}.5,{day * 100}")
+        rows[5] = "2024-02-05,abc,6.0,4.0,5.5,500"
+        rows[9] = "not-a-date,9.0,10.0,8.0,9.5,900"
+        content = "\n".join(rows) + "\n"
+
+        series = parse_history(content, days=10, now=datetime(2024, 2, 28))
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series[-1].timestamp, datetime(2024, 2, 28))
+        self.assertEqual(series[-1].close, 28.5)
+        self.assertEqual(series[0].timestamp, datetime(2024, 2, 19))
+
+        full = parse_history(content, days=None)
+        self.assertEqual(len(full), 26)
+        self.assertNotIn(datetime(2024, 2, 5), [c.timestamp for c in full])
+
+        # Bars outside the calendar window are dropped.
+        stale = parse_history(content, days=5, now=datetime(2024, 6, 1))
+        self.assertEqual(len(stale), 0)
 
 if __name__ == '__main__':
     unittest.main()
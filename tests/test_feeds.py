@@ -0,0 +1,118 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from stock_tracker.core.models import Candle
+from stock_tracker.data.feeds import parse_bar, run_feed, socket_lines, tail_file
+from stock_tracker.data.store import TickerData
+from tests.helpers import BARS, offline_tracker
+
+def bar_line(ticker, c, flag="final"):
+    return f"{ticker},{c.timestamp.isoformat()},{c.open},{c.high},{c.low},{c.close},{c.volume},{flag}\n"
+
+class TestFeeds(unittest.TestCase):
+    def test_parse_bar(self):
+        ticker, candle, final = parse_bar(bar_line("aapl", BARS[0], "partial"))
+        self.assertEqual((ticker, candle, final), ("AAPL", BARS[0], False))
+        self.assertEqual(parse_bar('{"ticker": "X", "timestamp": "2024-01-01", "open": 1, "high": 2, '
+                                   '"low": 0.5, "close": 1.5, "volume": 10}')[1].close, 1.5)
+        for flag, final in (('"partial"', False), ('"false"', False), ("false", False), ('"final"', True), ("true", True)):
+            line = f'{{"ticker": "X", "timestamp": "2024-01-01", "open": 1, "high": 2, "low": 0.5, ' \
+                   f'"close": 1.5, "volume": 10, "final": {flag}}}'
+            self.assertIs(parse_bar(line)[2], final, flag)
+        self.assertIsNone(parse_bar("ticker,timestamp,open,high,low,close,volume"))
+        self.assertIsNone(parse_bar(""))
+
+    def test_ticker_data_update(self):
+        data = TickerData("X", max_len=10)
+        self.assertTrue(data.update(BARS[0]))
+        self.assertFalse(data.update(BARS[0]))
+        self.assertTrue(data.update(BARS[1], final=False))
+        self.assertFalse(data.update(BARS[1], final=False))
+        self.assertEqual(len(data.candles), 1)
+        self.assertTrue(data.update(BARS[1]))
+        self.assertIsNone(data.partial)
+        self.assertEqual(len(data.candles), 2)
+
+    def test_ingest_advances_cached_state_and_refreshes_dirty_only(self):
+        tracker = offline_tracker()
+        tracker.analyze("AAA")
+        tracker.analyze("BBB")
+        state = tracker.cache.peek("AAA")
+
+        self.assertTrue(tracker.ingest("AAA", BARS[300]))
+        self.assertIs(tracker.cache.peek("AAA"), state)
+        self.assertEqual(state.last_updated, BARS[300].timestamp)
+        self.assertEqual(state.bars_processed, 301)
+        self.assertFalse(tracker.ingest("AAA", BARS[300]))
+
+        reports = tracker.refresh_dirty()
+        self.assertEqual(list(reports), ["AAA"])
+        self.assertEqual(reports["AAA"].price, BARS[300].close)
+        self.assertEqual(tracker.refresh_dirty(), {})
+
+        cold = offline_tracker(BARS[:301])
+        self.assertEqual(cold.analyze("AAA").target, reports["AAA"].target)
+
+    def test_partial_bar_is_provisional(self):
+        tracker = offline_tracker()
+        tracker.analyze("AAA")
+        state = tracker.cache.peek("AAA")
+        committed = state.streaming_objects["indicators"].to_state()
+
+        forming = Candle(BARS[300].timestamp, 399.0, 420.0, 398.0, 415.0, 500.0)
+        self.assertTrue(tracker.ingest("AAA", forming, final=False))
+        report = tracker.refresh_dirty()["AAA"]
+        self.assertEqual(report.price, 415.0)
+
+        state = tracker.cache.peek("AAA")
+        self.assertEqual(state.bars_processed, 300)
+        self.assertEqual(state.last_updated, BARS[299].timestamp)
+        self.assertEqual(state.streaming_objects["indicators"].to_state(), committed)
+        provisional = tracker.provisional_indicators("AAA")
+        self.assertEqual(provisional, state.streaming_objects["indicators"].peek(forming))
+        self.assertNotEqual(provisional, state.indicators)
+        self.assertFalse(hasattr(tracker.live["AAA"], "indicators"))
+
+    def test_file_tail_feed(self):
+        stop = threading.Event()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bars.csv")
+            with open(path, "w") as f:
+                f.write(bar_line("AAA", BARS[300]))
+                f.write(bar_line("AAA", BARS[301])[:20])
+
+            lines = tail_file(path, poll_interval=0.01, stop=stop)
+            self.assertEqual(parse_bar(next(lines))[1], BARS[300])
+            with open(path, "a") as f:
+                f.write(bar_line("AAA", BARS[301])[20:])
+            self.assertEqual(parse_bar(next(lines))[1], BARS[301])
+            stop.set()
+
+    def test_socket_feed(self):
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+
+        def serve():
+            conn, _ = server.accept()
+            with conn:
+                payload = bar_line("AAA", BARS[300]) + bar_line("AAA", BARS[301], "partial")
+                conn.sendall(payload[:30].encode())
+                conn.sendall(payload[30:].encode())
+
+        t = threading.Thread(target=serve)
+        t.start()
+        tracker = offline_tracker()
+        results = list(run_feed(tracker, socket_lines("127.0.0.1", server.getsockname()[1]), refresh_interval=60))
+        t.join()
+        server.close()
+
+        self.assertEqual([ticker for ticker, _ in results], ["AAA"])
+        self.assertEqual(tracker.live["AAA"].get_latest_candle(), BARS[300])
+        self.assertEqual(tracker.live["AAA"].partial, BARS[301])
+
+if __name__ == '__main__':
+    unittest.main()
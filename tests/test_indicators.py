@@ -1,5 +1,13 @@
+import copy
 import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from stock_tracker.core.models import Candle
+from stock_tracker.indicators.context import Context
 from stock_tracker.indicators.streaming import EMA, RSI, ATR
+from stock_tracker.structure.swings import SwingDetector
 
 class TestIndicators(unittest.TestCase):
     def test_ema(self):
@@ -28,5 +36,31 @@ class TestIndicators(unittest.TestCase):
         # H=12, L=10, C=11. PrevC=10. TR=2. ATR=(2*1 + 2)/2 = 2.
         self.assertEqual(atr.update(12, 10, 11), 2.0)
 
+    def test_intra_bar_revisions(self):
+        rng = np.random.default_rng(3)
+        start = datetime(2024, 1, 1)
+        closes = 100 + np.cumsum(rng.normal(0, 2, 120))
+
+        live, reference = Context(), Context()
+        live_swings, ref_swings = SwingDetector(), SwingDetector()
+        for i, close in enumerate(closes):
+            ts = start + timedelta(days=i)
+            # Several revisions of the forming bar, then its final version.
+            for tick in rng.normal(0, 1, 3):
+                forming = Candle(ts, close, close + 3, close - 3, close + tick, 500.0)
+                before = live.to_state()
+                expected = copy.deepcopy(live).update(forming)
+                self.assertEqual(live.peek(forming), expected)
+                self.assertEqual(live_swings.update(forming, i, final=False),
+                                 copy.deepcopy(live_swings).update(forming, i))
+                self.assertEqual(live.to_state(), before)
+
+            bar = Candle(ts, close, close + 3, close - 3, close, 1000.0)
+            self.assertEqual(live.update(bar), reference.update(bar))
+            self.assertEqual(live_swings.update(bar, i), ref_swings.update(bar, i))
+
+        self.assertEqual(live.to_state(), reference.to_state())
+        self.assertEqual(live_swings.to_state(), ref_swings.to_state())
+
 if __name__ == '__main__':
     unittest.main()
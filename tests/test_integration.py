@@ -1,7 +1,9 @@
 import unittest
 from stock_tracker.api.interface import StockTracker, AnalysisReport
 from stock_tracker.core.models import Candle
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
+from tests.helpers import offline_tracker
 
 class TestIntegration(unittest.TestCase):
     def test_end_to_end_mock(self):
@@ -31,5 +33,58 @@ class TestIntegration(unittest.TestCase):
         self.assertIn(report.recommendation, ["BUY", "SELL", "HOLD"])
         self.assertEqual(len(tracker.cache.cache), 1)
 
+    def test_incremental_resume_from_last_bar(self):
+        start = datetime(2024, 1, 1)
+        bars = [Candle(start + timedelta(days=i), float(100+i), float(105+i), float(95+i), float(100+i), 1000.0)
+                for i in range(301)]
+        visible = [300]
+
+        tracker = StockTracker()
+        tracker.data.fetch_history = lambda ticker, days=300: bars[:visible[0]]
+        tracker.analyze("MOCK")
+        state = tracker.cache.peek("MOCK")
+        self.assertEqual(state.last_updated, bars[299].timestamp)
+        self.assertEqual(state.bars_processed, 300)
+
+        visible[0] = 301
+        resumed = tracker.analyze("MOCK")
+        state = tracker.cache.peek("MOCK")
+        self.assertEqual(state.last_updated, bars[300].timestamp)
+        self.assertEqual(state.bars_processed, 301)
+        self.assertEqual(tracker.cache.stats.hits, 1)
+
+        cold = offline_tracker(bars)
+        self.assertEqual(resumed.price, cold.analyze("MOCK").price)
+
+    def test_analyze_many_overlaps_fetches(self):
+        tracker = StockTracker()
+
+        def slow_fetch(ticker, days=300):
+            time.sleep(0.2)
+            if ticker == "EMPTY":
+                return []
+            return [Candle(datetime.now(), float(100+i), float(105+i), float(95+i), float(100+i), 1000.0)
+                    for i in range(days)]
+
+        tracker.data.fetch_history = slow_fetch
+        tickers = ["A", "B", "C", "D", "E", "F", "EMPTY"]
+
+        start = time.perf_counter()
+        results = dict(tracker.analyze_many(tickers, max_workers=len(tickers)))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(set(results), set(tickers))
+        self.assertIsNone(results["EMPTY"])
+        self.assertEqual(results["C"].ticker, "C")
+        self.assertLess(elapsed, 0.2 * len(tickers) / 2)
+        self.assertEqual(len(tracker.cache.cache), 6)
+
+        # Cold replays on a process pool produce the same reports.
+        fresh = offline_tracker(slow_fetch)
+        pooled = dict(fresh.analyze_many(["A", "B"], max_workers=2, process_workers=2))
+        self.assertEqual(pooled["A"].price, results["A"].price)
+        self.assertEqual(pooled["A"].recommendation, results["A"].recommendation)
+        self.assertEqual(len(pooled["A"].swings), len(results["A"].swings))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+from stock_tracker.metrics.instrument import (NULL_STAGE, NULL_TRACE, Hook, HistogramHook, Instrumentation, LogHook,
+                                              PrometheusHook)
+from tests.helpers import offline_tracker
+
+class Collect(Hook):
+    def __init__(self):
+        self.traces = []
+
+    def on_trace(self, trace):
+        self.traces.append(trace)
+
+def tracker_with(*hooks):
+    return offline_tracker(instruments=Instrumentation(hooks))
+
+class TestMetrics(unittest.TestCase):
+    def test_disabled_is_noop(self):
+        instruments = Instrumentation()
+        self.assertIs(instruments.stage("X", "fetch"), NULL_STAGE)
+        with instruments.begin("X") as trace:
+            self.assertIs(trace, NULL_TRACE)
+            self.assertIs(trace.stage("fetch"), NULL_STAGE)
+            trace.count("cache_hit")
+
+    def test_overlapping_analyses_get_separate_traces(self):
+        collect = Collect()
+        instruments = Instrumentation([collect])
+        with instruments.begin("AAA") as outer:
+            with outer.stage("fetch"):
+                with instruments.begin("AAA") as inner:
+                    with inner.stage("indicators"):
+                        inner.count("cache_miss")
+            outer.count("cache_hit")
+
+        self.assertEqual([t.ticker for t in collect.traces], ["AAA", "AAA"])
+        self.assertIs(collect.traces[0], inner)
+        self.assertEqual(set(inner.stages), {"indicators"})
+        self.assertEqual(inner.counts, {"cache_miss": 1})
+        self.assertEqual(set(outer.stages), {"fetch"})
+        self.assertEqual(outer.counts, {"cache_hit": 1})
+
+    def test_analyze_traces_stages_and_cache_counters(self):
+        collect, hist, prom = Collect(), HistogramHook(), PrometheusHook()
+        tracker = tracker_with(collect, hist, prom)
+        tracker.analyze("AAA")
+        tracker.analyze("AAA")
+
+        cold, warm = collect.traces
+        for stage in ("fetch", "news", "indicators", "swings", "sentiment", "patterns", "regime",
+                      "volume", "scoring", "positioning", "risk", "backtest", "cache_put"):
+            self.assertIn(stage, cold.stages)
+        self.assertEqual(cold.counts, {"cache_miss": 1, "candles_processed": 300})
+        self.assertEqual(warm.counts, {"cache_hit": 1, "candles_processed": 0, "candles_skipped": 300})
+        self.assertIn("advance", warm.stages)
+        self.assertNotIn("indicators", warm.stages)
+
+        self.assertEqual(hist.counts["candles_skipped"], 300)
+        self.assertEqual(hist.summary()["fetch"]["count"], 2)
+        text = prom.render()
+        self.assertIn('stock_tracker_stage_seconds_count{stage="fetch"} 2', text)
+        self.assertIn('stock_tracker_events_total{event="cache_hit"} 1', text)
+        self.assertIn("stock_tracker_reports_total 2", text)
+
+    def test_analyze_many_and_log_hook(self):
+        collect = Collect()
+        tracker = tracker_with(collect, LogHook())
+        with self.assertLogs("stock_tracker.metrics", level="INFO") as logs:
+            reports = dict(tracker.analyze_many(["AAA", "BBB"], max_workers=2))
+        self.assertEqual(sorted(reports), ["AAA", "BBB"])
+        self.assertEqual(sorted(t.ticker for t in collect.traces), ["AAA", "BBB"])
+        self.assertTrue(all("fetch" in t.stages for t in collect.traces))
+        self.assertTrue(any("analyze AAA wall=" in line for line in logs.output))
+
+if __name__ == "__main__":
+    unittest.main()
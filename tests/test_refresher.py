@@ -0,0 +1,124 @@
+import threading
+import unittest
+
+from stock_tracker.api.refresher import BackgroundRefresher
+from tests.helpers import BARS, offline_tracker
+
+class TestRefresher(unittest.TestCase):
+    def test_figures_rebuilt_only_on_new_bars(self):
+        analyzer = offline_tracker()
+        refresher = BackgroundRefresher(analyzer, lambda r: {"last": r.price}, watchlist=["aaa", "bbb"], live=True)
+
+        self.assertEqual(refresher.refresh(), 2)
+        self.assertEqual(refresher.figures_built, 2)
+        first = refresher.get("AAA")
+
+        refresher.refresh()
+        self.assertEqual(refresher.figures_built, 2)
+        self.assertIs(refresher.get("AAA").figure, first.figure)
+
+        analyzer.ingest("AAA", BARS[300])
+        refresher.refresh()
+        self.assertEqual(refresher.figures_built, 3)
+        self.assertEqual(refresher.get("AAA").figure, {"last": BARS[300].close})
+        refresher.stop()
+
+    def test_older_report_never_replaces_newer(self):
+        analyzer = offline_tracker()
+        refresher = BackgroundRefresher(analyzer, lambda r: r.price, live=True)
+        old = analyzer.analyze("AAA")
+        analyzer.ingest("AAA", BARS[300])
+        new = analyzer.refresh_dirty()["AAA"]
+
+        entry = refresher.store(new)
+        self.assertIs(refresher.store(old), entry)
+        self.assertIs(refresher.get("AAA").report, new)
+        self.assertEqual(refresher.get("AAA").version, 0)
+
+        self.assertEqual(refresher.store(new).version, 0)
+        refresher.stop()
+
+    def test_concurrent_stores_count_every_change(self):
+        reports = [offline_tracker(BARS[:300 + i]).analyze("AAA") for i in range(2)]
+        refresher = BackgroundRefresher(offline_tracker(), lambda r: r.price)
+        barrier = threading.Barrier(8)
+
+        def store(report):
+            barrier.wait(5)
+            refresher.store(report)
+
+        threads = [threading.Thread(target=store, args=(reports[i % 2],)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # Every store of the older report after the newer one is dropped, so the
+        # newest bar wins and the version counts only real changes.
+        self.assertIs(refresher.get("AAA").report, reports[1])
+        self.assertLessEqual(refresher.get("AAA").version, 1)
+        refresher.stop()
+
+    def test_stale_entries(self):
+        refresher = BackgroundRefresher(offline_tracker(), lambda r: None, interval=60)
+        entry = refresher._run("AAA")
+        self.assertFalse(refresher.stale(entry))
+        entry.updated_at -= 61
+        self.assertTrue(refresher.stale(entry))
+        refresher.stop()
+
+    def test_bulk_request_and_changed_rows(self):
+        analyzer = offline_tracker()
+        refresher = BackgroundRefresher(analyzer, lambda r: r.price, watchlist=["AAA", "BBB", "CCC"], live=True)
+        self.assertEqual(refresher.request_many(["aaa", "bbb", "ccc"]).result(5), 3)
+
+        changed = refresher.changed({})
+        self.assertEqual(sorted(e.report.ticker for e in changed), ["AAA", "BBB", "CCC"])
+        seen = {e.report.ticker: e.version for e in changed}
+
+        refresher.refresh()
+        self.assertEqual(refresher.changed(seen), [])
+
+        analyzer.ingest("BBB", BARS[300])
+        refresher.refresh()
+        self.assertEqual([e.report.ticker for e in refresher.changed(seen)], ["BBB"])
+        self.assertEqual(refresher.get("BBB").version, seen["BBB"] + 1)
+        refresher.stop()
+
+    def test_request_shares_jobs_and_records_errors(self):
+        analyzer = offline_tracker()
+        release = threading.Event()
+        fetch = analyzer.data.fetch_history
+
+        def slow(ticker, days=300):
+            release.wait(5)
+            if ticker == "BAD":
+                raise ValueError("upstream down")
+            return fetch(ticker, days)
+
+        analyzer.data.fetch_history = slow
+        refresher = BackgroundRefresher(analyzer, lambda r: r.ticker)
+        job = refresher.request("nvda")
+        self.assertIs(refresher.request("NVDA"), job)
+        self.assertTrue(refresher.pending("NVDA"))
+
+        release.set()
+        self.assertEqual(job.result(5).figure, "NVDA")
+        self.assertFalse(refresher.pending("NVDA"))
+
+        self.assertIsNone(refresher.request("BAD").result(5))
+        self.assertEqual(refresher.errors["BAD"], "upstream down")
+        refresher.stop()
+
+    def test_background_thread_warms_watchlist(self):
+        refresher = BackgroundRefresher(offline_tracker(), lambda r: None, watchlist=["AAA"], interval=30).start()
+        try:
+            for _ in range(200):
+                if refresher.get("AAA"):
+                    break
+                threading.Event().wait(0.01)
+            self.assertIsNotNone(refresher.get("AAA"))
+        finally:
+            refresher.stop()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from stock_tracker.core.models import Candle, IndicatorState
+from stock_tracker.core.series import CandleSeries
+from stock_tracker.data.resample import MultiTimeframe, Resampler, downsample, resample
+from stock_tracker.pipeline.decision import DecisionChain
+from stock_tracker.regime.classifier import MarketRegime, RegimeClassifier
+from stock_tracker.sentiment.analyzer import SentimentSignal
+
+def daily(n=400, start=datetime(2023, 1, 2)):
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return [Candle(start + timedelta(days=i), float(c), float(c) + 1, float(c) - 1, float(c), 1000.0 + i)
+            for i, c in enumerate(close) if (start + timedelta(days=i)).weekday() < 5]
+
+class TestResample(unittest.TestCase):
+    def test_streaming_matches_batch(self):
+        bars = daily()
+        for spec in ("W", "M"):
+            finished, tail = resample(bars, spec)
+            r = Resampler(spec)
+            streamed = [done for done in map(r.update, bars) if done is not None]
+            self.assertEqual(streamed, list(finished))
+            self.assertEqual(r.current(), tail.current())
+
+        weeks, _ = resample(bars, "W")
+        self.assertTrue(all(c.timestamp.weekday() == 0 for c in weeks))
+        first = [c for c in bars if c.timestamp < datetime(2023, 1, 9)]
+        self.assertEqual(weeks[0].high, max(c.high for c in first))
+        self.assertEqual(weeks[0].volume, sum(c.volume for c in first))
+
+        months, _ = resample(bars, "M")
+        self.assertEqual(months[1].timestamp, datetime(2023, 2, 1))
+
+    def test_downsample_preserves_ohlc(self):
+        bars = CandleSeries.from_candles(daily(1000))
+        self.assertIs(downsample(bars, len(bars)), bars)
+
+        small = downsample(bars, 100)
+        self.assertLessEqual(len(small), 100)
+        self.assertEqual((small.open[0], small.close[-1]), (bars.open[0], bars.close[-1]))
+        self.assertEqual((small.high.max(), small.low.min()), (bars.high.max(), bars.low.min()))
+        self.assertEqual(small.volume.sum(), bars.volume.sum())
+
+        # End-aligned buckets: appending a full bucket's worth of bars leaves the old ones intact.
+        width = -(-len(bars) // 100)
+        longer = downsample(bars[:len(bars) - width], 100)
+        np.testing.assert_array_equal(longer.timestamp[1:], small.timestamp[1:len(longer)])
+
+    def test_minute_buckets(self):
+        start = datetime(2024, 5, 1, 9, 30)
+        bars = [Candle(start + timedelta(minutes=i), 1.0, 1.0 + i, 1.0, 1.0, 1.0) for i in range(31)]
+        finished, tail = resample(bars, "15min")
+        self.assertEqual([c.timestamp for c in finished], [datetime(2024, 5, 1, 9, 30), datetime(2024, 5, 1, 9, 45)])
+        self.assertEqual(finished[0].volume, 15.0)
+        self.assertEqual(tail.current().timestamp, datetime(2024, 5, 1, 10, 0))
+        with self.assertRaises(ValueError):
+            Resampler("fortnight")
+
+    def test_multi_timeframe_incremental(self):
+        bars = daily()
+        full = MultiTimeframe.from_candles(bars)
+        mtf = MultiTimeframe.from_candles(bars[:150])
+        for c in bars[150:]:
+            mtf.update(c)
+        for spec in ("W", "M"):
+            self.assertEqual(mtf.frames[spec].current(), full.frames[spec].current())
+            self.assertAlmostEqual(mtf.states[spec].ema20, full.states[spec].ema20)
+
+        restored = MultiTimeframe.from_state(mtf.to_state())
+        self.assertEqual(restored.states, mtf.states)
+
+    def test_higher_timeframe_confirmation(self):
+        classifier = RegimeClassifier()
+        self.assertEqual(classifier.confirm(MarketRegime.BULL_TREND, [MarketRegime.BEAR_TREND]), MarketRegime.BEAR_TREND)
+        self.assertEqual(classifier.confirm(MarketRegime.BULL_TREND, [MarketRegime.BULL_TREND]), MarketRegime.BULL_TREND)
+        self.assertEqual(classifier.confirm(MarketRegime.RANGE, [MarketRegime.BEAR_TREND]), MarketRegime.RANGE)
+
+    def test_opposing_higher_timeframe_blocks_counter_trend_entries(self):
+        chain = DecisionChain()
+        daily = IndicatorState(ema20=105.0, ema50=100.0, rsi=55.0, atr=2.0, adx=25.0)
+        weekly_bear = {"W": IndicatorState(ema20=95.0, ema50=100.0, adx=25.0)}
+        weekly_bull = {"W": IndicatorState(ema20=105.0, ema50=100.0, adx=25.0)}
+        bar = Candle(datetime(2024, 1, 2), 104.0, 106.0, 103.0, 105.0, 1000.0)
+        neutral = SentimentSignal(0.0, "", 0.0)
+
+        def decide(score, higher):
+            chain.scoring.calculate_score = lambda *args: score
+            return chain.decide(daily, [], bar, None, 1000.0, neutral, higher)
+
+        self.assertEqual(decide(0.9, weekly_bull).recommendation.action, "BUY")
+        against = decide(0.9, weekly_bear)
+        self.assertEqual(against.regime, MarketRegime.BEAR_TREND)
+        self.assertEqual(against.recommendation.action, "HOLD")
+        self.assertEqual(decide(-0.9, weekly_bear).recommendation.action, "SELL")
+
+if __name__ == '__main__':
+    unittest.main()
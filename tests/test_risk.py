@@ -1,5 +1,17 @@
 import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
 from stock_tracker.risk.manager import RiskManager
+from stock_tracker.core.models import Candle, SwingPoint, SwingType
+from stock_tracker.structure.swings import SwingIndex
+from tests.helpers import history, offline_tracker
+
+def random_swings(rng, n=40):
+    start = datetime(2024, 1, 1)
+    return [SwingPoint(float(rng.uniform(80, 120)), i, start + timedelta(days=i),
+                       SwingType.HIGH if i % 2 else SwingType.LOW) for i in range(n)]
 
 class TestRisk(unittest.TestCase):
     def test_risk_calculation(self):
@@ -42,5 +54,63 @@ class TestRisk(unittest.TestCase):
         risk = manager.calculate_risk(100.0, 5.0, "NEUTRAL")
         self.assertEqual(risk.stop_loss, 0.0)
 
+    def test_swing_index(self):
+        swings = random_swings(np.random.default_rng(0))
+        index = SwingIndex(swings)
+        lows = [s.price for s in swings if s.type == SwingType.LOW]
+        highs = [s.price for s in swings if s.type == SwingType.HIGH]
+        for price in (85.0, 100.0, 119.0, 70.0):
+            below = [p for p in lows if p < price]
+            above = [p for p in highs if p > price]
+            self.assertEqual(index.nearest_below(price, SwingType.LOW), max(below) if below else None)
+            self.assertEqual(index.nearest_above(price, SwingType.HIGH), min(above) if above else None)
+
+        index.prune_before(swings[10].timestamp)
+        self.assertEqual(len(index), 30)
+        self.assertEqual(index[0], swings[10])
+        self.assertEqual(index[-3:], swings[-3:])
+        self.assertEqual(sorted(index.prices[SwingType.LOW]), sorted(s.price for s in swings[10:] if s.type == SwingType.LOW))
+
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(1)
+        manager = RiskManager()
+        swings = random_swings(rng)
+        prev = Candle(datetime(2024, 3, 1), 99.0, 103.0, 97.0, 101.0, 1000.0)
+        prices = rng.uniform(75, 125, 200)
+        atrs = rng.uniform(-1, 6, 200)
+        dirs = rng.choice(["LONG", "SHORT", "NEUTRAL"], 200)
+        conf = rng.uniform(0, 1, 200)
+
+        batch = manager.calculate_risk_many(prices, atrs, dirs, conf, swings, prev)
+        for i, profile in enumerate(batch):
+            self.assertEqual(profile, manager.calculate_risk(prices[i], atrs[i], dirs[i], conf[i], swings, prev))
+
+        # One swing set and previous candle per row, as for many tickers.
+        per_row = [random_swings(rng, 10) if i % 3 else None for i in range(len(prices))]
+        prevs = [prev if i % 2 else None for i in range(len(prices))]
+        batch = manager.calculate_risk_many(prices, atrs, "LONG", 0.7, per_row, prevs)
+        for i, profile in enumerate(batch):
+            self.assertEqual(profile, manager.calculate_risk(prices[i], atrs[i], "LONG", 0.7, per_row[i], prevs[i]))
+
+    def test_analyzer_reuses_cached_swing_index(self):
+        bars = history(500)
+        window = [0, 400]
+        tracker = offline_tracker(lambda ticker, days=300: bars[window[0]:window[1]])
+        seen = []
+        calculate = tracker.risk.calculate_risk
+        tracker.risk.calculate_risk = lambda *args: seen.append(args[4]) or calculate(*args)
+
+        tracker.analyze("AAA")
+        index = tracker.cache.peek("AAA").swings
+        self.assertIsInstance(index, SwingIndex)
+        self.assertIs(seen[-1], index)
+
+        window[:] = [100, 500]
+        report = tracker.analyze("AAA")
+        self.assertIs(tracker.cache.peek("AAA").swings, index)
+        self.assertIs(seen[-1], index)
+        self.assertGreaterEqual(index[0].timestamp, bars[100].timestamp)
+        self.assertEqual(report.swings, list(index))
+
 if __name__ == '__main__':
     unittest.main()
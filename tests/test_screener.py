@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from stock_tracker.api.interface import AnalysisReport
+from stock_tracker.api.screener import Screener
+from stock_tracker.core.models import IndicatorState
+from stock_tracker.regime.classifier import MarketRegime
+from tests.helpers import BARS, offline_tracker
+
+def report(ticker, score, rsi, regime=MarketRegime.BULL_TREND, volume="SPIKE", patterns=()):
+    return AnalysisReport(
+        ticker=ticker, timestamp=datetime.now(), price=100.0, recommendation="BUY", trade_type="LONG_SWING",
+        confidence=0.5, target=110.0, stop_loss=95.0, risk_reward=2.0, confidence_interval_low=99.0,
+        confidence_interval_high=101.0, patterns=list(patterns), regime=regime, sentiment_summary="",
+        sentiment_score=0.0, rationale="", entry_signal="", trend_strength="", volume_status=volume,
+        volume_trend="NEUTRAL", position_size_shares=10, position_size_pct=0.01,
+        score=score, indicators=IndicatorState(rsi=rsi, adx=25.0))
+
+def brute_force(reports, regime, volume, rsi_below, limit):
+    rows = [r for r in reports.values() if r.regime == regime and r.volume_status == volume
+            and r.indicators.rsi is not None and r.indicators.rsi < rsi_below]
+    rows.sort(key=lambda r: -r.score)
+    return [r.ticker for r in rows[:limit]]
+
+class TestScreener(unittest.TestCase):
+    def test_query_matches_brute_force_after_updates(self):
+        rng = np.random.default_rng(3)
+        regimes = [MarketRegime.BULL_TREND, MarketRegime.BEAR_TREND, MarketRegime.RANGE]
+        screener = Screener(initial_rows=4)
+        reports = {}
+        for step in range(600):
+            t = f"T{rng.integers(200)}"
+            r = report(t, float(rng.uniform(-1, 1)), float(rng.uniform(10, 90)),
+                       regimes[rng.integers(3)], ["SPIKE", "NORMAL"][rng.integers(2)])
+            reports[t] = r
+            screener.update(r)
+            if step % 50 == 0:
+                gone = sorted(reports)[0]
+                screener.remove(gone)
+                del reports[gone]
+
+        self.assertEqual(len(screener), len(reports))
+        expected = brute_force(reports, MarketRegime.BULL_TREND, "SPIKE", 40.0, 10)
+        got = screener.query(regime=MarketRegime.BULL_TREND, volume_status="SPIKE", rsi=(None, 40), limit=10)
+        self.assertEqual(got, expected)
+
+        # Unindexed ordering and range filters fall back to column scans.
+        by_price = screener.query(order_by="price", limit=None, sentiment_score=(-1, 1))
+        self.assertEqual(sorted(by_price), sorted(reports))
+
+    def test_patterns_and_missing_values(self):
+        screener = Screener()
+        screener.update(report("A", 0.9, None, patterns=["DOUBLE_BOTTOM"]))
+        screener.update(report("B", 0.5, 30.0, patterns=["DOUBLE_TOP"]))
+        self.assertEqual(screener.query(pattern="DOUBLE_BOTTOM"), ["A"])
+        self.assertEqual(screener.query(rsi=(None, 40)), ["B"])
+        self.assertIsNone(screener.row("A")["rsi"])
+
+        screener.update(report("A", 0.1, 35.0, patterns=["DOUBLE_TOP"]))
+        self.assertEqual(screener.query(pattern="DOUBLE_BOTTOM"), [])
+        self.assertEqual(screener.query(pattern="DOUBLE_TOP", descending=False), ["A", "B"])
+        with self.assertRaises(KeyError):
+            screener.query(nonsense=(0, 1))
+
+    def test_refresh_from_analyzer(self):
+        tracker = offline_tracker()
+        screener = Screener(tracker)
+        screener.refresh(["AAA", "BBB"], max_workers=2)
+        self.assertEqual(sorted(screener.query(limit=None)), ["AAA", "BBB"])
+
+        tracker.ingest("AAA", BARS[300])
+        screener.refresh_dirty()
+        self.assertEqual(screener.row("AAA")["price"], BARS[300].close)
+        self.assertEqual(screener.row("AAA")["rsi"], tracker.cache.peek("AAA").indicators.rsi)
@@ -1,5 +1,22 @@
+import sys
+import types
 import unittest
+from unittest import mock
+from stock_tracker.sentiment import engine as engine_module
 from stock_tracker.sentiment.analyzer import SentimentAnalyzer
+from stock_tracker.sentiment.engine import FinbertEngine, shared_pipeline
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, batch_size=None):
+        self.calls.append(list(texts))
+        out = []
+        for t in texts:
+            label = "positive" if "up" in t else "negative" if "down" in t else "neutral"
+            out.append({"label": label.upper(), "score": 0.9})
+        return out
 
 class TestSentiment(unittest.TestCase):
     def test_sentiment_analysis(self):
@@ -41,5 +58,85 @@ class TestSentiment(unittest.TestCase):
         self.assertEqual(signal.score, 0.0)
         self.assertEqual(signal.summary, "NEUTRAL")
 
+    def test_engine_batches_and_caches(self):
+        model = FakePipeline()
+        engine = FinbertEngine(batch_size=3, loader=lambda: model)
+        analyzer = SentimentAnalyzer(engine)
+
+        groups = [
+            ["AAPL up on earnings", "Market flat"],
+            ["Market flat", "NVDA down after guidance"],
+            ["Rates up", "Oil down", "Market flat"],
+        ]
+        signals = analyzer.analyze_many(groups)
+
+        # Five unique headlines across three tickers -> two passes of at most three.
+        self.assertEqual([len(c) for c in model.calls], [3, 2])
+        self.assertEqual(signals[0].summary, "POSITIVE")
+        self.assertEqual(signals[1].summary, "NEGATIVE")
+        self.assertEqual(signals[0].confidence, 1.0)
+
+        # Recurring wire headlines are served from the content-hash cache.
+        again = analyzer.analyze(["Market  flat", "NVDA down after guidance"])
+        self.assertEqual(len(model.calls), 2)
+        self.assertEqual(again.score, signals[1].score)
+        self.assertGreater(engine.cache.hits, 0)
+
+    def test_model_loaded_lazily(self):
+        loads = []
+        engine = FinbertEngine(loader=lambda: loads.append(1) or FakePipeline())
+        analyzer = SentimentAnalyzer(engine)
+        self.assertEqual(loads, [])
+        analyzer.analyze(["Stocks up"])
+        self.assertTrue(loads)
+
+    def test_failed_load_is_retried(self):
+        attempts = []
+
+        def pipeline(*args, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("connection reset")
+            return FakePipeline()
+
+        transformers = types.SimpleNamespace(pipeline=pipeline)
+        now = [1000.0]
+        with mock.patch.dict(sys.modules, {"transformers": transformers}), \
+                mock.patch.object(engine_module.time, "monotonic", lambda: now[0]):
+            self.assertIsNone(shared_pipeline("test/flaky"))
+            self.assertIsNone(shared_pipeline("test/flaky"))
+            self.assertEqual(len(attempts), 1)
+
+            now[0] += engine_module.RETRY_AFTER
+            self.assertIsInstance(shared_pipeline("test/flaky"), FakePipeline)
+            self.assertIs(shared_pipeline("test/flaky"), shared_pipeline("test/flaky"))
+            self.assertEqual(len(attempts), 2)
+        engine_module._pipelines.pop("test/flaky")
+
+    def test_analyzer_picks_up_model_after_failed_load(self):
+        attempts = []
+
+        def pipeline(*args, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("connection reset")
+            return FakePipeline()
+
+        transformers = types.SimpleNamespace(pipeline=pipeline)
+        analyzer = SentimentAnalyzer(FinbertEngine(loader=lambda: shared_pipeline("test/analyzer")))
+        now = [1000.0]
+        with mock.patch.dict(sys.modules, {"transformers": transformers}), \
+                mock.patch.object(engine_module.time, "monotonic", lambda: now[0]):
+            self.assertFalse(analyzer.use_bert)
+            self.assertFalse(analyzer.use_bert)
+
+            now[0] += engine_module.RETRY_AFTER
+            self.assertTrue(analyzer.use_bert)
+            signal = analyzer.analyze(["Shares up on earnings"])
+            self.assertEqual(signal.summary, "POSITIVE")
+            self.assertEqual(engine_module._pipelines["test/analyzer"].calls, [["Shares up on earnings"]])
+            self.assertEqual(len(attempts), 2)
+        engine_module._pipelines.pop("test/analyzer")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from stock_tracker.core.models import Candle
+from stock_tracker.core.series import CandleSeries
+
+class TestCandleSeries(unittest.TestCase):
+    def _candle(self, i):
+        return Candle(datetime(2024, 1, 1) + timedelta(days=i), 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1000.0 * i)
+
+    def test_round_trip_candles(self):
+        candles = [self._candle(i) for i in range(10)]
+        series = CandleSeries.from_candles(candles)
+
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series[0], candles[0])
+        self.assertEqual(series[-1], candles[-1])
+        self.assertEqual(list(series), candles)
+        self.assertEqual(series.close.dtype, np.float64)
+        self.assertEqual(series.timestamp.dtype, np.int64)
+
+    def test_ring_buffer_drops_oldest(self):
+        series = CandleSeries(capacity=5)
+        for i in range(23):
+            series.append(self._candle(i))
+
+        self.assertEqual(len(series), 5)
+        self.assertEqual(series[0].close, 100.5 + 18)
+        self.assertEqual(series[-1].close, 100.5 + 22)
+        self.assertTrue(series.close.flags['C_CONTIGUOUS'])
+
+    def test_slices_are_views(self):
+        series = CandleSeries.from_candles([self._candle(i) for i in range(10)])
+        tail = series[-3:]
+
+        self.assertEqual(len(tail), 3)
+        self.assertTrue(np.shares_memory(tail.close, series.close))
+        self.assertEqual(tail[0].close, series[7].close)
+
+        # Appending to a view must not write into the parent's buffer.
+        tail.append(self._candle(99))
+        self.assertEqual(len(tail), 4)
+        self.assertEqual(len(series), 10)
+        self.assertFalse(np.shares_memory(tail.close, series.close))
+
+    def test_views_survive_compaction(self):
+        series = CandleSeries(capacity=4)
+        for i in range(4):
+            series.append(self._candle(i))
+        snapshot = series[:]
+        closes = snapshot.close.copy()
+
+        for i in range(4, 40):
+            series.append(self._candle(i))
+
+        np.testing.assert_array_equal(snapshot.close, closes)
+
+    def test_after(self):
+        series = CandleSeries.from_candles([self._candle(i) for i in range(10)])
+        newer = series.after(datetime(2024, 1, 8))
+
+        self.assertEqual([c.timestamp.day for c in newer], [9, 10])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from stock_tracker.core.models import Candle
+from stock_tracker.indicators.context import Context
+from stock_tracker.indicators.streaming import EMA, RSI, ATR, MACD, VWAP, OBV, BollingerBands, ADX
+from stock_tracker.structure.swings import SwingDetector
+from stock_tracker.cache.snapshot import SnapshotStore
+from stock_tracker.api.interface import MarketAnalyzer
+from stock_tracker.metrics.instrument import Instrumentation
+from tests.helpers import Counts
+
+def make_candles(n, seed=3):
+    rng = random.Random(seed)
+    price = 50.0
+    out = []
+    for i in range(n):
+        price = max(1.0, price * (1 + rng.gauss(0, 0.02)))
+        out.append(Candle(datetime(2021, 1, 1) + timedelta(days=i), price, price * 1.01, price * 0.99, price,
+                          rng.uniform(1e5, 1e6)))
+    return out
+
+class TestSnapshot(unittest.TestCase):
+    def test_indicator_round_trip_is_bit_identical(self):
+        candles = make_candles(400)
+        for make, feed in [
+            (lambda: EMA(20), lambda o, c: o.update(c.close)),
+            (lambda: RSI(14), lambda o, c: o.update(c.close)),
+            (lambda: ATR(14), lambda o, c: o.update(c.high, c.low, c.close)),
+            (lambda: MACD(), lambda o, c: o.update(c.close)),
+            (lambda: VWAP(), lambda o, c: o.update(c.high, c.low, c.close, c.volume)),
+            (lambda: OBV(), lambda o, c: o.update(c.close, c.volume)),
+            (lambda: BollingerBands(20, 2.0), lambda o, c: o.update(c.close)),
+            (lambda: ADX(14), lambda o, c: o.update(c.high, c.low, c.close)),
+        ]:
+            live = make()
+            for c in candles[:300]:
+                feed(live, c)
+            restored = type(live).from_state(json.loads(json.dumps(live.to_state())))
+            for c in candles[300:]:
+                self.assertEqual(feed(restored, c), feed(live, c), type(live).__name__)
+
+    def test_context_and_detector_round_trip(self):
+        candles = make_candles(400)
+        ctx, detector = Context(), SwingDetector()
+        for i, c in enumerate(candles[:300]):
+            ctx.update(c)
+            detector.update(c, i)
+
+        ctx2 = Context.from_state(json.loads(json.dumps(ctx.to_state())))
+        det2 = SwingDetector.from_state(json.loads(json.dumps(detector.to_state())))
+        for i, c in enumerate(candles[300:], start=300):
+            self.assertEqual(ctx2.update(c), ctx.update(c))
+            self.assertEqual(det2.update(c, i), detector.update(c, i))
+
+    def test_analyzer_resumes_from_disk(self):
+        candles = make_candles(320)
+        with tempfile.TemporaryDirectory() as root:
+            first = MarketAnalyzer(snapshots=SnapshotStore(root))
+            first.data.fetch_history = lambda ticker, days=300: candles[:300]
+            first.analyze("SNAP")
+
+            # A fresh process: empty memory cache, state comes from disk.
+            second = MarketAnalyzer(snapshots=SnapshotStore(root))
+            second.data.fetch_history = lambda ticker, days=300: candles[20:320]
+            resumed = second.analyze("SNAP")
+            state = second.cache.peek("SNAP")
+            self.assertEqual(state.bars_processed, 320)
+
+            live = MarketAnalyzer()
+            live.data.fetch_history = lambda ticker, days=300: candles[:300]
+            live.analyze("SNAP")
+            live.data.fetch_history = lambda ticker, days=300: candles[20:320]
+            expected = live.analyze("SNAP")
+
+            self.assertEqual(state.indicators, live.cache.peek("SNAP").indicators)
+            self.assertEqual(resumed.swings, expected.swings)
+            self.assertEqual(resumed.target, expected.target)
+
+    def test_expired_snapshot_still_resumes(self):
+        candles = make_candles(301)
+        with tempfile.TemporaryDirectory() as root:
+            first = MarketAnalyzer(snapshots=SnapshotStore(root))
+            first.data.fetch_history = lambda ticker, days=300: candles[:300]
+            # Saved during a session that settled long ago, i.e. a next-morning restart.
+            first.cache.clock = lambda: datetime(2024, 3, 7, 12, 0).timestamp()
+            first.analyze("SNAP")
+            self.assertIsNone(SnapshotStore(root).load("SNAP"))
+
+            counts = Counts()
+            second = MarketAnalyzer(snapshots=SnapshotStore(root), instruments=Instrumentation([counts]))
+            second.data.fetch_history = lambda ticker, days=300: candles[1:301]
+            second.analyze("SNAP")
+            self.assertEqual(counts.traces, [{"cache_hit": 1, "candles_processed": 1, "candles_skipped": 299}])
+            self.assertEqual(second.cache.peek("SNAP").bars_processed, 301)
+
+    def test_snapshots_default_from_env_and_opt_out(self):
+        with tempfile.TemporaryDirectory() as root, mock.patch.dict(os.environ, {"STOCK_TRACKER_DATA_DIR": root}):
+            self.assertIsInstance(MarketAnalyzer().snapshots, SnapshotStore)
+            self.assertIsNone(MarketAnalyzer(snapshots=None).snapshots)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+import unittest
+
+HEAVY = ("pandas", "requests", "urllib3", "transformers", "torch", "textblob")
+
+class TestStartup(unittest.TestCase):
+    def test_heavy_dependencies_are_lazy(self):
+        code = (
+            "import sys\n"
+            "from stock_tracker.api.interface import MarketAnalyzer\n"
+            "MarketAnalyzer()\n"
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), "")
+
+if __name__ == '__main__':
+    unittest.main()
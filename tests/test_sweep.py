@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from stock_tracker.backtest_snapshot.walkforward import replay_decisions
+from stock_tracker.pipeline.decision import DecisionChain
+from stock_tracker.positioning.manager import PositionManager
+from stock_tracker.scoring.engine import ScoringEngine
+from stock_tracker.scoring.sweep import Candidate, extract_features, random_candidates, sweep
+from tests.helpers import history
+
+class TestSweep(unittest.TestCase):
+    def test_vectorised_layers_match_scalar(self):
+        bars = history(400)
+        features = extract_features(bars, warmup=200, horizon=5)
+        decisions = [d for _, _, d in replay_decisions(DecisionChain(), bars, warmup=200)]
+        self.assertEqual(len(features), len(decisions))
+
+        weights = ScoringEngine.weight_matrix(ScoringEngine.WEIGHTS)[None]
+        scores = ScoringEngine.score_many(features.components, features.regimes, weights,
+                                          features.higher_bull, features.higher_bear)[0]
+        np.testing.assert_allclose(scores, [d.score for d in decisions], atol=1e-12)
+        # The weekly trend opposes the daily one somewhere in this history, so the discount is exercised.
+        undiscounted = ScoringEngine.score_many(features.components, features.regimes, weights)[0]
+        self.assertTrue(np.any(scores != undiscounted))
+
+        actions = PositionManager.actions_many(scores[None], np.array([0.4]), features.regimes, features.rsi,
+                                               features.bottom_pattern, features.top_pattern)[0]
+        expected = [{"BUY": 1, "SELL": -1}.get(d.recommendation.action, 0) for d in decisions]
+        self.assertEqual(actions.tolist(), expected)
+
+    def test_sweep_ranks_candidates(self):
+        features = extract_features(history(500, seed=4), warmup=200, horizon=5)
+        candidates = [Candidate(ScoringEngine.WEIGHTS, 0.4)] + random_candidates(300, seed=1)
+        result = sweep(features, candidates, chunk=64, horizon=5)
+        self.assertEqual(len(result.trades), 301)
+        self.assertTrue(np.all((result.hit_rate >= 0) & (result.hit_rate <= 1)))
+
+        best = result.best(min_trades=1)
+        analyzer = DecisionChain()
+        best.apply(analyzer)
+        self.assertIs(analyzer.scoring.weights, best.weights)
+        self.assertEqual(analyzer.pos.threshold, best.threshold)
+
+    def test_threshold_override(self):
+        from stock_tracker.regime.classifier import MarketRegime
+        from stock_tracker.core.models import IndicatorState
+        data = IndicatorState(ema20=100.0, rsi=55.0)
+        self.assertEqual(PositionManager().recommend(0.3, MarketRegime.BULL_TREND, data, [], 100.0).action, "HOLD")
+        self.assertEqual(PositionManager(threshold=0.2).recommend(0.3, MarketRegime.BULL_TREND, data, [], 100.0).action, "BUY")
+
+if __name__ == '__main__':
+    unittest.main()
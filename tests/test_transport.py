@@ -0,0 +1,123 @@
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from stock_tracker.net.transport import HttpTransport, HttpError, default_transport
+from stock_tracker.data.ingestion import DataIngestor
+from stock_tracker.sentiment.news_client import NewsClient
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            srv.ports.add(self.client_address[1])
+            srv.hits[self.path] = srv.hits.get(self.path, 0) + 1
+            hits = srv.hits[self.path]
+
+        if self.path == "/flaky":
+            if hits <= 2:
+                self._send(503, b"busy")
+            else:
+                self._send(200, b"ok")
+        elif self.path == "/limited":
+            self._send(429, b"slow down", {"Retry-After": "0"})
+        elif self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304)
+            else:
+                self._send(200, b"payload", {"ETag": '"v1"'})
+        elif self.path == "/slow":
+            with srv.lock:
+                srv.active += 1
+                srv.peak = max(srv.peak, srv.active)
+            time.sleep(0.1)
+            with srv.lock:
+                srv.active -= 1
+            self._send(200, b"done")
+        else:
+            self._send(200, b"hello")
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.lock = threading.Lock()
+        self.server.ports = set()
+        self.server.hits = {}
+        self.server.active = 0
+        self.server.peak = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reuse(self):
+        http = HttpTransport()
+        for _ in range(5):
+            self.assertEqual(http.get(self.base + "/").content, b"hello")
+        self.assertEqual(len(self.server.ports), 1)
+
+    def test_retry_on_server_error(self):
+        http = HttpTransport(retries=3, backoff=0)
+        resp = http.get(self.base + "/flaky")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.server.hits["/flaky"], 3)
+
+        resp = http.get(self.base + "/limited")
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(self.server.hits["/limited"], 4)
+        self.assertRaises(HttpError, resp.raise_for_status)
+
+    def test_conditional_revalidation(self):
+        http = HttpTransport()
+        first = http.get(self.base + "/etag")
+        second = http.get(self.base + "/etag")
+
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, b"payload")
+        self.assertEqual(self.server.hits["/etag"], 2)
+
+    def test_validators_bounded_by_bytes(self):
+        http = HttpTransport(max_validator_bytes=len(b"payload") - 1)
+        http.get(self.base + "/etag")
+        self.assertFalse(http.get(self.base + "/etag").from_cache)
+        self.assertEqual(http._validator_bytes, 0)
+
+        http = HttpTransport(max_validator_bytes=len(b"payload"))
+        http.get(self.base + "/etag")
+        self.assertTrue(http.get(self.base + "/etag").from_cache)
+        self.assertEqual(http._validator_bytes, len(b"payload"))
+
+    def test_per_host_limit(self):
+        http = HttpTransport(per_host=2)
+        threads = [threading.Thread(target=http.get, args=(self.base + "/slow",)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.server.hits["/slow"], 6)
+        self.assertLessEqual(self.server.peak, 2)
+
+    def test_clients_share_default_transport(self):
+        self.assertIs(DataIngestor().http, default_transport())
+        self.assertIs(NewsClient().http, default_transport())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from stock_tracker.backtest_snapshot.walkforward import replay_decisions, run_walk_forward, simulate
+from stock_tracker.pipeline.decision import DecisionChain
+from tests.helpers import history, offline_tracker
+
+class TestWalkForward(unittest.TestCase):
+    def test_replay_yields_one_decision_per_bar(self):
+        bars = history(300)
+        steps = list(replay_decisions(DecisionChain(), bars, warmup=200))
+        self.assertEqual([i for i, _, _ in steps], list(range(200, 300)))
+
+    def test_replay_confirms_regimes_like_live(self):
+        # At bar 238 of this history the weekly trend overrides the daily regime.
+        bars = history(400)[:239]
+        *_, (_, _, decision) = replay_decisions(DecisionChain(), bars, warmup=200)
+        report = offline_tracker(bars).analyze("AAA")
+
+        self.assertNotEqual(decision.regime, DecisionChain().regime.classify(decision.indicators))
+        self.assertEqual(decision.regime, report.regime)
+        self.assertEqual(decision.higher, report.higher_timeframes)
+        self.assertEqual(decision.score, report.score)
+
+    def test_simulate_equity_matches_trade_log(self):
+        result = simulate("AAA", history(), warmup=200, capital=100000.0)
+        self.assertEqual(len(result.equity), 300)
+        self.assertEqual(len(result.timestamps), 300)
+        self.assertTrue(result.trades)
+
+        closed = [t for t in result.trades if t.exit_reason != "END"]
+        for t in result.trades:
+            self.assertIsNotNone(t.exit_price)
+            self.assertGreater(t.shares, 0)
+        if result.trades[-1].exit_reason == "END":
+            self.assertAlmostEqual(result.equity[-1], 100000.0 + sum(t.pnl for t in result.trades))
+        else:
+            self.assertAlmostEqual(result.equity[-1], 100000.0 + sum(t.pnl for t in closed))
+
+        summary = result.summary()
+        self.assertEqual(summary["trades"], len(result.trades))
+        self.assertGreaterEqual(summary["max_drawdown"], 0.0)
+
+    def test_process_pool_matches_serial(self):
+        histories = {"AAA": history(seed=1), "BBB": history(seed=2), "CCC": history(seed=3)}
+        serial = run_walk_forward(histories)
+        sharded = run_walk_forward(histories, process_workers=2)
+        self.assertEqual(set(sharded), set(histories))
+        for ticker in histories:
+            np.testing.assert_allclose(sharded[ticker].equity, serial[ticker].equity)
+            self.assertEqual(len(sharded[ticker].trades), len(serial[ticker].trades))
+
+if __name__ == '__main__':
+    unittest.main()